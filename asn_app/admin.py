@@ -1,6 +1,6 @@
 # asn_app/admin.py
 from django.contrib import admin
-from .models import ASN, KopSurat, SuratPerintahTugas, SuratSantunanKorpri, NotaDinas, HariLibur, SuratCuti, SisaCuti, Siswa, SuratKeterangan, SuratResmi, SuratRekomendasiStudiLanjut, SuratKP4, AnggotaKeluargaKP4, PesertaNotaDinas, SuratDispensasi, PesertaDispensasi, SuratPengantar
+from .models import ASN, KopSurat, SuratPerintahTugas, SuratSantunanKorpri, NotaDinas, HariLibur, SuratCuti, SisaCuti, RiwayatSisaCuti, Siswa, SuratKeterangan, SuratResmi, SuratRekomendasiStudiLanjut, SuratKP4, AnggotaKeluargaKP4, PesertaNotaDinas, SuratDispensasi, PesertaDispensasi, SuratPengantar
 
 
 @admin.register(ASN)
@@ -65,12 +65,19 @@ class SuratCutiAdmin(admin.ModelAdmin):
 
 @admin.register(SisaCuti)
 class SisaCutiAdmin(admin.ModelAdmin):
-    list_display = ('pegawai', 'sisa_tahun_n', 'sisa_tahun_n_1', 'sisa_tahun_n_2', 'total_sisa_cuti', 'created_at')
+    list_display = ('pegawai', 'tahun_n', 'sisa_tahun_n', 'sisa_tahun_n_1', 'sisa_tahun_n_2', 'total_sisa_cuti', 'created_at')
     list_filter = ('pegawai',)
     search_fields = ('pegawai__nama',)
     readonly_fields = ('total_sisa_cuti',) # total_sisa_cuti is calculated automatically
     raw_id_fields = ('pegawai',)
 
+@admin.register(RiwayatSisaCuti)
+class RiwayatSisaCutiAdmin(admin.ModelAdmin):
+    list_display = ('pegawai', 'tahun', 'sisa_tahun_n', 'sisa_tahun_n_1', 'sisa_tahun_n_2', 'total_sisa_cuti', 'created_at')
+    list_filter = ('tahun',)
+    search_fields = ('pegawai__nama',)
+    raw_id_fields = ('pegawai',)
+
 @admin.register(Siswa)
 class SiswaAdmin(admin.ModelAdmin):
     list_display = ('nama', 'nis', 'kelas', 'jurusan')
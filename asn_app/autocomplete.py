@@ -0,0 +1,176 @@
+# asn_app/autocomplete.py
+"""
+Sumber data widget autocomplete (lihat ``asn_app/widgets.py``).
+
+Form tidak lagi merender semua ASN/Siswa sebagai ``<option>``: widget hanya
+merender nilai yang terpilih, sisanya diambil per halaman dari
+``/asn/autocomplete/<nama>/?q=...&page=...`` (JSON). Pencarian memakai indeks
+FTS (``asn_app/search.py``) dan urutan ``nama`` memakai indeks ``*_nama_idx``.
+Satu halaman diambil dengan ``LIMIT page_size + 1`` sehingga tidak perlu COUNT;
+sumber gabungan (``CombinedSource``) membaca bagiannya berurutan dengan cara
+yang sama.
+"""
+from .models import ASN, Siswa
+from . import search
+
+PAGE_SIZE = 20
+
+
+def _text(value):
+    return '' if value is None else str(value)
+
+
+def _date(value):
+    return value.strftime('%Y-%m-%d') if value else ''
+
+
+class AutocompleteSource:
+    """
+    Satu model pilihan. ``label(obj)`` teks opsi, ``hint(obj)`` keterangan kecil
+    di daftar hasil, ``data(obj)`` atribut ``data-*`` opsi yang dipilih lewat
+    autocomplete (dipakai script isi-otomatis di form), ``filters`` parameter
+    GET yang boleh menyaring hasil secara exact.
+    """
+
+    def __init__(self, name, model, label, hint=None, data=None, filters=(), ordering=('nama', 'pk')):
+        self.name = name
+        self.model = model
+        self.label = label
+        self.hint = hint
+        self.data = data
+        self.filters = tuple(filters)
+        self.ordering = ordering
+
+    def queryset(self, params):
+        queryset = self.model._default_manager.all()
+        for field in self.filters:
+            if params.get(field):
+                queryset = queryset.filter(**{field: params[field]})
+        query = params.get('q', '').strip()
+        if query:
+            queryset = search.filter_queryset(queryset, query)
+        return queryset.order_by(*self.ordering)
+
+    def result(self, obj, value=None):
+        return {
+            'id': _text(obj.pk if value is None else value),
+            'text': self.label(obj),
+            'hint': self.hint(obj) if self.hint else '',
+            'data': self.data(obj) if self.data else {},
+        }
+
+    def page(self, params):
+        """``(results, more)`` untuk halaman ``params['page']``."""
+        number = _page_number(params)
+        start = (number - 1) * PAGE_SIZE
+        rows = list(self.queryset(params)[start:start + PAGE_SIZE + 1])
+        return [self.result(obj) for obj in rows[:PAGE_SIZE]], len(rows) > PAGE_SIZE
+
+    def selected(self, values, queryset=None, label=None):
+        """Opsi ``(value, label)`` untuk nilai yang sudah terpilih, satu query."""
+        pks = [value for value in values if str(value).isdigit()]
+        if not pks:
+            return []
+        queryset = queryset if queryset is not None else self.model._default_manager.all()
+        label = label or self.label
+        objects = queryset.in_bulk(pks)
+        return [(str(pk), label(objects[int(pk)])) for pk in pks if int(pk) in objects]
+
+
+class CombinedSource:
+    """Beberapa sumber dalam satu select; nilai opsi diberi awalan, mis. ``pegawai_3``."""
+
+    def __init__(self, name, parts):
+        self.name = name
+        self.parts = parts  # [(awalan, AutocompleteSource, awalan label)]
+
+    def page(self, params):
+        # Bagian dibaca berurutan dengan LIMIT (sisa offset + sisa halaman + 1),
+        # tanpa COUNT; bagian berikutnya hanya di-query bila halaman belum penuh
+        skip = (_page_number(params) - 1) * PAGE_SIZE
+        results = []
+        for prefix, source, label_prefix in self.parts:
+            rows = list(source.queryset(params)[:skip + PAGE_SIZE - len(results) + 1])
+            if len(rows) <= skip:
+                skip -= len(rows)
+                continue
+            for obj in rows[skip:]:
+                if len(results) == PAGE_SIZE:
+                    return results, True
+                result = source.result(obj, value=f'{prefix}_{obj.pk}')
+                result['text'] = f'{label_prefix}: {result["text"]}'
+                results.append(result)
+            skip = 0
+        return results, False
+
+    def selected(self, values, queryset=None, label=None):
+        options = []
+        for prefix, source, label_prefix in self.parts:
+            pks = [value[len(prefix) + 1:] for value in values if str(value).startswith(f'{prefix}_')]
+            options += [
+                (f'{prefix}_{pk}', f'{label_prefix}: {text}') for pk, text in source.selected(pks)
+            ]
+        return options
+
+    def get_object(self, value):
+        """Objek untuk nilai ``awalan_pk`` atau None."""
+        prefix, _, pk = str(value).partition('_')
+        for part_prefix, source, _ in self.parts:
+            if part_prefix == prefix and pk.isdigit():
+                return source.model._default_manager.filter(pk=pk).first()
+        return None
+
+
+def _page_number(params):
+    try:
+        return max(int(params.get('page', 1)), 1)
+    except (TypeError, ValueError):
+        return 1
+
+
+SOURCES = {}
+
+
+def register(source):
+    SOURCES[source.name] = source
+    return source
+
+
+def get_source(name):
+    try:
+        return SOURCES[name]
+    except KeyError:
+        raise LookupError(f'Unknown autocomplete source: {name}')
+
+
+def source_for_model(model):
+    return next((source for source in SOURCES.values() if getattr(source, 'model', None) is model), None)
+
+
+ASN_SOURCE = register(AutocompleteSource(
+    'asn', ASN,
+    label=lambda asn: asn.nama,
+    hint=lambda asn: ' - '.join(filter(None, [asn.nip, asn.jabatan])),
+    # Dibaca script isi-otomatis di form ST/DRH Satyalancana
+    data=lambda asn: {
+        'nama': _text(asn.nama),
+        'nip': _text(asn.nip),
+        'pangkat': _text(asn.pangkat),
+        'golongan': _text(asn.golongan),
+        'jabatan': _text(asn.jabatan),
+        'unitkerja': _text(asn.unit_kerja),
+        'pendidikan': _text(asn.pendidikan_terakhir),
+        'tmt-pangkat': _date(asn.tmt_pangkat),
+        'tmt-cpns': _date(asn.tmt_cpns),
+        'tmt-jabatan': _date(asn.tmt_jabatan),
+    },
+))
+
+SISWA_SOURCE = register(AutocompleteSource(
+    'siswa', Siswa,
+    label=lambda siswa: f'{siswa.nama} - {siswa.kelas}',
+    hint=lambda siswa: ' - '.join(filter(None, [siswa.nis, siswa.jurusan])),
+    filters=('kelas', 'jurusan'),
+))
+
+register(CombinedSource('person', [('pegawai', ASN_SOURCE, 'Pegawai'), ('siswa', SISWA_SOURCE, 'Siswa')]))
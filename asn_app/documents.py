@@ -0,0 +1,455 @@
+# asn_app/documents.py
+"""
+Registry jenis dokumen PDF.
+
+Semua surat yang bisa diexport ke PDF didaftarkan di sini. Logika khusus per
+surat (pemilihan template, teks durasi cuti, tautan lampiran, dll.) ditulis
+sebagai fungsi konteks kecil; selebihnya ditangani ``asn_app/pdf.py``.
+"""
+import logging
+
+from django.urls import reverse
+from django.utils.timezone import now
+
+from .models import (
+    ASN, SuratPerintahTugas, SuratCuti, SisaCuti, Siswa, SiswaKeluar, StSatyalancana,
+)
+from .pdf import register
+from .pdf_styles import LETTER_CSS, SPMT_CSS, SPTJM_CSS
+from .query_plans import planned
+
+logger = logging.getLogger(__name__)
+
+
+def _absolute_url(request, url):
+    if request is None:
+        return url
+    return request.build_absolute_uri(url)
+
+
+# ASN
+register(
+    'asn',
+    model=ASN,
+    # Template profil ada di templates/ (bukan templates/asn_app/)
+    template_name='asn_pdf_template.html',
+    context_name='asn',
+    get_context=lambda asn, request: {'current_time': now()},
+    get_kop_surat=lambda asn: None,
+    filename=lambda asn, context: f'profil_{asn.nip}_{asn.nama}',
+    # Template mencetak waktu export
+    cacheable=False,
+)
+
+
+# SPT
+def _spt_context(spt, request):
+    return {'current_time': now(), 'MEDIA_URL': '/media/'}
+
+
+def _spt_cache_extra(spt):
+    # Jumlah hari bergantung pada tabel HariLibur, bukan relasi SPT
+    return spt.jumlah_hari
+
+
+register(
+    'spt',
+    queryset=planned('pdf:spt'),
+    template_name=lambda spt: (
+        'asn_app/spt_pdf_template_large.html' if spt.peserta.count() > 3
+        else 'asn_app/spt_pdf_template.html'
+    ),
+    context_name='spt',
+    get_context=_spt_context,
+    get_cache_extra=_spt_cache_extra,
+    filename=lambda spt, context: f'spt_{spt.nomor_spt}_{spt.nama_kegiatan}',
+)
+
+register(
+    'spt_large',
+    queryset=planned('pdf:spt_large'),
+    template_name='asn_app/spt_pdf_template_large.html',
+    context_name='spt',
+    get_context=_spt_context,
+    get_cache_extra=_spt_cache_extra,
+    filename=lambda spt, context: f'spt_lengkap_{spt.nomor_spt}_{spt.nama_kegiatan}',
+)
+
+
+def _foto_kegiatan_context(spt, request):
+    # Hanya membaca: versi cetak dibuat saat upload atau oleh
+    # ``manage.py generate_foto_turunan``; foto lama memakai file aslinya
+    foto_list = []
+    for foto in spt.foto_kegiatan.all():
+        if not foto.foto:
+            continue
+        if not foto.foto_pdf.storage.exists(foto.foto_pdf.name):
+            logger.warning(f"Image file not found: {foto.foto_pdf.name}")
+            continue
+        foto_list.append({'url': foto.foto_pdf.url, 'keterangan': foto.keterangan})
+
+    # Kelompokkan 4 foto per halaman A4 (grid 2x2)
+    grouped_fotos = [foto_list[i:i + 4] for i in range(0, len(foto_list), 4)]
+    return {'grouped_fotos': grouped_fotos}
+
+
+register(
+    'foto_kegiatan',
+    model=SuratPerintahTugas,
+    template_name='asn_app/cetak_foto_kegiatan_pdf.html',
+    context_name='spt',
+    get_context=_foto_kegiatan_context,
+    get_kop_surat=lambda spt: None,
+    filename=lambda spt, context: f'foto_kegiatan_{spt.nomor_spt}',
+)
+
+
+# Surat Santunan Korpri
+register(
+    'surat_santunan_korpri',
+    queryset=planned('pdf:surat_santunan_korpri'),
+    template_name='asn_app/surat_santunan_korpri_pdf_template.html',
+    filename=lambda surat, context: f'surat_santunan_{surat.nomor_surat}',
+)
+
+
+# Nota Dinas
+def _nota_dinas_context(nota_dinas, request):
+    jumlah_peserta = nota_dinas.peserta_nota_dinas.count()
+    if jumlah_peserta == 0:
+        jumlah_peserta = nota_dinas.pegawai.count() + nota_dinas.siswa.count()
+    return {
+        'show_lampiran_link': jumlah_peserta > 3,
+        'lampiran_url': _absolute_url(request, reverse('nota_dinas_lampiran_pdf', kwargs={'pk': nota_dinas.pk})),
+        'jumlah_peserta': jumlah_peserta,
+    }
+
+
+register(
+    'nota_dinas',
+    queryset=planned('pdf:nota_dinas'),
+    template_name='asn_app/nota_dinas_pdf_template.html',
+    context_name='nota_dinas',
+    get_context=_nota_dinas_context,
+    filename=lambda nota_dinas, context: f'nota_dinas_{nota_dinas.pk}',
+    attachment=False,
+)
+
+register(
+    'nota_dinas_lampiran',
+    queryset=planned('pdf:nota_dinas_lampiran'),
+    template_name='asn_app/nota_dinas_lampiran_template.html',
+    context_name='nota_dinas',
+    filename=lambda nota_dinas, context: f'lampiran_nota_dinas_{nota_dinas.pk}',
+)
+
+
+# Surat Usulan
+def _surat_usulan_context(surat_usulan, request):
+    jumlah_peserta = surat_usulan.peserta_surat_usulan.count()
+    return {
+        'show_lampiran_link': jumlah_peserta > 0,
+        'lampiran_url': _absolute_url(request, reverse('surat_usulan_lampiran_pdf', kwargs={'pk': surat_usulan.pk})),
+        'jumlah_peserta': jumlah_peserta,
+    }
+
+
+register(
+    'surat_usulan',
+    queryset=planned('pdf:surat_usulan'),
+    template_name='asn_app/surat_usulan_pdf_template.html',
+    context_name='surat_usulan',
+    get_context=_surat_usulan_context,
+    filename=lambda surat_usulan, context: f'surat_usulan_{surat_usulan.pk}',
+)
+
+register(
+    'surat_usulan_lampiran',
+    queryset=planned('pdf:surat_usulan_lampiran'),
+    template_name='asn_app/surat_usulan_lampiran_template.html',
+    context_name='surat_usulan',
+    filename=lambda surat_usulan, context: f'lampiran_surat_usulan_{surat_usulan.pk}',
+)
+
+
+# ST & DRH Satyalancana
+register(
+    'st_satyalancana',
+    queryset=planned('pdf:st_satyalancana'),
+    template_name='asn_app/st_satyalancana_pdf_template.html',
+    context_name='st',
+    filename=lambda st, context: f'st_satyalancana_{st.pk}',
+)
+
+
+def _drh_kop_surat(drh):
+    # DRH tidak punya kop surat sendiri; pakai kop dari ST Satyalancana pertama
+    if not drh.asn.unit_kerja:
+        return None
+    st = StSatyalancana.objects.select_related('kop_surat').first()
+    return st.kop_surat if st else None
+
+
+register(
+    'drh_satyalancana',
+    queryset=planned('pdf:drh_satyalancana'),
+    template_name='asn_app/drh_satyalancana_pdf_template.html',
+    context_name='drh',
+    get_context=lambda drh, request: {'asn': drh.asn},
+    get_kop_surat=_drh_kop_surat,
+    filename=lambda drh, context: f'drh_satyalancana_{drh.pk}',
+)
+
+
+# Surat Cuti
+NUMBER_WORDS = {
+    1: "satu", 2: "dua", 3: "tiga", 4: "empat", 5: "lima",
+    6: "enam", 7: "tujuh", 8: "delapan", 9: "sembilan", 10: "sepuluh",
+    11: "sebelas", 12: "dua belas", 13: "tiga belas", 14: "empat belas",
+    15: "lima belas", 16: "enam belas", 17: "tujuh belas", 18: "delapan belas",
+    19: "sembilan belas", 20: "dua puluh"
+}
+
+MONTH_NAMES = {
+    'January': 'Januari', 'February': 'Februari', 'March': 'Maret', 'April': 'April',
+    'May': 'Mei', 'June': 'Juni', 'July': 'Juli', 'August': 'Agustus',
+    'September': 'September', 'October': 'Oktober', 'November': 'November', 'December': 'Desember'
+}
+
+
+def _indonesian_date(value):
+    date_str = value.strftime('%d %B %Y')
+    for eng_month, indo_month in MONTH_NAMES.items():
+        date_str = date_str.replace(eng_month, indo_month)
+    return date_str
+
+
+def leave_duration_text(surat_cuti):
+    """Teks durasi cuti untuk isi surat, mis. 'selama 3 (tiga) hari kerja, ...'."""
+    leave_days = surat_cuti.hari_efektif
+    start_date_str = _indonesian_date(surat_cuti.tanggal_awal)
+    end_date_str = _indonesian_date(surat_cuti.tanggal_akhir)
+
+    # Untuk cuti > 30 hari, tampilkan sebagai "3 (tiga) bulan"
+    if leave_days > 30:
+        return f"selama 3 (tiga) bulan, terhitung mulai tanggal {start_date_str} sampai dengan tanggal {end_date_str}"
+
+    written_number = NUMBER_WORDS.get(leave_days, str(leave_days))
+    if surat_cuti.tanggal_awal == surat_cuti.tanggal_akhir:
+        return f"selama {leave_days} ({written_number}) hari kerja pada tanggal {start_date_str}"
+    return f"selama {leave_days} ({written_number}) hari kerja, terhitung mulai tanggal {start_date_str} sampai dengan tanggal {end_date_str}"
+
+
+def _surat_cuti_context(surat_cuti, request):
+    try:
+        text = leave_duration_text(surat_cuti)
+    except Exception as e:
+        logger.error(f"Error calculating leave duration: {e}")
+        text = "durasi cuti tidak dapat dihitung"
+    return {'leave_duration_text': text}
+
+
+register(
+    'surat_cuti',
+    queryset=planned('pdf:surat_cuti'),
+    template_name='asn_app/surat_cuti_pdf_template.html',
+    context_name='surat_cuti',
+    get_context=_surat_cuti_context,
+    filename=lambda surat_cuti, context: f'surat_cuti_{surat_cuti.pegawai.nama}',
+)
+
+
+# Laporan Cuti
+def _laporan_cuti_years(request):
+    years = request.GET.getlist('years') if request is not None else []
+    if not years:
+        return [now().year]
+    try:
+        return [int(y) for y in years]
+    except (ValueError, TypeError):
+        return [now().year]
+
+
+def _laporan_cuti_context(asn, request):
+    years = _laporan_cuti_years(request)
+
+    surat_cuti_queryset = SuratCuti.objects.filter(
+        pegawai=asn,
+        tanggal_awal__year__in=years
+    ).order_by('tanggal_awal')
+
+    sisa_cuti_obj = SisaCuti.objects.filter(pegawai=asn).first()
+
+    # Saldo awal memakai nilai ALOKASI AWAL (bukan sisa)
+    initial_total_sisa_cuti = 0
+    if sisa_cuti_obj:
+        initial_total_sisa_cuti = (
+            sisa_cuti_obj.initial_tahun_n + sisa_cuti_obj.initial_tahun_n_1 + sisa_cuti_obj.initial_tahun_n_2
+        )
+
+    # ATB baris pertama = saldo awal penuh; baris berikutnya = saldo berjalan
+    processed_surat_cuti_list = []
+    current_total_sisa_cuti_balance = initial_total_sisa_cuti
+    for surat_cuti in surat_cuti_queryset:
+        lhc = surat_cuti.hari_efektif
+        atb_for_row = current_total_sisa_cuti_balance
+        current_total_sisa_cuti_balance -= lhc
+        processed_surat_cuti_list.append({
+            'surat_cuti': surat_cuti,
+            'lhc': lhc,
+            'atb_for_row': atb_for_row,
+            'stb_for_row': atb_for_row - lhc,
+        })
+
+    rows_per_page = 22
+    pages = []
+    for start_index in range(0, len(processed_surat_cuti_list), rows_per_page):
+        page_rows = []
+        for row_index, item in enumerate(
+            processed_surat_cuti_list[start_index:start_index + rows_per_page],
+            start=start_index + 1,
+        ):
+            row = item.copy()
+            row['number'] = row_index
+            page_rows.append(row)
+        pages.append({'rows': page_rows})
+
+    # Default penandatangan: pegawai dengan jabatan Kepala (bukan Wakil Kepala)
+    penandatangan = (
+        ASN.objects.filter(jabatan__icontains="kepala")
+        .exclude(jabatan__icontains="wakil")
+        .first()
+    )
+    if not penandatangan:
+        penandatangan = ASN(nama="[Nama Kepala Sekolah]", nip="[NIP Kepala Sekolah]", pangkat="[Pangkat]", golongan="[Golongan]", jabatan="Kepala Sekolah")
+
+    return {
+        'pages': pages,
+        'processed_surat_cuti_list': processed_surat_cuti_list,
+        'sisa_cuti': sisa_cuti_obj,
+        'initial_total_sisa_cuti': initial_total_sisa_cuti,
+        'penandatangan': penandatangan,
+        'years': years,
+    }
+
+
+register(
+    'laporan_cuti',
+    model=ASN,
+    template_name='asn_app/laporan_cuti_pdf_template.html',
+    context_name='asn',
+    get_context=_laporan_cuti_context,
+    get_kop_surat=lambda asn: None,
+    filename=lambda asn, context: f"laporan_cuti_{asn.nama}_{'_'.join(str(y) for y in context['years'])}",
+    # Isi bergantung pada ?years= dan seluruh riwayat cuti pegawai
+    cacheable=False,
+)
+
+
+# Siswa Keluar (laporan seluruh tabel)
+def _siswa_keluar_context(obj, request):
+    siswa_keluar_list = SiswaKeluar.objects.select_related('siswa').order_by('-tanggal_keluar')
+    total_siswa_keluar = siswa_keluar_list.count()
+    total_siswa = Siswa.objects.count()
+    return {
+        'siswa_keluar_list': siswa_keluar_list,
+        'total_siswa_keluar': total_siswa_keluar,
+        'total_siswa': total_siswa,
+        'sis_aktif': total_siswa - total_siswa_keluar,
+        'generated_at': now(),
+    }
+
+
+register(
+    'siswa_keluar',
+    template_name='asn_app/siswa_keluar_pdf_template.html',
+    get_context=_siswa_keluar_context,
+    filename=lambda obj, context: 'siswa_keluar_data',
+    cacheable=False,
+)
+
+
+# Surat-surat dengan pola standar (kop surat + objek 'surat')
+register(
+    'surat_keterangan',
+    queryset=planned('pdf:surat_keterangan'),
+    template_name='asn_app/surat_keterangan_pdf_template.html',
+    filename=lambda surat, context: f'surat_keterangan_{surat.nomor_surat}',
+)
+
+register(
+    'surat_rekomendasi',
+    queryset=planned('pdf:surat_rekomendasi'),
+    template_name='asn_app/surat_rekomendasi_pdf_template.html',
+    filename=lambda surat, context: f'surat_rekomendasi_{surat.nomor_surat}',
+)
+
+register(
+    'surat_kp4',
+    queryset=planned('pdf:surat_kp4'),
+    template_name='asn_app/surat_kp4_pdf_template.html',
+    filename=lambda surat, context: f'kp4_{surat.pk}',
+)
+
+register(
+    'surat_resmi',
+    queryset=planned('pdf:surat_resmi'),
+    template_name='asn_app/surat_resmi_pdf_template.html',
+    filename=lambda surat, context: f'surat_resmi_{surat.nomor}',
+)
+
+register(
+    'sptjm',
+    queryset=planned('pdf:sptjm'),
+    template_name='asn_app/sptjm_pdf_template.html',
+    context_name='sptjm',
+    filename=lambda sptjm, context: f'sptjm_{sptjm.nomor_surat}',
+    stylesheets=[SPTJM_CSS],
+)
+
+register(
+    'spmt',
+    queryset=planned('pdf:spmt'),
+    template_name='asn_app/spmt_pdf_template.html',
+    context_name='spmt',
+    filename=lambda spmt, context: f'SPMT_{spmt.nomor_surat}',
+    stylesheets=[SPMT_CSS],
+)
+
+register(
+    'surat_umum',
+    queryset=planned('pdf:surat_umum'),
+    template_name='asn_app/surat_umum_pdf_template.html',
+    filename=lambda surat, context: f'surat_umum_{surat.pk}',
+    stylesheets=[LETTER_CSS],
+)
+
+register(
+    'surat_panggilan_siswa',
+    queryset=planned('pdf:surat_panggilan_siswa'),
+    template_name='asn_app/surat_panggilan_siswa_pdf_template.html',
+    filename=lambda surat, context: f'surat_panggilan_{surat.siswa.nama}_{surat.nomor_surat}',
+    stylesheets=[LETTER_CSS],
+)
+
+register(
+    'surat_undangan',
+    queryset=planned('pdf:surat_undangan'),
+    template_name='asn_app/surat_undangan_pdf_template.html',
+    filename=lambda surat, context: f"surat_undangan_{surat.siswa.nama if surat.siswa else ''}_{surat.nomor_surat}",
+    stylesheets=[LETTER_CSS],
+)
+
+register(
+    'surat_dispensasi',
+    queryset=planned('pdf:surat_dispensasi'),
+    template_name='asn_app/surat_dispensasi_pdf_template.html',
+    filename=lambda surat, context: f'surat_dispensasi_{surat.nomor_surat}',
+)
+
+register(
+    'surat_pengantar',
+    queryset=planned('pdf:surat_pengantar'),
+    template_name='asn_app/surat_pengantar_pdf_template.html',
+    filename=lambda surat, context: f'surat_pengantar_{surat.nomor_surat}',
+)
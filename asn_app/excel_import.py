@@ -0,0 +1,464 @@
+# asn_app/excel_import.py
+"""
+Import data dari Excel (ASN, Siswa, SPMT).
+
+Sheet dibaca dalam mode read-only (streaming) sehingga memori tidak ikut
+membesar dengan jumlah baris. Tiap baris dibangun menjadi instance model dan
+divalidasi di memori; relasi (mis. pegawai SPMT) dicari lewat kamus NIP/nama
+yang disiapkan sekali di awal. Baris yang valid ditulis dengan
+``bulk_create`` per ``chunk_size`` baris, masing-masing dalam satu transaksi.
+Baris yang gagal dicatat beserta nomor barisnya di ``ImportResult.errors``.
+
+Mode ``upsert`` (ASN menurut NIP, Siswa menurut NIS) mencocokkan baris
+dengan data yang sudah ada, membandingkan field-nya, lalu hanya menulis
+baris yang berubah dengan ``bulk_update``; baris baru tetap ``bulk_create``.
+Data lama tidak dihapus sehingga riwayat (SiswaKeluar, peserta, dll.) aman.
+"""
+import logging
+import time
+from datetime import date, datetime
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.text import capfirst
+
+from . import search
+from .models import ASN, SPMT, Siswa
+
+logger = logging.getLogger(__name__)
+
+IMPORTS = {}
+
+DATE_FORMATS = ('%Y-%m-%d', '%d-%m-%Y', '%d/%m/%Y')
+
+
+class ImportResult:
+    """Ringkasan satu kali import."""
+
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.errors = []
+        self.elapsed = 0.0
+
+    def add_error(self, row_number, message):
+        self.errors.append((row_number, message))
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    def summary(self):
+        return (
+            f'{self.created} baris ditambahkan, {self.updated} diperbarui, '
+            f'{self.unchanged} tidak berubah, {len(self.errors)} gagal dari {self.rows} baris.'
+        )
+
+
+class ExcelImport:
+    """
+    Satu jenis import Excel.
+
+    ``columns`` adalah daftar ``(key, label)`` sesuai urutan kolom di sheet;
+    jika baris pertama memuat semua label, kolom dicocokkan menurut judulnya
+    sehingga file hasil export bisa langsung diimport ulang.
+    ``build(values, lookups)`` mengubah ``{key: nilai sel}`` menjadi instance
+    model (atau melempar ValidationError). ``get_lookups()`` menyiapkan kamus
+    relasi sekali per import. ``unique_field`` dicek terhadap data yang sudah
+    ada dan terhadap baris lain di file yang sama.
+
+    ``key_field`` dan ``update_fields`` mengaktifkan mode upsert: baris
+    dicocokkan menurut ``key_field`` dan hanya ``update_fields`` yang
+    dibandingkan dan ditulis.
+    """
+
+    def __init__(self, name, model, columns, build, get_lookups=None, unique_field=None,
+                 key_field=None, update_fields=None):
+        self.name = name
+        self.model = model
+        self.columns = columns
+        self.build = build
+        self.get_lookups = get_lookups
+        self.unique_field = unique_field
+        self.key_field = key_field
+        self.update_fields = update_fields or []
+
+    def label(self, key):
+        return dict(self.columns).get(key) or capfirst(self.model._meta.get_field(key).verbose_name)
+
+    @property
+    def supports_upsert(self):
+        return bool(self.key_field)
+
+    @property
+    def keys(self):
+        return [key for key, _ in self.columns]
+
+    def column_indexes(self, header):
+        """Posisi tiap kolom: menurut judul jika semuanya ada, selain itu menurut urutan."""
+        labels = [_normalize(value) for value in header or ()]
+        wanted = [_normalize(label) for _, label in self.columns]
+        if all(label in labels for label in wanted):
+            return [labels.index(label) for label in wanted]
+        return list(range(len(self.columns)))
+
+    def existing_keys(self):
+        if not self.unique_field:
+            return set()
+        return set(
+            self.model.objects.exclude(**{f'{self.unique_field}__isnull': True})
+            .values_list(self.unique_field, flat=True)
+        )
+
+    def existing_rows(self):
+        """``{key: (pk, {field: nilai})}`` data yang sudah ada, satu query."""
+        rows = {}
+        queryset = (
+            self.model.objects.exclude(**{f'{self.key_field}__isnull': True})
+            .exclude(**{self.key_field: ''})
+            .order_by('pk')
+            .values('pk', self.key_field, *self.update_fields)
+        )
+        for values in queryset.iterator(chunk_size=2000):
+            pk = values.pop('pk')
+            # Jika ada kunci ganda di database, baris tertua yang diperbarui
+            rows.setdefault(values.pop(self.key_field), (pk, values))
+        return rows
+
+
+def register(name, model, columns, build, **kwargs):
+    IMPORTS[name] = ExcelImport(name, model, columns, build, **kwargs)
+    return IMPORTS[name]
+
+
+def get_import(name):
+    try:
+        return IMPORTS[name]
+    except KeyError:
+        raise LookupError(f'Unknown Excel import: {name}')
+
+
+def _normalize(value):
+    return str(value).strip().lower() if value is not None else ''
+
+
+def text(value):
+    """Nilai sel sebagai teks; angka bulat (mis. NIP/NIS) tanpa '.0'."""
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def text_or_none(value):
+    return text(value) or None
+
+
+def parse_date(value, label):
+    if value in (None, ''):
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(str(value).strip(), fmt).date()
+        except ValueError:
+            continue
+    raise ValidationError(f'{label}: format tanggal tidak valid ({value})')
+
+
+def validate(instance):
+    """
+    Validasi field di memori. Teks kosong pada kolom wajib tetap diterima
+    (database menerimanya, seperti import lama); yang ditolak adalah nilai
+    kosong untuk kolom non-teks wajib, teks terlalu panjang, pilihan tidak
+    valid, dll.
+    """
+    # Relasi sudah dicari lewat kamus lookup; validasi bawaan ForeignKey
+    # akan menjalankan satu query per baris.
+    exclude = [field.name for field in instance._meta.concrete_fields if field.is_relation]
+    try:
+        instance.clean_fields(exclude=exclude)
+    except ValidationError as e:
+        errors = []
+        for field, field_errors in e.error_dict.items():
+            for error in field_errors:
+                if error.code == 'blank' and getattr(instance, field) == '':
+                    continue
+                label = capfirst(instance._meta.get_field(field).verbose_name)
+                errors.extend(f'{label}: {message}' for message in error.messages)
+        if errors:
+            raise ValidationError(errors)
+
+
+def read_rows(sheet, spec):
+    """(nomor baris, {key: nilai}) untuk tiap baris data yang tidak kosong."""
+    rows = sheet.iter_rows(values_only=True)
+    header = next(rows, None)
+    indexes = spec.column_indexes(header)
+    for row_number, row in enumerate(rows, 2):
+        if not row or all(value in (None, '') for value in row):
+            continue
+        yield row_number, {
+            key: row[index] if index < len(row) else None
+            for key, index in zip(spec.keys, indexes)
+        }
+
+
+def _write_chunk(spec, chunk, result):
+    try:
+        with transaction.atomic():
+            spec.model.objects.bulk_create([instance for _, instance in chunk])
+            # bulk_create tidak mengirim signal post_save
+            search.index_instances(spec.model, [instance for _, instance in chunk])
+        result.created += len(chunk)
+        return
+    except IntegrityError:
+        pass
+
+    # Satu baris merusak chunk: simpan satu per satu untuk mencari penyebabnya
+    for row_number, instance in chunk:
+        try:
+            with transaction.atomic():
+                instance.save()
+            result.created += 1
+        except IntegrityError as e:
+            result.add_error(row_number, f'Gagal disimpan: {e}')
+
+
+def _write_updates(spec, chunk, result):
+    fields = list(spec.update_fields)
+    if any(field.name == 'updated_at' for field in spec.model._meta.concrete_fields):
+        # bulk_update tidak mengisi auto_now; dibutuhkan export ?updated_since=
+        updated_at = timezone.now()
+        for _, instance in chunk:
+            instance.updated_at = updated_at
+        fields.append('updated_at')
+
+    try:
+        with transaction.atomic():
+            spec.model.objects.bulk_update([instance for _, instance in chunk], fields)
+            search.index_instances(spec.model, [instance for _, instance in chunk])
+        result.updated += len(chunk)
+        return
+    except IntegrityError:
+        pass
+
+    for row_number, instance in chunk:
+        try:
+            with transaction.atomic():
+                instance.save(update_fields=fields)
+            result.updated += 1
+        except IntegrityError as e:
+            result.add_error(row_number, f'Gagal disimpan: {e}')
+
+
+def _same(old, new):
+    # Sel kosong dibaca sebagai '' atau None; keduanya dianggap sama
+    return (old if old is not None else '') == (new if new is not None else '')
+
+
+def run_import(spec, excel_file, chunk_size=500, mode='insert'):
+    """
+    Import satu file Excel menurut ``spec`` dan kembalikan ``ImportResult``.
+    ``mode='upsert'`` memperbarui data yang sudah ada (lihat ``ExcelImport``).
+    """
+    import openpyxl
+
+    upsert = mode == 'upsert'
+    if upsert and not spec.supports_upsert:
+        raise ValueError(f'Excel import {spec.name} does not support upsert')
+
+    result = ImportResult()
+    started = time.perf_counter()
+    try:
+        workbook = openpyxl.load_workbook(excel_file, read_only=True, data_only=True)
+    except Exception as e:
+        logger.error(f"Error reading Excel file for {spec.name} import: {e}")
+        result.add_error(None, f'File tidak dapat dibaca: {e}')
+        return result
+
+    lookups = spec.get_lookups() if spec.get_lookups else {}
+    existing = spec.existing_rows() if upsert else {}
+    seen = set(existing) if upsert else spec.existing_keys()
+    in_file = set()
+    chunk = []
+    updates = []
+    try:
+        for row_number, values in read_rows(workbook.active, spec):
+            result.rows += 1
+            try:
+                instance = spec.build(values, lookups)
+                validate(instance)
+                key = getattr(instance, spec.key_field) if upsert else None
+                if key:
+                    if key in in_file:
+                        raise ValidationError(f'{spec.label(spec.key_field)} {key} muncul lebih dari sekali di file')
+                    in_file.add(key)
+                if key in existing:
+                    pk, old = existing[key]
+                    if all(_same(old[field], getattr(instance, field)) for field in spec.update_fields):
+                        result.unchanged += 1
+                    else:
+                        instance.pk = pk
+                        updates.append((row_number, instance))
+                        if len(updates) >= chunk_size:
+                            _write_updates(spec, updates, result)
+                            updates = []
+                    continue
+                if spec.unique_field:
+                    key = getattr(instance, spec.unique_field)
+                    if key and key in seen:
+                        raise ValidationError(f'{spec.label(spec.unique_field)} {key} sudah ada')
+                    seen.add(key)
+            except ValidationError as e:
+                result.add_error(row_number, '; '.join(e.messages))
+                continue
+
+            chunk.append((row_number, instance))
+            if len(chunk) >= chunk_size:
+                _write_chunk(spec, chunk, result)
+                chunk = []
+        if chunk:
+            _write_chunk(spec, chunk, result)
+        if updates:
+            _write_updates(spec, updates, result)
+    finally:
+        workbook.close()
+
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+# ASN
+
+def _build_asn(values, lookups):
+    jenis_kelamin = text(values['jenis_kelamin'])
+    return ASN(
+        nip=text_or_none(values['nip']),
+        nama=text(values['nama']),
+        tempat_lahir=text(values['tempat_lahir']),
+        tanggal_lahir=parse_date(values['tanggal_lahir'], 'Tanggal Lahir'),
+        jenis_kelamin=jenis_kelamin[0].upper() if jenis_kelamin else '',
+        agama=text(values['agama']).upper(),
+        alamat=text(values['alamat']),
+        email=text(values['email']),
+        telepon=text(values['telepon']),
+        jabatan=text(values['jabatan']),
+        pangkat=text_or_none(values['pangkat']),
+        golongan=text_or_none(values['golongan']),
+        unit_kerja=text(values['unit_kerja']),
+    )
+
+
+register(
+    'asn', ASN,
+    columns=[
+        ('nip', 'NIP'), ('nama', 'Nama'), ('tempat_lahir', 'Tempat Lahir'),
+        ('tanggal_lahir', 'Tanggal Lahir'), ('jenis_kelamin', 'Jenis Kelamin'),
+        ('agama', 'Agama'), ('alamat', 'Alamat'), ('email', 'Email'), ('telepon', 'Telepon'),
+        ('jabatan', 'Jabatan'), ('pangkat', 'Pangkat'), ('golongan', 'Golongan'),
+        ('unit_kerja', 'Unit Kerja'),
+    ],
+    build=_build_asn,
+    unique_field='nip',
+    key_field='nip',
+    update_fields=[
+        'nama', 'tempat_lahir', 'tanggal_lahir', 'jenis_kelamin', 'agama', 'alamat', 'email',
+        'telepon', 'jabatan', 'pangkat', 'golongan', 'unit_kerja',
+    ],
+)
+
+
+# Siswa
+
+def _build_siswa(values, lookups):
+    return Siswa(
+        nama=text_or_none(values['nama']),
+        nis=text_or_none(values['nis']),
+        kelas=text(values['kelas']),
+        jurusan=text_or_none(values['jurusan']),
+        alamat=text_or_none(values['alamat']),
+        no_hp=text_or_none(values['no_hp']),
+        nama_orang_tua=text_or_none(values['nama_orang_tua']),
+    )
+
+
+register(
+    'siswa', Siswa,
+    # Urutan posisi mengikuti format import lama (nama lebih dulu); file
+    # hasil export siswa (NIS lebih dulu) dikenali lewat judul kolomnya.
+    columns=[
+        ('nama', 'Nama'), ('nis', 'NIS'), ('kelas', 'Kelas'), ('jurusan', 'Jurusan'),
+        ('alamat', 'Alamat'), ('no_hp', 'No HP'), ('nama_orang_tua', 'Nama Orang Tua'),
+    ],
+    build=_build_siswa,
+    key_field='nis',
+    update_fields=['nama', 'kelas', 'jurusan', 'alamat', 'no_hp', 'nama_orang_tua'],
+)
+
+
+# SPMT
+
+def _asn_lookups():
+    """Kamus nama -> pk dan NIP -> pk, dibangun dengan satu query."""
+    by_nama = {}
+    by_nip = {}
+    for pk, nama, nip in ASN.objects.order_by('pk').values_list('pk', 'nama', 'nip'):
+        by_nama.setdefault(nama, pk)
+        if nip:
+            by_nip.setdefault(nip, pk)
+    return {'by_nama': by_nama, 'by_nip': by_nip}
+
+
+def _resolve_asn(lookups, nama, nip, label):
+    """Cari ASN menurut nama, lalu NIP; None jika sel kosong."""
+    nama = text(nama)
+    nip = text(nip)
+    if not nama and not nip:
+        return None
+    pk = lookups['by_nama'].get(nama) or lookups['by_nip'].get(nip)
+    if pk is None:
+        raise ValidationError(f'{label} tidak ditemukan ({nama or nip})')
+    return pk
+
+
+def _build_spmt(values, lookups):
+    tahun_peraturan = text(values['tahun_peraturan'])
+    return SPMT(
+        nomor_surat=text(values['nomor_surat']),
+        tempat_ditetapkan=text(values['tempat_ditetapkan']),
+        tanggal_surat=parse_date(values['tanggal_surat'], 'Tanggal Surat'),
+        penandatangan_id=_resolve_asn(lookups, values['penandatangan_nama'], values['penandatangan_nip'], 'Penandatangan'),
+        pegawai_id=_resolve_asn(lookups, values['pegawai_nama'], values['pegawai_nip'], 'Pegawai'),
+        peraturan=text(values['peraturan']),
+        nomor_peraturan=text(values['nomor_peraturan']),
+        tahun_peraturan=tahun_peraturan,
+        tentang=text(values['tentang']),
+        tanggal_terhitung=parse_date(values['tanggal_terhitung'], 'Tanggal Terhitung Mulai'),
+        sebagai=text(values['sebagai']),
+        tempat_tugas=text(values['tempat_tugas']),
+    )
+
+
+register(
+    'spmt', SPMT,
+    columns=[
+        ('nomor_surat', 'Nomor Surat'), ('tempat_ditetapkan', 'Tempat Ditetapkan'),
+        ('tanggal_surat', 'Tanggal Surat'),
+        ('penandatangan_nama', 'Penandatangan (Nama)'), ('penandatangan_nip', 'Penandatangan (NIP)'),
+        ('pegawai_nama', 'Pegawai (Nama)'), ('pegawai_nip', 'Pegawai (NIP)'),
+        ('peraturan', 'Peraturan'), ('nomor_peraturan', 'Nomor Peraturan'),
+        ('tahun_peraturan', 'Tahun Peraturan'), ('tentang', 'Tentang'),
+        ('tanggal_terhitung', 'Tanggal Terhitung Mulai'), ('sebagai', 'Sebagai'),
+        ('tempat_tugas', 'Tempat Tugas'),
+    ],
+    build=_build_spmt,
+    get_lookups=_asn_lookups,
+)
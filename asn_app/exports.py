@@ -0,0 +1,386 @@
+# asn_app/exports.py
+"""
+Export tabel ke Excel, CSV dan Parquet.
+
+Setiap jenis export didaftarkan sekali dengan daftar kolom ``(judul,
+nilai)``. Baris diambil dengan ``.iterator()`` (relasi lewat
+``select_related``) dan ditulis dengan workbook openpyxl mode write-only,
+yang menulis baris langsung ke file sementara. File hasilnya dikirim
+bertahap lewat ``StreamingHttpResponse`` sehingga memori tetap datar
+berapa pun jumlah barisnya.
+
+``DATA_EXPORTS`` berisi export data mentah (ASN, Siswa, SuratCuti, SPT)
+untuk sinkronisasi ke sistem lain: CSV di-stream baris per baris, Parquet
+(jika pyarrow terpasang, selain itu CSV) ditulis per batch. Dengan
+``updated_since`` hanya baris yang ``updated_at``-nya sejak waktu tersebut
+yang dikirim. Baris yang dihapus tidak ikut terkirim.
+"""
+import csv
+import tempfile
+from datetime import date, datetime
+from wsgiref.util import FileWrapper
+
+from django.db.models import Max
+from django.http import StreamingHttpResponse
+
+from .models import ASN, SPMT, Siswa, SiswaKeluar, SuratCuti, SuratPerintahTugas
+
+EXPORTS = {}
+DATA_EXPORTS = {}
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+CSV_CONTENT_TYPE = 'text/csv; charset=utf-8'
+PARQUET_CONTENT_TYPE = 'application/vnd.apache.parquet'
+CHUNK_SIZE = 2000
+STREAM_BLOCK_SIZE = 64 * 1024
+
+
+class TableExport:
+    """
+    Satu jenis export tabel.
+
+    ``columns`` berisi ``(judul, nilai)`` atau cukup nama atribut (judul =
+    nama atribut); ``nilai`` adalah nama atribut (boleh bertitik untuk
+    relasi, mis. ``'siswa.nama'``) atau callable ``f(obj)``.
+    ``get_queryset()`` mengembalikan queryset lengkap dengan
+    ``select_related``/``prefetch_related`` yang dibutuhkan kolom-kolomnya.
+    """
+
+    def __init__(self, name, get_queryset, columns, filename, sheet_title=None, numbered=False,
+                 updated_field=None):
+        self.name = name
+        self.get_queryset = get_queryset
+        self.columns = [(column, column) if isinstance(column, str) else column for column in columns]
+        self.filename = filename
+        self.sheet_title = sheet_title or filename
+        self.numbered = numbered
+        self.updated_field = updated_field
+
+    @property
+    def headers(self):
+        headers = [header for header, _ in self.columns]
+        return ['No'] + headers if self.numbered else headers
+
+    def rows(self, queryset=None):
+        """Nilai tiap baris (list), dibaca per chunk dari database."""
+        if queryset is None:
+            queryset = self.get_queryset()
+        getters = [_getter(value) for _, value in self.columns]
+        for number, obj in enumerate(queryset.iterator(chunk_size=CHUNK_SIZE), 1):
+            row = [getter(obj) for getter in getters]
+            yield [number] + row if self.numbered else row
+
+
+def _getter(value):
+    if callable(value):
+        return value
+    path = value.split('.')
+
+    def get(obj):
+        for attr in path:
+            obj = getattr(obj, attr, None)
+            if obj is None:
+                return None
+        return obj
+    return get
+
+
+def register(name, get_queryset, columns, filename, sheet_title, **kwargs):
+    EXPORTS[name] = TableExport(name, get_queryset, columns, filename, sheet_title, **kwargs)
+    return EXPORTS[name]
+
+
+def get_export(name):
+    try:
+        return EXPORTS[name]
+    except KeyError:
+        raise LookupError(f'Unknown export: {name}')
+
+
+def register_data(name, get_queryset, columns, updated_field='updated_at'):
+    DATA_EXPORTS[name] = TableExport(name, get_queryset, columns, name, updated_field=updated_field)
+    return DATA_EXPORTS[name]
+
+
+def get_data_export(name):
+    try:
+        return DATA_EXPORTS[name]
+    except KeyError:
+        raise LookupError(f'Unknown data export: {name}')
+
+
+def write_xlsx(export, fileobj, queryset=None):
+    """Tulis export ke ``fileobj`` dengan workbook write-only."""
+    import openpyxl
+
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet(export.sheet_title)
+    sheet.append(export.headers)
+    for row in export.rows(queryset):
+        sheet.append(row)
+    workbook.save(fileobj)
+
+
+def _stream_file(fileobj):
+    try:
+        yield from FileWrapper(fileobj, STREAM_BLOCK_SIZE)
+    finally:
+        fileobj.close()
+
+
+def file_response(fileobj, filename, content_type):
+    """Kirim file sementara secara bertahap lalu tutup (dan hapus) file-nya."""
+    fileobj.seek(0, 2)
+    size = fileobj.tell()
+    fileobj.seek(0)
+    response = StreamingHttpResponse(_stream_file(fileobj), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename={filename}'
+    response['Content-Length'] = str(size)
+    return response
+
+
+def xlsx_response(name, queryset=None):
+    export = get_export(name)
+    output = tempfile.TemporaryFile(suffix='.xlsx')
+    write_xlsx(export, output, queryset)
+    return file_response(output, f'{export.filename}.xlsx', XLSX_CONTENT_TYPE)
+
+
+class _Echo:
+    """Objek 'file' untuk csv.writer yang langsung mengembalikan baris tertulis."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def csv_lines(export, queryset=None):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(export.headers)
+    for row in export.rows(queryset):
+        yield writer.writerow([_csv_value(value) for value in row])
+
+
+def csv_response(export, queryset=None):
+    response = StreamingHttpResponse(csv_lines(export, queryset), content_type=CSV_CONTENT_TYPE)
+    response['Content-Disposition'] = f'attachment; filename={export.filename}.csv'
+    return response
+
+
+def parquet_available():
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def write_parquet(export, fileobj, queryset=None):
+    """Tulis export sebagai Parquet, satu row group per ``CHUNK_SIZE`` baris."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    headers = export.headers
+    schema = None
+    writer = None
+    try:
+        for batch in _batches(export.rows(queryset), CHUNK_SIZE):
+            data = dict(zip(headers, (list(column) for column in zip(*batch))))
+            if schema is None:
+                # Kolom yang seluruhnya kosong di batch pertama dianggap teks
+                inferred = pa.Table.from_pydict(data).schema
+                schema = pa.schema([
+                    pa.field(field.name, pa.string() if pa.types.is_null(field.type) else field.type)
+                    for field in inferred
+                ])
+                writer = pq.ParquetWriter(fileobj, schema)
+            writer.write_table(pa.Table.from_pydict(data, schema=schema))
+        if writer is None:
+            schema = pa.schema([pa.field(header, pa.string()) for header in headers])
+            writer = pq.ParquetWriter(fileobj, schema)
+            writer.write_table(schema.empty_table())
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def parquet_response(export, queryset=None):
+    output = tempfile.TemporaryFile(suffix='.parquet')
+    write_parquet(export, output, queryset)
+    return file_response(output, f'{export.filename}.parquet', PARQUET_CONTENT_TYPE)
+
+
+DATA_FORMATS = ('csv', 'parquet', 'xlsx')
+
+
+def data_export_response(name, fmt, updated_since=None):
+    """
+    Response export data mentah ``name`` dalam format ``fmt``.
+    Parquet jatuh ke CSV jika pyarrow tidak terpasang.
+    """
+    export = get_data_export(name)
+    queryset = export.get_queryset()
+    if updated_since is not None:
+        queryset = queryset.filter(**{f'{export.updated_field}__gte': updated_since})
+    queryset = queryset.order_by(export.updated_field, 'pk')
+    last_updated = queryset.aggregate(last=Max(export.updated_field))['last']
+
+    if fmt == 'parquet' and parquet_available():
+        response = parquet_response(export, queryset)
+    elif fmt == 'xlsx':
+        output = tempfile.TemporaryFile(suffix='.xlsx')
+        write_xlsx(export, output, queryset)
+        response = file_response(output, f'{export.filename}.xlsx', XLSX_CONTENT_TYPE)
+    else:
+        fmt = 'csv'
+        response = csv_response(export, queryset)
+    response['X-Export-Format'] = fmt
+    if last_updated:
+        # Dipakai sebagai ?updated_since= pada sinkronisasi berikutnya
+        response['X-Last-Updated'] = last_updated.isoformat()
+    return response
+
+
+def _date(value, fmt='%Y-%m-%d'):
+    return value.strftime(fmt) if value else ''
+
+
+register(
+    'asn',
+    lambda: ASN.objects.all(),
+    columns=[
+        ('NIP', 'nip'),
+        ('Nama', 'nama'),
+        ('Tempat Lahir', 'tempat_lahir'),
+        ('Tanggal Lahir', lambda asn: _date(asn.tanggal_lahir)),
+        ('Jenis Kelamin', lambda asn: asn.get_jenis_kelamin_display()),
+        ('Agama', 'agama'),
+        ('Alamat', 'alamat'),
+        ('Email', 'email'),
+        ('Telepon', 'telepon'),
+        ('Jabatan', 'jabatan'),
+        ('Pangkat', 'pangkat'),
+        ('Golongan', 'golongan'),
+        ('Unit Kerja', 'unit_kerja'),
+    ],
+    filename='asn_data',
+    sheet_title='ASN Data',
+)
+
+register(
+    'siswa',
+    lambda: Siswa.objects.all(),
+    columns=[
+        ('NIS', 'nis'),
+        ('Nama', 'nama'),
+        ('Kelas', 'kelas'),
+        ('Jurusan', 'jurusan'),
+        ('Alamat', 'alamat'),
+        ('No HP', 'no_hp'),
+        ('Nama Orang Tua', 'nama_orang_tua'),
+    ],
+    filename='siswa_data',
+    sheet_title='Siswa Data',
+)
+
+register(
+    'siswa_keluar',
+    lambda: SiswaKeluar.objects.select_related('siswa').order_by('-tanggal_keluar'),
+    columns=[
+        ('Nama Siswa', 'siswa.nama'),
+        ('NIS', 'siswa.nis'),
+        ('Kelas', 'siswa.kelas'),
+        ('Jurusan', 'siswa.jurusan'),
+        ('Tanggal Keluar', 'tanggal_keluar'),
+        ('Alasan Keluar', 'alasan_keluar'),
+        ('Tanggal Dicatat', lambda sk: _date(sk.created_at, '%Y-%m-%d %H:%M:%S')),
+    ],
+    filename='siswa_keluar_data',
+    sheet_title='Siswa Keluar Data',
+    numbered=True,
+)
+
+register(
+    'spmt',
+    lambda: SPMT.objects.select_related('penandatangan', 'pegawai').order_by('pk'),
+    columns=[
+        ('Nomor Surat', 'nomor_surat'),
+        ('Tempat Ditetapkan', 'tempat_ditetapkan'),
+        ('Tanggal Surat', lambda spmt: _date(spmt.tanggal_surat)),
+        ('Penandatangan (Nama)', 'penandatangan.nama'),
+        ('Penandatangan (NIP)', 'penandatangan.nip'),
+        ('Pegawai (Nama)', 'pegawai.nama'),
+        ('Pegawai (NIP)', 'pegawai.nip'),
+        ('Peraturan', 'peraturan'),
+        ('Nomor Peraturan', 'nomor_peraturan'),
+        ('Tahun Peraturan', 'tahun_peraturan'),
+        ('Tentang', 'tentang'),
+        ('Tanggal Terhitung Mulai', lambda spmt: _date(spmt.tanggal_terhitung)),
+        ('Sebagai', 'sebagai'),
+        ('Tempat Tugas', 'tempat_tugas'),
+        ('Created At', lambda spmt: _date(spmt.created_at, '%Y-%m-%d %H:%M:%S')),
+        ('Updated At', lambda spmt: _date(spmt.updated_at, '%Y-%m-%d %H:%M:%S')),
+    ],
+    filename='spmt_data',
+    sheet_title='SPMT Data',
+)
+
+
+register_data(
+    'asn',
+    lambda: ASN.objects.all(),
+    columns=[
+        'id', 'nip', 'nama', 'tempat_lahir', 'tanggal_lahir', 'jenis_kelamin', 'agama', 'alamat',
+        'email', 'telepon', 'jabatan', 'pangkat', 'golongan', 'unit_kerja', 'pendidikan_terakhir',
+        'tmt_pangkat', 'tmt_cpns', 'tmt_jabatan', 'created_at', 'updated_at',
+    ],
+)
+
+register_data(
+    'siswa',
+    lambda: Siswa.objects.all(),
+    columns=['id', 'nis', 'nama', 'kelas', 'jurusan', 'alamat', 'no_hp', 'nama_orang_tua', 'status', 'updated_at'],
+)
+
+register_data(
+    'surat_cuti',
+    lambda: SuratCuti.objects.select_related('pegawai', 'penandatangan'),
+    columns=[
+        'id', 'nomor_surat', 'tanggal_surat', 'jenis_cuti', 'pegawai_id',
+        ('pegawai_nip', 'pegawai.nip'), ('pegawai_nama', 'pegawai.nama'),
+        'tanggal_awal', 'tanggal_akhir', 'hari_efektif', 'alasan_cuti',
+        ('penandatangan_nip', 'penandatangan.nip'), 'created_at', 'updated_at',
+    ],
+)
+
+register_data(
+    'spt',
+    lambda: SuratPerintahTugas.objects.select_related('penandatangan', 'kuasa_pengguna_anggaran').prefetch_related('peserta'),
+    columns=[
+        'id', 'nomor_spt', 'nama_kegiatan', 'tempat_pelaksanaan', 'waktu_pelaksanaan',
+        'tanggal_pelaksanaan', 'tanggal_akhir_pelaksanaan', 'tempat_ditetapkan', 'tanggal_ditetapkan',
+        'sifat_surat', ('penandatangan_nip', 'penandatangan.nip'),
+        ('kuasa_pengguna_anggaran_nip', 'kuasa_pengguna_anggaran.nip'),
+        ('peserta_nip', lambda spt: ';'.join(p.nip or '' for p in spt.peserta.all())),
+        'created_at', 'updated_at',
+    ],
+)
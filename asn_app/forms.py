@@ -9,6 +9,8 @@ from .models import (
     SuratUndangan, PesertaNotaDinas, SuratDispensasi, PesertaDispensasi,
     SuratUsulan, PesertaSuratUsulan, StSatyalancana, DRHSatyalancana, DasarSurat, SuratPengantar
 )
+from .autocomplete import get_source
+from .widgets import AutocompleteFormMixin, AutocompleteSelect
 
 
 class FotoKegiatanForm(forms.ModelForm):
@@ -93,7 +95,7 @@ class KopSuratForm(forms.ModelForm):
         }
 
 
-class SPTForm(forms.ModelForm):
+class SPTForm(AutocompleteFormMixin, forms.ModelForm):
     class Meta:
         model = SuratPerintahTugas
         fields = '__all__'
@@ -140,7 +142,7 @@ class SPTForm(forms.ModelForm):
         return cleaned_data
 
 
-class SuratSantunanKorpriForm(forms.ModelForm):
+class SuratSantunanKorpriForm(AutocompleteFormMixin, forms.ModelForm):
     class Meta:
         model = SuratSantunanKorpri
         fields = '__all__'
@@ -165,7 +167,7 @@ class SuratSantunanKorpriForm(forms.ModelForm):
         self.fields['pegawai'].label_from_instance = lambda obj: obj.nama
         self.fields['penandatangan'].label_from_instance = lambda obj: obj.nama
 
-class NotaDinasForm(forms.ModelForm):
+class NotaDinasForm(AutocompleteFormMixin, forms.ModelForm):
     SIFAT_CHOICES = [
         ('Penting', 'Penting'),
         ('Biasa', 'Biasa'),
@@ -197,6 +199,8 @@ class NotaDinasForm(forms.ModelForm):
         self.fields['pegawai'].label_from_instance = lambda obj: obj.nama
         self.fields['penanda_tangan'].label_from_instance = lambda obj: obj.nama
         self.fields['siswa'].label_from_instance = lambda obj: f"{obj.nama} - {obj.kelas}"
+        # Filter kelas/jurusan di template ikut dikirim ke autocomplete siswa
+        self.fields['siswa'].widget.forward = {'kelas': '#filter-kelas', 'jurusan': '#filter-jurusan'}
         if not self.instance.pk:
             self.fields['kepada'].initial = 'Yth. Gubernur Kepulauan Bangka Belitung'
             self.fields['dari'].initial = 'Kepala SMK Negeri 1 Koba'
@@ -223,7 +227,7 @@ class HariLiburForm(forms.ModelForm):
             'nama_hari': forms.TextInput(attrs={'class': 'form-control'}),
         }
 
-class SuratCutiForm(forms.ModelForm):
+class SuratCutiForm(AutocompleteFormMixin, forms.ModelForm):
     class Meta:
         model = SuratCuti
         fields = '__all__'
@@ -260,7 +264,7 @@ class SuratCutiForm(forms.ModelForm):
             raise forms.ValidationError("Tanggal akhir cuti tidak boleh sebelum tanggal awal cuti.")
         return cleaned_data
 
-class SisaCutiForm(forms.ModelForm):
+class SisaCutiForm(AutocompleteFormMixin, forms.ModelForm):
     class Meta:
         model = SisaCuti
         exclude = ('total_sisa_cuti', 'sisa_tahun_n', 'sisa_tahun_n_1', 'sisa_tahun_n_2',) # Exclude calculated fields
@@ -293,8 +297,8 @@ class SiswaForm(forms.ModelForm):
         }
 
 
-class SuratKeteranganForm(forms.ModelForm):
-    person = forms.ChoiceField(label='Pilih Pegawai atau Siswa', required=True, widget=forms.Select(attrs={'class': 'form-control'}))
+class SuratKeteranganForm(AutocompleteFormMixin, forms.ModelForm):
+    person = forms.CharField(label='Pilih Pegawai atau Siswa', required=True, widget=AutocompleteSelect('person', attrs={'class': 'form-control'}))
 
     class Meta:
         model = SuratKeterangan
@@ -314,25 +318,19 @@ class SuratKeteranganForm(forms.ModelForm):
         self.fields['penandatangan'].queryset = ASN.objects.all().order_by('nama')
         self.fields['penandatangan'].label_from_instance = lambda obj: obj.nama
 
-        # Build choices for person
-        choices = []
-        for asn in ASN.objects.all().order_by('nama'):
-            choices.append((f'pegawai_{asn.id}', f'Pegawai: {asn.nama}'))
-        for siswa in Siswa.objects.all().order_by('nama'):
-            choices.append((f'siswa_{siswa.id}', f'Siswa: {siswa.nama}'))
-        self.fields['person'].choices = choices
-
-        # Set initial if instance exists
+        # Pilihan Pegawai/Siswa dimuat lewat autocomplete ('pegawai_<id>' / 'siswa_<id>')
         if self.instance and self.instance.pk:
-            if self.instance.pegawai:
-                self.fields['person'].initial = f'pegawai_{self.instance.pegawai.id}'
-            elif self.instance.siswa:
-                self.fields['person'].initial = f'siswa_{self.instance.siswa.id}'
+            if self.instance.pegawai_id:
+                self.fields['person'].initial = f'pegawai_{self.instance.pegawai_id}'
+            elif self.instance.siswa_id:
+                self.fields['person'].initial = f'siswa_{self.instance.siswa_id}'
 
     def clean_person(self):
         person_value = self.cleaned_data.get('person')
         if not person_value:
             raise forms.ValidationError("Anda harus memilih Pegawai atau Siswa.")
+        if get_source('person').get_object(person_value) is None:
+            raise forms.ValidationError("Pegawai atau Siswa tidak ditemukan.")
         return person_value
 
     def save(self, commit=True):
@@ -357,7 +355,7 @@ class SuratKeteranganForm(forms.ModelForm):
         return instance
 
 
-class SuratRekomendasiStudiLanjutForm(forms.ModelForm):
+class SuratRekomendasiStudiLanjutForm(AutocompleteFormMixin, forms.ModelForm):
     class Meta:
         model = SuratRekomendasiStudiLanjut
         fields = '__all__'
@@ -382,7 +380,7 @@ class SuratRekomendasiStudiLanjutForm(forms.ModelForm):
         self.fields['pegawai'].label_from_instance = lambda obj: obj.nama
 
 
-class SuratKP4Form(forms.ModelForm):
+class SuratKP4Form(AutocompleteFormMixin, forms.ModelForm):
     class Meta:
         model = SuratKP4
         fields = ['kop_surat', 'pegawai', 'penandatangan', 'status_kepegawaian', 'masa_kerja_golongan', 'digaji_menurut', 'tempat_ditetapkan', 'tanggal_ditetapkan']
@@ -427,7 +425,7 @@ AnggotaKeluargaKP4FormSet = inlineformset_factory(
 )
 
 
-class SuratResmiForm(forms.ModelForm):
+class SuratResmiForm(AutocompleteFormMixin, forms.ModelForm):
     class Meta:
         model = SuratResmi
         fields = '__all__'
@@ -461,7 +459,7 @@ class SuratResmiForm(forms.ModelForm):
         self.fields['pegawai'].label_from_instance = lambda obj: obj.nama
 
 
-class SPTJMForm(forms.ModelForm):
+class SPTJMForm(AutocompleteFormMixin, forms.ModelForm):
     class Meta:
         model = SPTJM
         fields = '__all__'
@@ -521,7 +519,7 @@ JABATAN_CHOICES = [
     ('Asisten Perpustakaan Terampil', 'Asisten Perpustakaan Terampil'),
 ]
 
-class SPMTForm(forms.ModelForm):
+class SPMTForm(AutocompleteFormMixin, forms.ModelForm):
     sebagai = forms.ChoiceField(choices=JABATAN_CHOICES, widget=forms.Select(attrs={'class': 'form-control'}))
     class Meta:
         model = SPMT
@@ -550,7 +548,7 @@ class SPMTForm(forms.ModelForm):
         self.fields['pegawai'].label_from_instance = lambda obj: obj.nama
         self.fields['kop_surat'].label_from_instance = lambda obj: obj.nama
 
-class SuratUmumForm(forms.ModelForm):
+class SuratUmumForm(AutocompleteFormMixin, forms.ModelForm):
     class Meta:
         model = SuratUmum
         fields = '__all__'
@@ -575,7 +573,7 @@ class SuratUmumForm(forms.ModelForm):
         self.fields['penandatangan'].label_from_instance = lambda obj: obj.nama
 
 
-class SuratPanggilanSiswaForm(forms.ModelForm):
+class SuratPanggilanSiswaForm(AutocompleteFormMixin, forms.ModelForm):
     class Meta:
         model = SuratPanggilanSiswa
         fields = '__all__'
@@ -609,7 +607,7 @@ class SuratPanggilanSiswaForm(forms.ModelForm):
         self.fields['wakasek_kesiswaan'].label_from_instance = lambda obj: f'{obj.nama} - {obj.jabatan}'
         self.fields['kop_surat'].label_from_instance = lambda obj: obj.nama
 
-class SuratUndanganForm(forms.ModelForm):
+class SuratUndanganForm(AutocompleteFormMixin, forms.ModelForm):
     class Meta:
         model = SuratUndangan
         fields = '__all__'
@@ -641,7 +639,7 @@ class SuratUndanganForm(forms.ModelForm):
         self.fields['kepala_sekolah'].label_from_instance = lambda obj: f'{obj.nama} - {obj.jabatan}'
         self.fields['kop_surat'].label_from_instance = lambda obj: obj.nama
 
-class SiswaKeluarForm(forms.ModelForm):
+class SiswaKeluarForm(AutocompleteFormMixin, forms.ModelForm):
     class Meta:
         model = SiswaKeluar
         fields = '__all__'
@@ -657,7 +655,7 @@ class SiswaKeluarForm(forms.ModelForm):
         self.fields['siswa'].label_from_instance = lambda obj: f'{obj.nama} - {obj.kelas} - {obj.jurusan if obj.jurusan else ""}'
 
 
-class PesertaNotaDinasForm(forms.ModelForm):
+class PesertaNotaDinasForm(AutocompleteFormMixin, forms.ModelForm):
     class Meta:
         model = PesertaNotaDinas
         fields = ['pegawai', 'siswa', 'peran', 'bidang_lomba']
@@ -678,7 +676,7 @@ class PesertaNotaDinasForm(forms.ModelForm):
         self.fields['siswa'].empty_label = '-- Pilih Siswa --'
 
 
-class PesertaNotaDinasCRUDForm(forms.ModelForm):
+class PesertaNotaDinasCRUDForm(AutocompleteFormMixin, forms.ModelForm):
     class Meta:
         model = PesertaNotaDinas
         fields = ['nota_dinas', 'pegawai', 'siswa', 'peran', 'bidang_lomba']
@@ -717,7 +715,7 @@ class PesertaNotaDinasFormSet(BasePesertaNotaDinasFormSet):
         return super().save_new(form, commit=commit)
 
 
-class PesertaDispensasiForm(forms.ModelForm):
+class PesertaDispensasiForm(AutocompleteFormMixin, forms.ModelForm):
     class Meta:
         model = PesertaDispensasi
         fields = ['siswa', 'guru', 'ket']
@@ -800,7 +798,7 @@ class PesertaDispensasiFormSet(PesertaDispensasiBaseFormSet):
         return super().save_new(form, commit=commit)
 
 
-class SuratDispensasiForm(forms.ModelForm):
+class SuratDispensasiForm(AutocompleteFormMixin, forms.ModelForm):
     class Meta:
         model = SuratDispensasi
         fields = ['nomor_surat', 'nama_kegiatan', 'tanggal_awal', 'tanggal_akhir', 'waktu', 'tempat', 'tempat_ditetapkan', 'tanggal_ditetapkan', 'penandatangan', 'kop_surat']
@@ -827,7 +825,7 @@ class SuratDispensasiForm(forms.ModelForm):
             self.fields['nomor_surat'].initial = '800.1.11.1/' + str(SuratDispensasi.objects.count() + 1).zfill(3) + '/SMKN1KB/' + str(__import__('datetime').datetime.now().year)
 
 
-class SuratUsulanForm(forms.ModelForm):
+class SuratUsulanForm(AutocompleteFormMixin, forms.ModelForm):
     SIFAT_CHOICES = [
         ('Penting', 'Penting'),
         ('Biasa', 'Biasa'),
@@ -871,7 +869,7 @@ class SuratUsulanForm(forms.ModelForm):
                 self.fields['kop_surat'].initial = default_kop_surat.pk
 
 
-class PesertaSuratUsulanForm(forms.ModelForm):
+class PesertaSuratUsulanForm(AutocompleteFormMixin, forms.ModelForm):
     class Meta:
         model = PesertaSuratUsulan
         fields = ['pegawai', 'siswa', 'tanggal_kegiatan', 'tempat_kegiatan']
@@ -892,7 +890,7 @@ class PesertaSuratUsulanForm(forms.ModelForm):
         self.fields['siswa'].empty_label = '-- Pilih Siswa --'
 
 
-class PesertaSuratUsulanCRUDForm(forms.ModelForm):
+class PesertaSuratUsulanCRUDForm(AutocompleteFormMixin, forms.ModelForm):
     class Meta:
         model = PesertaSuratUsulan
         fields = ['surat_usulan', 'pegawai', 'siswa', 'tanggal_kegiatan', 'tempat_kegiatan']
@@ -931,12 +929,13 @@ class PesertaSuratUsulanFormSet(BasePesertaSuratUsulanFormSet):
         return super().save_new(form, commit=commit)
 
 
-class StSatyalancanaForm(forms.ModelForm):
+class StSatyalancanaForm(AutocompleteFormMixin, forms.ModelForm):
     class Meta:
         model = StSatyalancana
         fields = '__all__'
         widgets = {
             'dasar_surat': forms.Textarea(attrs={'rows': 5, 'class': 'form-control'}),
+            'kepada_pegawai': forms.Select(attrs={'class': 'form-control'}),
             'kepada_nama': forms.TextInput(attrs={'class': 'form-control', 'id': 'id_kepada_nama'}),
             'kepada_nip': forms.TextInput(attrs={'class': 'form-control', 'id': 'id_kepada_nip'}),
             'kepada_pangkat_gol': forms.TextInput(attrs={'class': 'form-control', 'id': 'id_kepada_pangkat_gol'}),
@@ -964,7 +963,7 @@ class StSatyalancanaForm(forms.ModelForm):
             self.fields['nomor'].initial = '800/......../DISDIK/2026'
 
 
-class DRHSatyalancanaForm(forms.ModelForm):
+class DRHSatyalancanaForm(AutocompleteFormMixin, forms.ModelForm):
     class Meta:
         model = DRHSatyalancana
         fields = '__all__'
@@ -999,7 +998,7 @@ class DRHSatyalancanaForm(forms.ModelForm):
             self.fields['cltn'].initial = 'tidak pernah mengambil cuti di luar tanggungan negara (CLTN)'
 
 
-class SuratPengantarForm(forms.ModelForm):
+class SuratPengantarForm(AutocompleteFormMixin, forms.ModelForm):
     class Meta:
         model = SuratPengantar
         fields = '__all__'
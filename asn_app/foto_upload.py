@@ -0,0 +1,102 @@
+# asn_app/foto_upload.py
+"""
+Upload banyak foto kegiatan sekaligus.
+
+Setiap foto disimpan dan dibuatkan versi cetak/thumbnail (lihat
+``FotoTurunanMixin``) di thread pool (``asn_app/parallel.py``). Pekerjaan di
+thread tidak menyentuh database; semua baris ``FotoKegiatan`` satu batch
+disimpan dengan satu ``bulk_create``.
+
+Progres disimpan di cache ``upload_progress`` (file-based, lihat ``CACHES``)
+dengan kunci ``upload_id`` dari halaman upload, yang mem-polling
+``upload_foto_kegiatan_progress`` selama request berjalan. Polling bisa
+ditangani proses server lain, jadi cache ini harus bisa dibaca semua proses.
+"""
+import logging
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .models import FotoKegiatan
+from .parallel import map_parallel
+from .pdf import DOCUMENTS
+from . import pdf_cache
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_TIMEOUT = 60 * 60
+MAX_UPLOAD_ID_LENGTH = 64
+PROGRESS_CACHE = 'upload_progress'
+
+
+# --- Progres ---
+
+def _progress_cache():
+    if PROGRESS_CACHE in settings.CACHES:
+        return caches[PROGRESS_CACHE]
+    return caches['default']
+
+
+def _progress_key(upload_id):
+    return f'foto_upload:{upload_id}'
+
+
+def valid_upload_id(upload_id):
+    return bool(upload_id) and len(upload_id) <= MAX_UPLOAD_ID_LENGTH and upload_id.replace('-', '').isalnum()
+
+
+def set_progress(upload_id, **data):
+    if valid_upload_id(upload_id):
+        _progress_cache().set(_progress_key(upload_id), data, PROGRESS_TIMEOUT)
+
+
+def get_progress(upload_id):
+    if not valid_upload_id(upload_id):
+        return None
+    return _progress_cache().get(_progress_key(upload_id))
+
+
+# --- Upload ---
+
+def _prepare(instance, upload):
+    """Simpan file asli + turunannya untuk satu foto (dijalankan di thread)."""
+    try:
+        instance.foto.save(upload.name, upload, save=False)
+        upload.seek(0)
+        if not instance.build_foto_turunan(upload):
+            instance.foto.delete(save=False)
+            return 'bukan file gambar'
+        return None
+    except Exception as e:
+        logger.error(f"Error saving uploaded photo {upload.name}: {e}", exc_info=True)
+        return str(e)
+
+
+def save_foto_batch(spt, files, keterangan=None, upload_id=None):
+    """
+    Simpan ``files`` sebagai foto kegiatan ``spt``. Mengembalikan
+    ``(foto_tersimpan, jumlah_gagal)``.
+    """
+    files = list(files)
+    instances = [FotoKegiatan(spt=spt, keterangan=keterangan) for _ in files]
+    total = len(files)
+    lock = threading.Lock()
+    state = {'done': 0}
+
+    def on_done():
+        with lock:
+            state['done'] += 1
+            done = state['done']
+        set_progress(upload_id, status='processing', done=done, total=total)
+
+    set_progress(upload_id, status='processing', done=0, total=total)
+    errors = map_parallel(lambda pair: _prepare(*pair), zip(instances, files), on_done=on_done)
+    saved = [instance for instance, error in zip(instances, errors) if error is None]
+    if saved:
+        FotoKegiatan.objects.bulk_create(saved)
+        # bulk_create tidak mengirim post_save: cache PDF foto SPT ini dihapus langsung
+        pdf_cache.invalidate_instance(saved[0], DOCUMENTS.values())
+    failed = total - len(saved)
+    set_progress(upload_id, status='done', done=total, total=total, saved=len(saved), failed=failed)
+    return saved, failed
@@ -0,0 +1,92 @@
+# asn_app/images.py
+"""
+Pengolahan gambar dengan Pillow untuk keperluan cetak.
+"""
+import io
+import logging
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Kop surat dicetak selebar kertas A4 (21 cm); 200 DPI sudah tajam untuk cetak
+KOP_SURAT_PRINT_DPI = 200
+KOP_SURAT_MAX_WIDTH = round(21 / 2.54 * KOP_SURAT_PRINT_DPI)
+
+
+def make_kop_surat_print(source):
+    """Buat versi cetak kop surat: diperkecil ke lebar cetak dan dikompres ulang.
+
+    ``source`` adalah file (path atau objek file) gambar asli. Mengembalikan
+    ``ContentFile`` PNG, atau None jika gambar tidak bisa dibaca.
+    """
+    try:
+        with Image.open(source) as image:
+            image = ImageOps.exif_transpose(image)
+            if image.width > KOP_SURAT_MAX_WIDTH:
+                height = round(image.height * KOP_SURAT_MAX_WIDTH / image.width)
+                image = image.resize((KOP_SURAT_MAX_WIDTH, height), Image.LANCZOS)
+
+            # Kop surat umumnya teks + logo dengan sedikit warna: palet 256
+            # warna memperkecil file secara signifikan tanpa terlihat bedanya
+            if image.mode in ('RGBA', 'LA') or 'transparency' in image.info:
+                image = image.convert('RGBA').quantize(colors=256, method=Image.FASTOCTREE)
+            else:
+                image = image.convert('RGB').quantize(colors=256)
+
+            buffer = io.BytesIO()
+            image.save(buffer, format='PNG', optimize=True, dpi=(KOP_SURAT_PRINT_DPI, KOP_SURAT_PRINT_DPI))
+    except (OSError, ValueError) as e:
+        logger.error(f"Error creating kop surat print image: {e}")
+        return None
+    return ContentFile(buffer.getvalue())
+
+
+# Foto (kegiatan, ASN, Siswa): versi cetak untuk PDF dan thumbnail untuk halaman
+# daftar/detail. Sel foto di PDF laporan kegiatan sekitar 10 x 9 cm; sisi
+# terpanjang 1200 px (~15 cm pada 200 DPI) masih tajam untuk semua template.
+FOTO_PRINT_MAX_SIZE = 1200
+FOTO_PRINT_QUALITY = 82
+FOTO_THUMB_MAX_SIZE = 400
+FOTO_THUMB_QUALITY = 75
+
+
+def _rgb(image):
+    """Gambar RGB; bagian transparan diberi latar putih (JPEG tanpa alpha)."""
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def _jpeg(image, max_size, quality, icc_profile=None):
+    image = image.copy()
+    image.thumbnail((max_size, max_size), Image.LANCZOS)
+    buffer = io.BytesIO()
+    # EXIF (lokasi GPS, kamera, orientasi) tidak ikut disimpan; profil warna dipertahankan
+    image.save(buffer, format='JPEG', quality=quality, optimize=True, progressive=True, icc_profile=icc_profile)
+    return ContentFile(buffer.getvalue())
+
+
+def make_foto_derivatives(source):
+    """Buat versi cetak dan thumbnail sebuah foto.
+
+    Orientasi EXIF diterapkan ke piksel, metadata dibuang dan gambar
+    dikompres ulang sebagai JPEG. Mengembalikan ``(cetak, thumb)`` berupa
+    ``ContentFile``, atau None jika gambar tidak bisa dibaca.
+    """
+    try:
+        with Image.open(source) as image:
+            # JPEG besar cukup di-decode pada skala yang mendekati ukuran cetak
+            image.draft('RGB', (FOTO_PRINT_MAX_SIZE, FOTO_PRINT_MAX_SIZE))
+            icc_profile = image.info.get('icc_profile')
+            image = _rgb(ImageOps.exif_transpose(image))
+            cetak = _jpeg(image, FOTO_PRINT_MAX_SIZE, FOTO_PRINT_QUALITY, icc_profile)
+            thumb = _jpeg(image, FOTO_THUMB_MAX_SIZE, FOTO_THUMB_QUALITY, icc_profile)
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        logger.error(f"Error creating photo derivatives: {e}")
+        return None
+    return cetak, thumb
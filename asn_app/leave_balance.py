@@ -0,0 +1,252 @@
+# asn_app/leave_balance.py
+"""
+Pemeliharaan SisaCuti secara inkremental.
+
+Hari cuti terpakai per tahun (N, N-1, N-2) disimpan di SisaCuti. Saat satu
+SuratCuti disimpan/dihapus, signal hanya menambah/mengurangi selisih
+hari_efektif pada tahun yang bersangkutan lalu menerapkan ulang aturan sisa
+(``SisaCuti.carry_over``), tanpa membaca ulang semua surat cuti pegawai.
+
+``check_balances`` membandingkan nilai tersimpan dengan hitung ulang penuh
+dan bisa memperbaikinya (``python manage.py check_sisa_cuti --repair``).
+
+Bucket N selalu merujuk ke ``SisaCuti.tahun_n``, bukan ke tanggal hari ini.
+``rollover`` (``python manage.py rollover_sisa_cuti``) menyimpan saldo akhir
+tahun ke RiwayatSisaCuti lalu menggeser bucket semua pegawai dengan satu
+UPDATE.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Case, F, Min, Sum, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import RiwayatSisaCuti, SisaCuti, SuratCuti
+
+DEFAULT_ALLOCATION = {
+    'initial_tahun_n': 12,
+    'initial_tahun_n_1': 6,
+    'initial_tahun_n_2': 6,
+    'sisa_tahun_n': 12,
+    'sisa_tahun_n_1': 6,
+    'sisa_tahun_n_2': 6,
+}
+
+CHECKED_FIELDS = [
+    'terpakai_tahun_n', 'terpakai_tahun_n_1', 'terpakai_tahun_n_2',
+    'sisa_tahun_n', 'sisa_tahun_n_1', 'sisa_tahun_n_2', 'total_sisa_cuti',
+]
+
+SNAPSHOT_FIELDS = [
+    'initial_tahun_n', 'initial_tahun_n_1', 'initial_tahun_n_2',
+] + CHECKED_FIELDS
+
+
+def leave_snapshot(pegawai_id, tanggal_awal, hari_efektif):
+    """(pegawai_id, tahun, hari) satu surat cuti, atau None jika belum lengkap."""
+    if not pegawai_id or not tanggal_awal:
+        return None
+    return (pegawai_id, tanggal_awal.year, hari_efektif or 0)
+
+
+def leave_deltas(old, new):
+    """Selisih hari terpakai ``{(pegawai_id, tahun): hari}`` dari dua snapshot."""
+    deltas = defaultdict(int)
+    if old is not None:
+        deltas[old[:2]] -= old[2]
+    if new is not None:
+        deltas[new[:2]] += new[2]
+    return {key: days for key, days in deltas.items() if days}
+
+
+def apply_deltas(deltas):
+    """
+    Terapkan selisih hari terpakai ke SisaCuti pegawai yang bersangkutan.
+    Pegawai yang belum punya SisaCuti dibuatkan lalu dihitung penuh sekali.
+    """
+    per_pegawai = defaultdict(dict)
+    for (pegawai_id, year), days in deltas.items():
+        if days:
+            per_pegawai[pegawai_id][year] = per_pegawai[pegawai_id].get(year, 0) + days
+    if not per_pegawai:
+        return 0
+
+    updated = 0
+    with transaction.atomic():
+        existing = {
+            sisa_cuti.pegawai_id: sisa_cuti
+            for sisa_cuti in SisaCuti.objects.select_for_update().filter(pegawai_id__in=per_pegawai)
+        }
+        for pegawai_id, years in per_pegawai.items():
+            sisa_cuti = existing.get(pegawai_id)
+            if sisa_cuti is None:
+                if all(days < 0 for days in years.values()):
+                    # Tidak ada saldo yang perlu dikembalikan
+                    continue
+                sisa_cuti, _ = SisaCuti.objects.get_or_create(pegawai_id=pegawai_id, defaults=DEFAULT_ALLOCATION)
+                sisa_cuti.recalculate_and_save()
+                updated += 1
+                continue
+
+            changed = False
+            for year, days in years.items():
+                changed = sisa_cuti.apply_leave_delta(year, days) or changed
+            if changed:
+                sisa_cuti.save(update_fields=SisaCuti.BALANCE_FIELDS)
+                updated += 1
+    return updated
+
+
+def used_days_by_pegawai(years, pegawai_ids=None):
+    """Total hari_efektif ``{pegawai_id: {tahun: hari}}`` dalam satu query."""
+    queryset = SuratCuti.objects.filter(tanggal_awal__year__in=years)
+    if pegawai_ids is not None:
+        queryset = queryset.filter(pegawai_id__in=pegawai_ids)
+    used = defaultdict(dict)
+    rows = (
+        queryset.values_list('pegawai_id', 'tanggal_awal__year')
+        .annotate(total=Sum('hari_efektif'))
+        .order_by()
+    )
+    for pegawai_id, year, total in rows:
+        used[pegawai_id][year] = total or 0
+    return used
+
+
+def expected_balance(sisa_cuti, used, year):
+    """Nilai CHECKED_FIELDS hasil hitung ulang penuh untuk satu SisaCuti."""
+    used_n = used.get(year, 0)
+    used_n_1 = used.get(year - 1, 0)
+    used_n_2 = used.get(year - 2, 0)
+    sisa_n, sisa_n_1, sisa_n_2 = SisaCuti.carry_over(
+        sisa_cuti.initial_tahun_n, sisa_cuti.initial_tahun_n_1, sisa_cuti.initial_tahun_n_2,
+        used_n, used_n_1, used_n_2,
+    )
+    return {
+        'terpakai_tahun_n': used_n,
+        'terpakai_tahun_n_1': used_n_1,
+        'terpakai_tahun_n_2': used_n_2,
+        'sisa_tahun_n': sisa_n,
+        'sisa_tahun_n_1': sisa_n_1,
+        'sisa_tahun_n_2': sisa_n_2,
+        'total_sisa_cuti': sisa_n + sisa_n_1 + sisa_n_2,
+    }
+
+
+def check_balances(repair=False, batch_size=500):
+    """
+    Bandingkan semua SisaCuti dengan hitung ulang penuh.
+
+    Mengembalikan ``(mismatches, missing)``: daftar ``(sisa_cuti, {field:
+    (tersimpan, seharusnya)})`` dan id pegawai yang punya surat cuti tetapi
+    belum punya SisaCuti. Dengan ``repair=True`` keduanya diperbaiki.
+    """
+    year = SisaCuti.get_current_year()
+    stored_years = set(SisaCuti.objects.order_by().values_list('tahun_n', flat=True).distinct()) | {year}
+    used = used_days_by_pegawai(sorted({y - offset for y in stored_years for offset in range(3)}))
+
+    mismatches = []
+    seen = set()
+    for sisa_cuti in SisaCuti.objects.select_related('pegawai').order_by('pk').iterator(chunk_size=batch_size):
+        seen.add(sisa_cuti.pegawai_id)
+        expected = expected_balance(sisa_cuti, used.get(sisa_cuti.pegawai_id, {}), sisa_cuti.tahun_n)
+        diff = {
+            field: (getattr(sisa_cuti, field), value)
+            for field, value in expected.items()
+            if getattr(sisa_cuti, field) != value
+        }
+        if diff:
+            for field, value in expected.items():
+                setattr(sisa_cuti, field, value)
+            mismatches.append((sisa_cuti, diff))
+
+    missing = sorted(set(used) - seen)
+
+    if repair:
+        with transaction.atomic():
+            SisaCuti.objects.bulk_update([sisa_cuti for sisa_cuti, _ in mismatches], CHECKED_FIELDS, batch_size=batch_size)
+            created = []
+            for pegawai_id in missing:
+                sisa_cuti = SisaCuti(pegawai_id=pegawai_id, **DEFAULT_ALLOCATION)
+                for field, value in expected_balance(sisa_cuti, used[pegawai_id], year).items():
+                    setattr(sisa_cuti, field, value)
+                created.append(sisa_cuti)
+            SisaCuti.objects.bulk_create(created, batch_size=batch_size)
+
+    return mismatches, missing
+
+
+def _shift_expressions():
+    """
+    Nilai baru semua bucket setelah digeser satu tahun, sebagai ekspresi SQL.
+
+    Semua ekspresi membaca nilai lama baris (UPDATE SQL mengevaluasi sisi
+    kanan sebelum menulis), dengan aturan yang sama seperti ``carry_over``
+    untuk terpakai N = 0.
+    """
+    zero = Value(0)
+    sisa_n = Greatest(F('initial_tahun_n'), zero)
+    sisa_n_1 = Greatest(F('initial_tahun_n_1') - F('terpakai_tahun_n'), zero)
+    sisa_n_2 = Case(
+        When(terpakai_tahun_n__gt=F('initial_tahun_n_2'), then=zero),
+        default=Greatest(F('initial_tahun_n_2') - F('terpakai_tahun_n_1'), zero),
+    )
+    return {
+        'tahun_n': F('tahun_n') + 1,
+        'terpakai_tahun_n': zero,
+        'terpakai_tahun_n_1': F('terpakai_tahun_n'),
+        'terpakai_tahun_n_2': F('terpakai_tahun_n_1'),
+        'sisa_tahun_n': sisa_n,
+        'sisa_tahun_n_1': sisa_n_1,
+        'sisa_tahun_n_2': sisa_n_2,
+        'total_sisa_cuti': sisa_n + sisa_n_1 + sisa_n_2,
+        'updated_at': timezone.now(),
+    }
+
+
+def pending_rollover_years(to_year=None):
+    """Tahun N tersimpan yang masih lebih lama dari ``to_year``."""
+    to_year = to_year or SisaCuti.get_current_year()
+    return sorted(
+        SisaCuti.objects.filter(tahun_n__lt=to_year).order_by().values_list('tahun_n', flat=True).distinct()
+    )
+
+
+def rollover(to_year=None, batch_size=500):
+    """
+    Geser bucket semua SisaCuti sampai tahun N = ``to_year`` (default tahun ini).
+
+    Tiap langkah satu tahun: saldo akhir tahun disimpan ke RiwayatSisaCuti,
+    lalu bucket digeser dengan satu UPDATE. Surat cuti yang sudah tercatat
+    di tahun baru (dibuat sebelum rollover dijalankan) langsung dibebankan
+    ke bucket N. Mengembalikan ``{tahun_lama: jumlah_baris}``.
+    """
+    to_year = to_year or SisaCuti.get_current_year()
+    result = {}
+    with transaction.atomic():
+        while True:
+            from_year = SisaCuti.objects.filter(tahun_n__lt=to_year).aggregate(year=Min('tahun_n'))['year']
+            if from_year is None:
+                break
+            rows = SisaCuti.objects.filter(tahun_n=from_year)
+
+            RiwayatSisaCuti.objects.bulk_create(
+                [
+                    RiwayatSisaCuti(pegawai_id=values.pop('pegawai_id'), tahun=from_year, **values)
+                    for values in rows.values('pegawai_id', *SNAPSHOT_FIELDS).iterator(chunk_size=batch_size)
+                ],
+                batch_size=batch_size,
+                ignore_conflicts=True,
+            )
+            shifted = set(rows.values_list('pegawai_id', flat=True))
+            result[from_year] = rows.update(**_shift_expressions())
+
+            new_year = from_year + 1
+            used = used_days_by_pegawai([new_year])
+            charged = []
+            for sisa_cuti in SisaCuti.objects.filter(pegawai_id__in=shifted & set(used), tahun_n=new_year):
+                sisa_cuti.apply_leave_delta(new_year, used[sisa_cuti.pegawai_id][new_year])
+                charged.append(sisa_cuti)
+            SisaCuti.objects.bulk_update(charged, CHECKED_FIELDS, batch_size=batch_size)
+    return result
@@ -0,0 +1,164 @@
+# asn_app/management/commands/benchmark_indexes.py
+import re
+import statistics
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.utils.timezone import now
+
+from asn_app.models import ASN, NotaDinas, Siswa, SuratCuti, SuratResmi
+from asn_app.pagination import LATEST_DATE_FIRST, NEWEST_FIRST, PAGE_SIZE, KeysetPaginator
+
+BENCHMARK_MODELS = [ASN, NotaDinas, Siswa, SuratCuti, SuratResmi]
+KELAS = ['X', 'XI', 'XII']
+JURUSAN = ['TKJ', 'RPL', 'TKR', 'TSM', 'AKL', 'OTKP', 'TITL', 'TPM']
+
+# Kolom id/parent/notused di awal baris EXPLAIN QUERY PLAN SQLite
+PLAN_PREFIX = re.compile(r'^\d+ \d+ \d+ ')
+
+
+def benchmark_queries(data):
+    """Query dari views/forms yang dilayani indeks migrasi 0092: ``(nama, fungsi queryset)``."""
+    pegawai, year, since = data['pegawai'], data['year'], data['since']
+    nota_dinas = KeysetPaginator(NotaDinas.objects.all(), PAGE_SIZE, keys=LATEST_DATE_FIRST)
+    return [
+        ('asn_list', lambda: ASN.objects.order_by('nama')[:10]),
+        ('asn_leave_history', lambda: SuratCuti.objects.filter(
+            pegawai=pegawai, tanggal_awal__year=year).order_by('-tanggal_surat')),
+        ('laporan_cuti', lambda: SuratCuti.objects.filter(
+            pegawai=pegawai, tanggal_awal__year__in=[year, year - 1, year - 2]).order_by('tanggal_awal')),
+        ('surat_cuti_list', lambda: SuratCuti.objects.all()[:7]),
+        ('siswa_list', lambda: Siswa.objects.order_by('nama')[:10]),
+        ('siswa_list?jurusan=', lambda: Siswa.objects.filter(jurusan='RPL').order_by('jurusan', 'nama')[:10]),
+        ('siswa_list (rekap kelas)', lambda: Siswa.objects.values('kelas', 'jurusan').annotate(
+            count=Count('id')).order_by('kelas', 'jurusan')),
+        ('import siswa (upsert nis)', lambda: Siswa.objects.filter(nis__in=data['nis'])),
+        ('surat_resmi_list', lambda: SuratResmi.objects.order_by(*NEWEST_FIRST)[:10]),
+        ('nota_dinas_list', lambda: NotaDinas.objects.order_by(*LATEST_DATE_FIRST)[:10]),
+        ('nota_dinas_list?after=', lambda: nota_dinas.rows_after(nota_dinas.cursor(data['nota_dinas']))[:10]),
+        ('data_export?updated_since=', lambda: ASN.objects.filter(
+            updated_at__gte=since).order_by('updated_at', 'pk')),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate a large dataset inside a rolled-back transaction and compare query plans and '
+        'timings of the hot list/filter queries with and without the indexes from migration 0092'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=20000,
+                            help='Rows per letter/Siswa table; ASN gets a tenth, SuratCuti twice (default: 20000)')
+        parser.add_argument('--repeat', type=int, default=20,
+                            help='Runs per query; the median is reported (default: 20)')
+
+    def handle(self, *args, **options):
+        if options['rows'] < 100:
+            raise CommandError('--rows must be at least 100')
+
+        with transaction.atomic():
+            self.stdout.write(f'Generating data ({options["rows"]} rows per table)...')
+            data = self._generate(options['rows'])
+            queries = benchmark_queries(data)
+
+            self._analyze()
+            after = {name: self._measure(get_queryset, options['repeat']) for name, get_queryset in queries}
+            self._drop_indexes()
+            self._analyze()
+            before = {name: self._measure(get_queryset, options['repeat']) for name, get_queryset in queries}
+
+            transaction.set_rollback(True)
+
+        for name, _ in queries:
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            for label, (elapsed, plan) in (('before', before[name]), ('after', after[name])):
+                self.stdout.write(f'  {label:6} {elapsed:9.3f} ms  {plan}')
+        self.stdout.write(self.style.SUCCESS('Done; generated data and dropped indexes were rolled back.'))
+
+    def _generate(self, rows):
+        today = date.today()
+        asn = ASN.objects.bulk_create(
+            ASN(
+                nip=f'9{i:017d}', nama=f'Pegawai Benchmark {i:06d}', tempat_lahir='Koba',
+                tanggal_lahir=date(1970, 1, 1) + timedelta(days=i % 9000), jenis_kelamin='LP'[i % 2],
+                agama='ISLAM', alamat='-', email=f'benchmark{i}@example.com', telepon='-',
+                jabatan='Guru', unit_kerja='SMK Negeri 1 Koba',
+            )
+            for i in range(rows // 10)
+        )
+        SuratCuti.objects.bulk_create(
+            (
+                SuratCuti(
+                    tempat_ditetapkan='Koba', tanggal_surat=today - timedelta(days=i % 1500),
+                    tujuan_surat='-', pegawai=asn[i % len(asn)],
+                    tanggal_awal=today - timedelta(days=i % 1500), tanggal_akhir=today - timedelta(days=i % 1500),
+                )
+                for i in range(rows * 2)
+            ),
+            batch_size=1000,
+        )
+        Siswa.objects.bulk_create(
+            (
+                Siswa(
+                    nama=f'Siswa Benchmark {i:06d}', nis=f'B{i:08d}',
+                    kelas=f'{KELAS[i % len(KELAS)]} {i % 4 + 1}', jurusan=JURUSAN[i % len(JURUSAN)],
+                )
+                for i in range(rows)
+            ),
+            batch_size=1000,
+        )
+        NotaDinas.objects.bulk_create(
+            (
+                NotaDinas(
+                    kepada='-', dari='-', tanggal=today - timedelta(days=i % 1500), nomor=f'ND/{i}',
+                    sifat='Biasa', lampiran='-', hal='Benchmark', isi_surat='-', penutup_surat='-',
+                    penanda_tangan=asn[0],
+                )
+                for i in range(rows)
+            ),
+            batch_size=1000,
+        )
+        SuratResmi.objects.bulk_create(
+            (
+                SuratResmi(
+                    tempat_ditetapkan='Koba', tanggal_ditetapkan=today - timedelta(days=i % 1500),
+                    pejabat_tujuan_surat='-', kota_tujuan_surat='-', nomor=f'SR/{i}', sifat='Biasa',
+                    perihal='Benchmark', pembuka_surat='-', isi_surat='-', penutup_surat='-',
+                )
+                for i in range(rows)
+            ),
+            batch_size=1000,
+        )
+        return {
+            'pegawai': asn[len(asn) // 2],
+            'year': today.year,
+            'nis': [f'B{i:08d}' for i in range(0, rows, rows // 100)],
+            # Halaman tengah: cursor nota dinas di pertengahan urutan
+            'nota_dinas': NotaDinas.objects.order_by(*LATEST_DATE_FIRST)[rows // 2],
+            # Sinkronisasi inkremental yang umum: tidak ada perubahan sejak terakhir
+            'since': now(),
+        }
+
+    def _analyze(self):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def _drop_indexes(self):
+        with connection.cursor() as cursor:
+            for model in BENCHMARK_MODELS:
+                for index in model._meta.indexes:
+                    cursor.execute(f'DROP INDEX {connection.ops.quote_name(index.name)}')
+
+    def _measure(self, get_queryset, repeat):
+        """Median waktu eksekusi (ms) dan rencana query ringkas."""
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            list(get_queryset())
+            timings.append((time.perf_counter() - started) * 1000)
+        plan = '; '.join(PLAN_PREFIX.sub('', line).strip() for line in get_queryset().explain().splitlines())
+        return statistics.median(timings), plan
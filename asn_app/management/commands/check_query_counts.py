@@ -0,0 +1,111 @@
+# asn_app/management/commands/check_query_counts.py
+# Diagnostik untuk database yang sedang berjalan. Jumlah query dijamin oleh
+# asn_app/tests/test_query_plans.py (data uji dengan banyak baris per model);
+# di sini hanya objek terbaru yang dirender dan model tanpa data dilewati.
+import re
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, RequestFactory
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.urls import NoReverseMatch, reverse
+
+from asn_app import documents  # noqa: F401 (mendaftarkan jenis dokumen PDF)
+from asn_app.pdf import get_document, render_html
+from asn_app.query_plans import PLANS
+
+# Angka dan string literal diganti '?' agar query per baris (N+1) terlihat sama
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+
+
+def normalize_sql(sql):
+    return LITERALS.sub('?', sql)
+
+
+class Command(BaseCommand):
+    help = ('Diagnostic: render every page and PDF that has a query plan against the current database '
+            'and report pages over budget (the test suite is the actual check)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('plans', nargs='*', metavar='PLAN',
+                            help='Plan names to check (default: all registered plans)')
+        parser.add_argument('--repeat-threshold', type=int, default=3,
+                            help='Flag a page when the same statement runs this many times (default: 3)')
+        parser.add_argument('--show-sql', action='store_true',
+                            help='Print the captured SQL of failing pages')
+
+    def handle(self, *args, **options):
+        names = options['plans'] or sorted(PLANS)
+        unknown = [name for name in names if name not in PLANS]
+        if unknown:
+            raise CommandError(f'Unknown query plan(s): {", ".join(unknown)}')
+
+        setup_test_environment()
+        failures = []
+        try:
+            # Hanya membaca, tetapi tetap di-rollback agar aman dijalankan di database produksi
+            with transaction.atomic():
+                for name in names:
+                    if not self._check(PLANS[name], options):
+                        failures.append(name)
+                transaction.set_rollback(True)
+        finally:
+            teardown_test_environment()
+
+        if failures:
+            raise CommandError(f'{len(failures)} of {len(names)} plans failed: {", ".join(failures)}')
+        self.stdout.write(self.style.SUCCESS(f'All {len(names)} query plans are within budget.'))
+
+    def _check(self, plan, options):
+        obj = plan.model._default_manager.order_by('-pk').first()
+        with CaptureQueriesContext(connection) as captured:
+            status = self._render(plan, obj)
+        if status is None:
+            self.stdout.write(f'{plan.name:40} skipped (no {plan.model._meta.verbose_name} rows)')
+            return True
+
+        queries = [query['sql'] for query in captured.captured_queries]
+        repeated = [
+            (sql, count) for sql, count in Counter(normalize_sql(sql) for sql in queries).most_common()
+            if count >= options['repeat_threshold']
+        ]
+        errors = []
+        if status != 200:
+            errors.append(f'HTTP {status}')
+        if plan.max_queries is not None and len(queries) > plan.max_queries:
+            errors.append(f'over budget by {len(queries) - plan.max_queries}')
+        if repeated:
+            errors.append(f'{len(repeated)} repeated statement(s), likely N+1')
+
+        budget = plan.max_queries if plan.max_queries is not None else '-'
+        line = f'{plan.name:40} {len(queries):3} / {budget} queries'
+        if not errors:
+            self.stdout.write(f'{line}  OK')
+            return True
+
+        self.stdout.write(self.style.ERROR(f'{line}  FAIL: {"; ".join(errors)}'))
+        for sql, count in repeated:
+            self.stdout.write(f'    {count}x {sql[:200]}')
+        if options['show_sql']:
+            for sql in queries:
+                self.stdout.write(f'    {sql}')
+        return False
+
+    def _render(self, plan, obj):
+        """Render halaman/PDF rencana ``plan``; mengembalikan status HTTP atau None jika tidak ada data."""
+        if plan.name.startswith('pdf:'):
+            if obj is None:
+                return None
+            # Hanya HTML-nya; query terjadi saat mengambil objek dan merender template
+            document = get_document(plan.name[4:])
+            render_html(document, document.get_object(obj.pk), RequestFactory().get('/'))
+            return 200
+
+        try:
+            url = reverse(plan.name)
+        except NoReverseMatch:
+            if obj is None:
+                return None
+            url = reverse(plan.name, kwargs={'pk': obj.pk})
+        return Client(raise_request_exception=False).get(url).status_code
@@ -0,0 +1,33 @@
+# asn_app/management/commands/check_sisa_cuti.py
+from django.core.management.base import BaseCommand
+
+from asn_app.leave_balance import check_balances
+
+
+class Command(BaseCommand):
+    help = 'Verify stored SisaCuti balances against a full recalculation from SuratCuti records'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repair', action='store_true',
+                            help='Overwrite mismatched balances and create missing SisaCuti records')
+
+    def handle(self, *args, **options):
+        repair = options['repair']
+        mismatches, missing = check_balances(repair=repair)
+
+        for sisa_cuti, diff in mismatches:
+            details = ', '.join(f'{field}: {stored} != {expected}' for field, (stored, expected) in diff.items())
+            self.stdout.write(f'{sisa_cuti.pegawai.nama} (pegawai {sisa_cuti.pegawai_id}): {details}')
+        if missing:
+            self.stdout.write(f'Missing SisaCuti for pegawai: {", ".join(str(pk) for pk in missing)}')
+
+        if not mismatches and not missing:
+            self.stdout.write(self.style.SUCCESS('All SisaCuti balances are consistent.'))
+        elif repair:
+            self.stdout.write(self.style.SUCCESS(
+                f'Repaired {len(mismatches)} records and created {len(missing)} missing records.'
+            ))
+        else:
+            self.stdout.write(self.style.WARNING(
+                f'{len(mismatches)} inconsistent records, {len(missing)} missing. Run with --repair to fix.'
+            ))
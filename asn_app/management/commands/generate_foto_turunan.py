@@ -0,0 +1,31 @@
+# asn_app/management/commands/generate_foto_turunan.py
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from asn_app.models import ASN, FotoKegiatan, Siswa
+
+MODELS = {'asn': ASN, 'siswa': Siswa, 'foto_kegiatan': FotoKegiatan}
+
+
+class Command(BaseCommand):
+    help = 'Generate print-size and thumbnail derivatives for ASN, Siswa and FotoKegiatan photos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', choices=sorted(MODELS), action='append',
+                            help='Only process this model (repeatable); default all')
+        parser.add_argument('--force', action='store_true',
+                            help='Regenerate derivatives that already exist')
+
+    def handle(self, *args, **options):
+        for name in options['model'] or sorted(MODELS):
+            queryset = MODELS[name].objects.exclude(foto='').exclude(foto__isnull=True)
+            if not options['force']:
+                queryset = queryset.filter(Q(foto_cetak__isnull=True) | Q(foto_cetak=''))
+            done = failed = 0
+            for obj in queryset.only('pk', 'foto', 'foto_cetak', 'foto_thumb').iterator():
+                if obj.generate_foto_turunan():
+                    done += 1
+                else:
+                    failed += 1
+                    self.stderr.write(f'{name} #{obj.pk}: cannot read {obj.foto.name}')
+            self.stdout.write(self.style.SUCCESS(f'{name}: {done} generated, {failed} failed.'))
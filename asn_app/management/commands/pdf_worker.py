@@ -0,0 +1,77 @@
+# asn_app/management/commands/pdf_worker.py
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from asn_app.pdf_jobs import claim_next_job, delete_old_jobs, requeue_stale_jobs, run_job
+from asn_app.pdf_styles import warm_up_on_start
+
+
+def _init_worker():
+    # Koneksi database hasil fork dari proses induk tidak boleh dipakai bersama
+    connections.close_all()
+    warm_up_on_start()
+
+
+class Command(BaseCommand):
+    help = 'Run the background PDF render queue (PdfJob) with a pool of worker processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=os.cpu_count() or 2,
+                            help='Number of worker processes (default: CPU count)')
+        parser.add_argument('--poll', type=float, default=1.0,
+                            help='Seconds to wait before checking an empty queue again')
+        parser.add_argument('--once', action='store_true',
+                            help='Exit once the queue is empty instead of waiting for new jobs')
+
+    def handle(self, *args, **options):
+        processes = max(1, options['processes'])
+        poll = options['poll']
+
+        requeued = requeue_stale_jobs()
+        deleted = delete_old_jobs()
+        self.stdout.write(
+            f'PDF worker started with {processes} processes '
+            f'({requeued} stale jobs requeued, {deleted} old jobs removed)'
+        )
+
+        # Tutup koneksi sebelum fork supaya tiap proses membuka koneksinya sendiri
+        connections.close_all()
+        running = {}
+        done = failed = 0
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker) as pool:
+            try:
+                while True:
+                    while len(running) < processes:
+                        job_id = claim_next_job()
+                        if job_id is None:
+                            break
+                        running[pool.submit(run_job, job_id)] = job_id
+
+                    if not running:
+                        if options['once']:
+                            break
+                        time.sleep(poll)
+                        continue
+
+                    finished, _ = wait(running, timeout=poll, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        job_id = running.pop(future)
+                        try:
+                            status = future.result()
+                        except Exception as e:
+                            self.stderr.write(f'Job {job_id} crashed: {e}')
+                            failed += 1
+                            continue
+                        if status == 'done':
+                            done += 1
+                        else:
+                            failed += 1
+                        self.stdout.write(f'Job {job_id}: {status}')
+            except KeyboardInterrupt:
+                self.stdout.write('Stopping PDF worker...')
+
+        self.stdout.write(self.style.SUCCESS(f'PDF worker finished: {done} done, {failed} failed'))
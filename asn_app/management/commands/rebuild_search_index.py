@@ -0,0 +1,14 @@
+# asn_app/management/commands/rebuild_search_index.py
+from django.core.management.base import BaseCommand, CommandError
+
+from asn_app import search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index (SQLite FTS5) for ASN, Siswa and letters'
+
+    def handle(self, *args, **options):
+        if not search.is_available():
+            raise CommandError('The full-text search index requires SQLite (FTS5); other databases use icontains.')
+        total = search.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {total} rows from {len(search.SOURCES)} sources.'))
@@ -1,62 +1,187 @@
 # asn_app/management/commands/recalculate_sisa_cuti.py
-from django.core.management.base import BaseCommand
-from asn_app.models import ASN, SisaCuti, SuratCuti
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+from django.utils.dateparse import parse_date
+
+from asn_app.leave_balance import CHECKED_FIELDS, DEFAULT_ALLOCATION
+from asn_app.models import ASN, HariLibur, SisaCuti, SuratCuti
+from asn_app.workdays import HolidayCalendar
+
+INITIAL_FIELDS = ('initial_tahun_n', 'initial_tahun_n_1', 'initial_tahun_n_2')
+
+
+def compute_chunk(holidays, items):
+    """
+    Hitung hari_efektif dan saldo untuk sekelompok pegawai, tanpa database.
+
+    ``items`` berisi ``(pegawai_id, tahun_n, (initial_n, initial_n_1, initial_n_2),
+    [(pk, tanggal_awal, tanggal_akhir, hari_efektif), ...])``. Mengembalikan
+    ``(surat_cuti_berubah, saldo)`` dengan ``surat_cuti_berubah`` berisi
+    ``(pk, hari_efektif_baru)`` dan ``saldo`` berisi ``{pegawai_id: nilai
+    CHECKED_FIELDS}``.
+    """
+    calendar = HolidayCalendar(holidays)
+    changed_letters = []
+    balances = {}
+    for pegawai_id, year, initial, letters in items:
+        used = {year: 0, year - 1: 0, year - 2: 0}
+        for pk, tanggal_awal, tanggal_akhir, hari_efektif in letters:
+            days = calendar.working_days(tanggal_awal, tanggal_akhir)
+            if days != hari_efektif:
+                changed_letters.append((pk, days))
+            if tanggal_awal.year in used:
+                used[tanggal_awal.year] += days
+
+        sisa = SisaCuti.carry_over(*initial, used[year], used[year - 1], used[year - 2])
+        balances[pegawai_id] = dict(zip(CHECKED_FIELDS, (
+            used[year], used[year - 1], used[year - 2], *sisa, sum(sisa),
+        )))
+    return changed_letters, balances
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
 
 
 class Command(BaseCommand):
-    help = 'Recalculate all SisaCuti records with dynamic continuous logic'
+    help = 'Recalculate all SisaCuti records with dynamic continuous logic (bulk, in memory)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=1,
+                            help='Number of processes used to compute balances (default: 1, in-process)')
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Rows per bulk_create/bulk_update statement (default: 500)')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Compute and report changes without writing to the database')
+        parser.add_argument('--since', metavar='YYYY-MM-DD',
+                            help='Only employees whose leave letters (or overlapping holidays) changed on or after this date')
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        batch_size = max(1, options['batch_size'])
+        dry_run = options['dry_run']
+        since = None
+        if options['since']:
+            since = parse_date(options['since'])
+            if since is None:
+                raise CommandError('--since must be a date in YYYY-MM-DD format')
 
-    def handle(self, *args, **kwargs):
         self.stdout.write('Starting SisaCuti recalculation with dynamic continuous logic...')
         self.stdout.write('')
         self.stdout.write('Rules:')
-        self.stdout.write('  - Year N (current): 12 days - used')
-        self.stdout.write('  - Year N-1: 6 days - used, BUT if N usage > 6, then N-1 = 0')
-        self.stdout.write('  - Year N-2: 6 days - used, BUT if N-1 usage > 6, then N-2 = 0')
+        self.stdout.write('  - Year N (current): initial N - used')
+        self.stdout.write('  - Year N-1: initial N-1 - used, BUT if N usage > initial N-1, then N-1 = 0')
+        self.stdout.write('  - Year N-2: initial N-2 - used, BUT if N-1 usage > initial N-2, then N-2 = 0')
         self.stdout.write('')
-        
-        # Get all ASN that have or should have SisaCuti
-        all_pegawai = ASN.objects.all()
-        
-        count_updated = 0
-        count_created = 0
-        count_n1_zero = 0
-        count_n2_zero = 0
-        
-        for pegawai in all_pegawai:
-            # Get or create SisaCuti
-            sisa_cuti, created = SisaCuti.objects.get_or_create(
-                pegawai=pegawai,
-                defaults={
-                    'sisa_tahun_n': 12,
-                    'sisa_tahun_n_1': 6,
-                    'sisa_tahun_n_2': 6,
-                }
-            )
-            
-            # Recalculate based on SuratCuti records
-            sisa_cuti.recalculate_and_save()
-            
-            # Track statistics
-            if sisa_cuti.sisa_tahun_n_1 == 0:
-                count_n1_zero += 1
-            if sisa_cuti.sisa_tahun_n_2 == 0:
-                count_n2_zero += 1
-            
-            if created:
-                count_created += 1
+
+        started = time.perf_counter()
+        year = SisaCuti.get_current_year()
+
+        # 1. Muat semua data sekali
+        holidays = list(HariLibur.objects.values_list('tanggal', flat=True))
+        pegawai_ids = self._pegawai_ids(since)
+        sisa_cuti_qs = SisaCuti.objects.all()
+        rows = SuratCuti.objects.values_list('pk', 'pegawai_id', 'tanggal_awal', 'tanggal_akhir', 'hari_efektif')
+        if since is not None:
+            sisa_cuti_qs = sisa_cuti_qs.filter(pegawai_id__in=pegawai_ids)
+            rows = rows.filter(pegawai_id__in=pegawai_ids)
+        existing = {sisa_cuti.pegawai_id: sisa_cuti for sisa_cuti in sisa_cuti_qs}
+        letters = defaultdict(list)
+        letter_count = 0
+        for pk, pegawai_id, tanggal_awal, tanggal_akhir, hari_efektif in rows.iterator(chunk_size=2000):
+            letters[pegawai_id].append((pk, tanggal_awal, tanggal_akhir, hari_efektif))
+            letter_count += 1
+
+        items = []
+        for pegawai_id in pegawai_ids:
+            sisa_cuti = existing.get(pegawai_id)
+            if sisa_cuti is not None:
+                tahun_n = sisa_cuti.tahun_n
+                initial = tuple(getattr(sisa_cuti, field) for field in INITIAL_FIELDS)
             else:
-                count_updated += 1
-        
+                tahun_n = year
+                initial = tuple(DEFAULT_ALLOCATION[field] for field in INITIAL_FIELDS)
+            items.append((pegawai_id, tahun_n, initial, letters.get(pegawai_id, [])))
+        loaded = time.perf_counter()
+
+        # 2. Hitung di memori (opsional paralel)
+        changed_letters = []
+        balances = {}
+        if workers == 1 or len(items) < 2:
+            changed_letters, balances = compute_chunk(holidays, items)
+        else:
+            size = max(1, -(-len(items) // (workers * 4)))
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(compute_chunk, holidays, chunk) for chunk in _chunks(items, size)]
+                for future in futures:
+                    chunk_letters, chunk_balances = future.result()
+                    changed_letters.extend(chunk_letters)
+                    balances.update(chunk_balances)
+        computed = time.perf_counter()
+
+        # 3. Tulis hanya baris yang berubah
+        to_update = []
+        to_create = []
+        for pegawai_id, values in balances.items():
+            sisa_cuti = existing.get(pegawai_id)
+            if sisa_cuti is None:
+                to_create.append(SisaCuti(pegawai_id=pegawai_id, **{**DEFAULT_ALLOCATION, **values}))
+            elif any(getattr(sisa_cuti, field) != value for field, value in values.items()):
+                for field, value in values.items():
+                    setattr(sisa_cuti, field, value)
+                to_update.append(sisa_cuti)
+
+        if not dry_run:
+            with transaction.atomic():
+                SuratCuti.objects.bulk_update(
+                    [SuratCuti(pk=pk, hari_efektif=days) for pk, days in changed_letters],
+                    ['hari_efektif'], batch_size=batch_size,
+                )
+                SisaCuti.objects.bulk_update(to_update, CHECKED_FIELDS, batch_size=batch_size)
+                SisaCuti.objects.bulk_create(to_create, batch_size=batch_size)
+        finished = time.perf_counter()
+
+        count_n1_zero = sum(1 for values in balances.values() if values['sisa_tahun_n_1'] == 0)
+        count_n2_zero = sum(1 for values in balances.values() if values['sisa_tahun_n_2'] == 0)
+        verb = 'Would update' if dry_run else 'Updated'
+
         self.stdout.write(
             self.style.SUCCESS(
-                f'Successfully recalculated SisaCuti for {count_updated} existing records '
-                f'and created {count_created} new records.'
+                f'{verb} {len(to_update)} SisaCuti records, '
+                f'{"would create" if dry_run else "created"} {len(to_create)} new records '
+                f'and {"would fix" if dry_run else "fixed"} hari_efektif on {len(changed_letters)} leave letters.'
             )
         )
         self.stdout.write(
             self.style.WARNING(
-                f'{count_n1_zero} records have N-1 = 0 (due to N usage > 6) | '
-                f'{count_n2_zero} records have N-2 = 0 (due to N-1 usage > 6)'
+                f'{count_n1_zero} records have N-1 = 0 (due to N usage > initial N-1) | '
+                f'{count_n2_zero} records have N-2 = 0 (due to N-1 usage > initial N-2)'
             )
         )
+        total = finished - started
+        self.stdout.write(
+            f'{len(items)} employees, {letter_count} letters, {len(holidays)} holidays, {workers} worker(s): '
+            f'load {loaded - started:.3f}s, compute {computed - loaded:.3f}s, '
+            f'write {finished - computed:.3f}s, total {total:.3f}s '
+            f'({len(items) / total if total else 0:.0f} employees/s)'
+        )
+
+    def _pegawai_ids(self, since):
+        """Semua pegawai, atau hanya yang terdampak perubahan sejak ``since``."""
+        if since is None:
+            return list(ASN.objects.order_by('pk').values_list('pk', flat=True))
+
+        ids = set(SuratCuti.objects.filter(updated_at__date__gte=since).values_list('pegawai_id', flat=True))
+        changed_holidays = list(HariLibur.objects.filter(updated_at__date__gte=since).values_list('tanggal', flat=True))
+        if changed_holidays:
+            overlap = Q()
+            for day in changed_holidays:
+                overlap |= Q(tanggal_awal__lte=day, tanggal_akhir__gte=day)
+            ids.update(SuratCuti.objects.filter(overlap).values_list('pegawai_id', flat=True))
+        return sorted(ids)
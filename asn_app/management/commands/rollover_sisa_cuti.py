@@ -0,0 +1,38 @@
+# asn_app/management/commands/rollover_sisa_cuti.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from asn_app.leave_balance import pending_rollover_years, rollover
+from asn_app.models import SisaCuti
+
+
+class Command(BaseCommand):
+    help = 'Snapshot year-end SisaCuti balances and shift the N/N-1/N-2 buckets to a new year'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--year', type=int,
+                            help='Target year for bucket N (default: current year)')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only report which stored years would be rolled over')
+
+    def handle(self, *args, **options):
+        to_year = options['year'] or SisaCuti.get_current_year()
+        if to_year > SisaCuti.get_current_year():
+            raise CommandError('Cannot roll over into a future year')
+
+        pending = pending_rollover_years(to_year)
+        if not pending:
+            self.stdout.write(self.style.SUCCESS(f'All SisaCuti records are already at year {to_year}.'))
+            return
+        if options['dry_run']:
+            count = SisaCuti.objects.filter(tahun_n__lt=to_year).count()
+            self.stdout.write(f'{count} records would be rolled over from {", ".join(map(str, pending))} to {to_year}.')
+            return
+
+        started = time.perf_counter()
+        result = rollover(to_year)
+        elapsed = time.perf_counter() - started
+        for year, count in result.items():
+            self.stdout.write(f'{year} -> {year + 1}: {count} records shifted')
+        self.stdout.write(self.style.SUCCESS(f'Rollover to {to_year} finished in {elapsed:.3f}s.'))
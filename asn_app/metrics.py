@@ -0,0 +1,368 @@
+# asn_app/metrics.py
+"""
+Metrik waktu per halaman (per nama URL), dikumpulkan di memori proses.
+
+``RequestMetricsMiddleware`` mencatat untuk setiap request: waktu total,
+jumlah dan waktu query SQL, waktu render template dan waktu WeasyPrint.
+Setiap nama URL menyimpan ``REQUEST_METRICS_WINDOW`` sampel terakhir untuk
+persentil (p50/p90/p95/p99) ditambah jumlah dan total sejak proses mulai.
+Hasilnya tampil di ``/asn/metrics/`` (staff), ``?format=json`` dan
+``?format=prometheus``.
+
+Waktu template diukur di backend template Django (hanya render teratas,
+``{% include %}`` tidak dihitung dua kali); query yang dijalankan saat
+render ikut terhitung di waktu template dan SQL. Waktu WeasyPrint diukur
+lewat ``timer('weasyprint')`` di ``asn_app/pdf.py``. Dengan
+``REQUEST_METRICS_PROFILE_RATE`` > 0 sebagian request dijalankan di bawah
+cProfile dan yang lebih lambat dari ``REQUEST_METRICS_PROFILE_THRESHOLD_MS``
+disimpan sebagai file ``.prof`` (buka dengan ``snakeviz`` atau ``pstats``).
+"""
+import cProfile
+import contextvars
+import glob
+import math
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+DEFAULT_WINDOW = 1000
+DEFAULT_PROFILE_KEEP = 50
+PERCENTILES = (50, 90, 95, 99)
+# (kunci sampel, nama metrik Prometheus, satuan detik?)
+FIELDS = (
+    ('total_ms', 'asn_request_duration_seconds', True),
+    ('queries', 'asn_request_queries', False),
+    ('sql_ms', 'asn_request_sql_seconds', True),
+    ('template_ms', 'asn_request_template_seconds', True),
+    ('weasyprint_ms', 'asn_request_weasyprint_seconds', True),
+)
+
+_current = contextvars.ContextVar('asn_request_metrics', default=None)
+
+
+def is_enabled():
+    return getattr(settings, 'REQUEST_METRICS_ENABLED', True)
+
+
+def get_window():
+    return getattr(settings, 'REQUEST_METRICS_WINDOW', DEFAULT_WINDOW)
+
+
+def get_profile_rate():
+    return getattr(settings, 'REQUEST_METRICS_PROFILE_RATE', 0.0)
+
+
+def get_profile_threshold_ms():
+    return getattr(settings, 'REQUEST_METRICS_PROFILE_THRESHOLD_MS', 1000)
+
+
+def get_profile_dir():
+    return getattr(settings, 'REQUEST_METRICS_PROFILE_DIR', os.path.join(settings.BASE_DIR, 'profiles'))
+
+
+def get_profile_keep():
+    return getattr(settings, 'REQUEST_METRICS_PROFILE_KEEP', DEFAULT_PROFILE_KEEP)
+
+
+class RequestTimings:
+    """Pengukuran satu request yang sedang berjalan."""
+
+    def __init__(self):
+        self.queries = 0
+        self.sql = 0.0
+        self.durations = {}
+        self.active = set()
+
+    def add(self, name, seconds):
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+
+    def __call__(self, execute, sql, params, many, context):
+        # Dipasang dengan connection.execute_wrapper()
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql += time.perf_counter() - start
+            self.queries += 1
+
+
+@contextmanager
+def timer(name):
+    """
+    Tambahkan lama blok ini ke ``name`` pada request yang sedang diukur (jika
+    ada). Blok bersarang dengan nama sama (mis. render widget form di dalam
+    render halaman) tidak dihitung lagi.
+    """
+    timings = _current.get()
+    if timings is None or name in timings.active:
+        yield
+        return
+    timings.active.add(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.active.discard(name)
+        timings.add(name, time.perf_counter() - start)
+
+
+def percentile(values, pct):
+    """Persentil nearest-rank dari ``values`` yang sudah terurut."""
+    if not values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(values)), 1)
+    return values[rank - 1]
+
+
+class RouteStats:
+    def __init__(self, route, window):
+        self.route = route
+        self.count = 0
+        self.errors = 0
+        self.totals = {key: 0.0 for key, _, _ in FIELDS}
+        self.maximum = 0.0
+        self.samples = {key: deque(maxlen=window) for key, _, _ in FIELDS}
+        self.last_profile = None
+
+    def add(self, sample, status):
+        self.count += 1
+        if status >= 500:
+            self.errors += 1
+        self.maximum = max(self.maximum, sample['total_ms'])
+        for key, _, _ in FIELDS:
+            self.totals[key] += sample[key]
+            self.samples[key].append(sample[key])
+
+    def summary(self):
+        data = {
+            'route': self.route,
+            'count': self.count,
+            'errors': self.errors,
+            'max_ms': round(self.maximum, 2),
+            'last_profile': self.last_profile,
+        }
+        for key, _, _ in FIELDS:
+            values = sorted(self.samples[key])
+            data[key] = {
+                'avg': round(self.totals[key] / self.count, 2) if self.count else 0.0,
+                'sum': round(self.totals[key], 2),
+                **{f'p{pct}': round(percentile(values, pct), 2) for pct in PERCENTILES},
+            }
+        return data
+
+
+class MetricsRegistry:
+    """Agregasi per nama URL untuk proses ini (aman dipakai banyak thread)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+        self.started = time.time()
+
+    def record(self, route, sample, status):
+        with self._lock:
+            stats = self._routes.get(route)
+            if stats is None:
+                stats = self._routes[route] = RouteStats(route, get_window())
+            stats.add(sample, status)
+
+    def set_profile(self, route, filename):
+        with self._lock:
+            if route in self._routes:
+                self._routes[route].last_profile = filename
+
+    def snapshot(self):
+        """Ringkasan semua rute, paling lambat (p95) dulu."""
+        with self._lock:
+            summaries = [stats.summary() for stats in self._routes.values()]
+        return sorted(summaries, key=lambda data: data['total_ms']['p95'], reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+            self.started = time.time()
+
+
+registry = MetricsRegistry()
+
+
+def route_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return '<unresolved>'
+    return match.view_name or match._func_path
+
+
+# --- Waktu render template ---
+
+_template_hook_installed = False
+
+
+def install_template_hook():
+    """Ukur ``Template.render`` backend Django (juga dipakai render widget form)."""
+    global _template_hook_installed
+    if _template_hook_installed:
+        return
+    from django.template.backends.django import Template
+
+    original_render = Template.render
+
+    def render(self, context=None, request=None):
+        with timer('template'):
+            return original_render(self, context, request)
+
+    Template.render = render
+    _template_hook_installed = True
+
+
+# --- Profiling ---
+
+def _profile_filename(route, total_ms):
+    slug = re.sub(r'[^A-Za-z0-9_.-]+', '_', route)
+    return f'{time.strftime("%Y%m%d-%H%M%S")}-{slug}-{int(total_ms)}ms.prof'
+
+
+def save_profile(profile, route, total_ms):
+    directory = get_profile_dir()
+    os.makedirs(directory, exist_ok=True)
+    filename = _profile_filename(route, total_ms)
+    profile.dump_stats(os.path.join(directory, filename))
+    # Simpan hanya file terbaru
+    for old in list_profiles()[get_profile_keep():]:
+        try:
+            os.remove(os.path.join(directory, old))
+        except OSError:
+            pass
+    return filename
+
+
+def list_profiles():
+    """Nama file profil yang tersimpan, terbaru dulu."""
+    paths = glob.glob(os.path.join(get_profile_dir(), '*.prof'))
+    paths.sort(key=os.path.getmtime, reverse=True)
+    return [os.path.basename(path) for path in paths]
+
+
+def profile_path(filename):
+    """Path file profil, atau None jika nama tidak valid/tidak ada."""
+    if os.path.basename(filename) != filename or not filename.endswith('.prof'):
+        return None
+    path = os.path.join(get_profile_dir(), filename)
+    return path if os.path.isfile(path) else None
+
+
+# --- Middleware ---
+
+# cProfile hanya bisa aktif satu per proses (Python 3.12+: enable() kedua
+# melempar ValueError) dan merekam semua thread, jadi satu profil sekaligus
+_profile_lock = threading.Lock()
+
+
+def _start_profile():
+    """Profiler aktif untuk request ini bila terpilih sampel, atau None."""
+    rate = get_profile_rate()
+    if not rate or random.random() >= rate:
+        return None
+    if not _profile_lock.acquire(blocking=False):
+        return None
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError:
+        # Profiler/debugger lain sudah aktif: request ini tidak diprofil
+        _profile_lock.release()
+        return None
+    return profile
+
+
+def _stop_profile(profile):
+    try:
+        profile.disable()
+    finally:
+        _profile_lock.release()
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        install_template_hook()
+
+    def __call__(self, request):
+        if not is_enabled():
+            return self.get_response(request)
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        start = time.perf_counter()
+        try:
+            with _sql_wrappers(timings):
+                profile = _start_profile()
+                try:
+                    response = self.get_response(request)
+                finally:
+                    if profile is not None:
+                        _stop_profile(profile)
+        finally:
+            _current.reset(token)
+        total = time.perf_counter() - start
+
+        route = route_name(request)
+        sample = {
+            'total_ms': total * 1000,
+            'queries': timings.queries,
+            'sql_ms': timings.sql * 1000,
+            'template_ms': timings.durations.get('template', 0.0) * 1000,
+            'weasyprint_ms': timings.durations.get('weasyprint', 0.0) * 1000,
+        }
+        registry.record(route, sample, response.status_code)
+        if profile is not None and sample['total_ms'] >= get_profile_threshold_ms():
+            registry.set_profile(route, save_profile(profile, route, sample['total_ms']))
+
+        response['Server-Timing'] = ', '.join([
+            f'db;desc="{timings.queries} queries";dur={sample["sql_ms"]:.1f}',
+            f'tpl;dur={sample["template_ms"]:.1f}',
+            f'pdf;dur={sample["weasyprint_ms"]:.1f}',
+            f'total;dur={sample["total_ms"]:.1f}',
+        ])
+        return response
+
+
+@contextmanager
+def _sql_wrappers(timings):
+    wrappers = [connection.execute_wrapper(timings) for connection in connections.all()]
+    for wrapper in wrappers:
+        wrapper.__enter__()
+    try:
+        yield
+    finally:
+        for wrapper in reversed(wrappers):
+            wrapper.__exit__(None, None, None)
+
+
+# --- Output ---
+
+def prometheus_text(snapshot):
+    """Format eksposisi teks Prometheus (tipe summary per metrik)."""
+    lines = []
+    for key, metric, seconds in FIELDS:
+        lines.append(f'# TYPE {metric} summary')
+        for data in snapshot:
+            label = data['route'].replace('\\', '\\\\').replace('"', '\\"')
+            scale = 1000 if seconds else 1
+            for pct in PERCENTILES:
+                value = data[key][f'p{pct}'] / scale
+                lines.append(f'{metric}{{route="{label}",quantile="{pct / 100}"}} {value:.6g}')
+            lines.append(f'{metric}_sum{{route="{label}"}} {data[key]["sum"] / scale:.6g}')
+            lines.append(f'{metric}_count{{route="{label}"}} {data["count"]}')
+    lines.append('# TYPE asn_request_errors_total counter')
+    for data in snapshot:
+        label = data['route'].replace('\\', '\\\\').replace('"', '\\"')
+        lines.append(f'asn_request_errors_total{{route="{label}"}} {data["errors"]}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asn_app', '0085_surat_pengantar_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='kopsurat',
+            name='gambar_cetak',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='kop_surat/cetak/', verbose_name='Gambar Kop Surat (Cetak)'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asn_app', '0086_kop_surat_gambar_cetak'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PdfJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('document', models.CharField(max_length=50, verbose_name='Jenis Dokumen')),
+                ('object_id', models.PositiveIntegerField(blank=True, null=True, verbose_name='ID Objek')),
+                ('status', models.CharField(choices=[('pending', 'Menunggu'), ('running', 'Diproses'), ('done', 'Selesai'), ('failed', 'Gagal')], db_index=True, default='pending', max_length=10, verbose_name='Status')),
+                ('scheme', models.CharField(default='http', max_length=5)),
+                ('host', models.CharField(blank=True, max_length=255)),
+                ('path', models.CharField(blank=True, max_length=255)),
+                ('query_string', models.TextField(blank=True)),
+                ('file', models.FileField(blank=True, null=True, upload_to='pdf_jobs/', verbose_name='File PDF')),
+                ('filename', models.CharField(blank=True, max_length=255, verbose_name='Nama File')),
+                ('error', models.TextField(blank=True, verbose_name='Pesan Error')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name_plural': 'PDF Job',
+                'ordering': ['created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:37
+
+from datetime import timedelta
+
+from django.db import migrations, models
+
+
+def fill_hari_efektif(apps, schema_editor):
+    SuratCuti = apps.get_model('asn_app', 'SuratCuti')
+    HariLibur = apps.get_model('asn_app', 'HariLibur')
+    holidays = set(HariLibur.objects.values_list('tanggal', flat=True))
+
+    updated = []
+    for surat_cuti in SuratCuti.objects.only('pk', 'tanggal_awal', 'tanggal_akhir'):
+        total = 0
+        day = surat_cuti.tanggal_awal
+        while day and surat_cuti.tanggal_akhir and day <= surat_cuti.tanggal_akhir:
+            if day.weekday() < 5 and day not in holidays:
+                total += 1
+            day += timedelta(days=1)
+        surat_cuti.hari_efektif = total
+        updated.append(surat_cuti)
+    SuratCuti.objects.bulk_update(updated, ['hari_efektif'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asn_app', '0087_pdf_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='suratcuti',
+            name='hari_efektif',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Hari Efektif'),
+        ),
+        migrations.RunPython(fill_hari_efektif, migrations.RunPython.noop),
+    ]
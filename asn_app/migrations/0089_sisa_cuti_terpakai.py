@@ -0,0 +1,57 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:40
+
+from datetime import date
+
+from django.db import migrations, models
+
+
+def fill_terpakai(apps, schema_editor):
+    SisaCuti = apps.get_model('asn_app', 'SisaCuti')
+    SuratCuti = apps.get_model('asn_app', 'SuratCuti')
+    year = date.today().year
+
+    used = {}
+    rows = (
+        SuratCuti.objects.filter(tanggal_awal__year__in=[year, year - 1, year - 2])
+        .values_list('pegawai_id', 'tanggal_awal__year')
+        .annotate(total=models.Sum('hari_efektif'))
+        .order_by()
+    )
+    for pegawai_id, tahun, total in rows:
+        used[(pegawai_id, tahun)] = total or 0
+
+    updated = []
+    for sisa_cuti in SisaCuti.objects.all():
+        sisa_cuti.terpakai_tahun_n = used.get((sisa_cuti.pegawai_id, year), 0)
+        sisa_cuti.terpakai_tahun_n_1 = used.get((sisa_cuti.pegawai_id, year - 1), 0)
+        sisa_cuti.terpakai_tahun_n_2 = used.get((sisa_cuti.pegawai_id, year - 2), 0)
+        updated.append(sisa_cuti)
+    SisaCuti.objects.bulk_update(
+        updated, ['terpakai_tahun_n', 'terpakai_tahun_n_1', 'terpakai_tahun_n_2'], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asn_app', '0088_surat_cuti_hari_efektif'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sisacuti',
+            name='terpakai_tahun_n',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Terpakai Tahun N'),
+        ),
+        migrations.AddField(
+            model_name='sisacuti',
+            name='terpakai_tahun_n_1',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Terpakai Tahun N-1'),
+        ),
+        migrations.AddField(
+            model_name='sisacuti',
+            name='terpakai_tahun_n_2',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Terpakai Tahun N-2'),
+        ),
+        migrations.RunPython(fill_terpakai, migrations.RunPython.noop),
+    ]
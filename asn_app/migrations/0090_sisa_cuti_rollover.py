@@ -0,0 +1,44 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:43
+
+import asn_app.models
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asn_app', '0089_sisa_cuti_terpakai'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sisacuti',
+            name='tahun_n',
+            field=models.PositiveIntegerField(default=asn_app.models.current_leave_year, editable=False, verbose_name='Tahun N'),
+        ),
+        migrations.CreateModel(
+            name='RiwayatSisaCuti',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tahun', models.PositiveIntegerField(verbose_name='Tahun')),
+                ('initial_tahun_n', models.IntegerField(verbose_name='Alokasi Awal Tahun N')),
+                ('initial_tahun_n_1', models.IntegerField(verbose_name='Alokasi Awal Tahun N-1')),
+                ('initial_tahun_n_2', models.IntegerField(verbose_name='Alokasi Awal Tahun N-2')),
+                ('terpakai_tahun_n', models.IntegerField(verbose_name='Terpakai Tahun N')),
+                ('terpakai_tahun_n_1', models.IntegerField(verbose_name='Terpakai Tahun N-1')),
+                ('terpakai_tahun_n_2', models.IntegerField(verbose_name='Terpakai Tahun N-2')),
+                ('sisa_tahun_n', models.IntegerField(verbose_name='Sisa Tahun N')),
+                ('sisa_tahun_n_1', models.IntegerField(verbose_name='Sisa Tahun N-1')),
+                ('sisa_tahun_n_2', models.IntegerField(verbose_name='Sisa Tahun N-2')),
+                ('total_sisa_cuti', models.IntegerField(verbose_name='Total Sisa Cuti')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('pegawai', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='riwayat_sisa_cuti', to='asn_app.asn', verbose_name='Pegawai')),
+            ],
+            options={
+                'verbose_name_plural': 'Riwayat Sisa Cuti',
+                'ordering': ['-tahun', 'pegawai__nama'],
+                'unique_together': {('pegawai', 'tahun')},
+            },
+        ),
+    ]
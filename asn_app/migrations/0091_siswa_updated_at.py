@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asn_app', '0090_sisa_cuti_rollover'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='siswa',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
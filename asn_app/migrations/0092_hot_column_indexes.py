@@ -0,0 +1,153 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asn_app', '0091_siswa_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='asn',
+            index=models.Index(fields=['nama'], name='asn_nama_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='asn',
+            index=models.Index(fields=['updated_at', 'id'], name='asn_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='drhsatyalancana',
+            index=models.Index(fields=['created_at', 'id'], name='drh_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notadinas',
+            index=models.Index(fields=['tanggal', 'id'], name='notadinas_tanggal_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sisacuti',
+            index=models.Index(fields=['tahun_n'], name='sisacuti_tahun_n_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='siswa',
+            index=models.Index(fields=['nama'], name='siswa_nama_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='siswa',
+            index=models.Index(fields=['jurusan', 'nama'], name='siswa_jurusan_nama_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='siswa',
+            index=models.Index(fields=['kelas', 'jurusan'], name='siswa_kelas_jurusan_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='siswa',
+            index=models.Index(fields=['nis'], name='siswa_nis_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='siswa',
+            index=models.Index(fields=['updated_at', 'id'], name='siswa_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='siswakeluar',
+            index=models.Index(fields=['tanggal_keluar'], name='siswakeluar_tanggal_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='spmt',
+            index=models.Index(fields=['created_at', 'id'], name='spmt_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sptjm',
+            index=models.Index(fields=['created_at', 'id'], name='sptjm_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stsatyalancana',
+            index=models.Index(fields=['tanggal', 'id'], name='satyalancana_tanggal_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='suratcuti',
+            index=models.Index(fields=['pegawai', 'tanggal_awal'], name='suratcuti_pegawai_awal_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='suratcuti',
+            index=models.Index(fields=['tanggal_surat'], name='suratcuti_tanggal_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='suratcuti',
+            index=models.Index(fields=['updated_at', 'id'], name='suratcuti_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='suratdispensasi',
+            index=models.Index(fields=['created_at', 'id'], name='dispensasi_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='suratketerangan',
+            index=models.Index(fields=['created_at', 'id'], name='suratket_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='suratkp4',
+            index=models.Index(fields=['created_at', 'id'], name='kp4_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='suratkp4',
+            index=models.Index(fields=['tanggal_ditetapkan'], name='kp4_ditetapkan_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='suratpanggilansiswa',
+            index=models.Index(fields=['created_at', 'id'], name='panggilan_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='suratpanggilansiswa',
+            index=models.Index(fields=['tanggal_ditetapkan'], name='panggilan_ditetapkan_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='suratpengantar',
+            index=models.Index(fields=['created_at', 'id'], name='pengantar_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='suratperintahtugas',
+            index=models.Index(fields=['created_at', 'id'], name='spt_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='suratperintahtugas',
+            index=models.Index(fields=['updated_at', 'id'], name='spt_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='suratrekomendasistudilanjut',
+            index=models.Index(fields=['created_at', 'id'], name='rekomendasi_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='suratrekomendasistudilanjut',
+            index=models.Index(fields=['tanggal_ditetapkan'], name='rekomendasi_ditetapkan_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='suratresmi',
+            index=models.Index(fields=['created_at', 'id'], name='suratresmi_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='suratresmi',
+            index=models.Index(fields=['tanggal_ditetapkan'], name='suratresmi_ditetapkan_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='suratsantunankorpri',
+            index=models.Index(fields=['created_at', 'id'], name='santunan_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='suratumum',
+            index=models.Index(fields=['created_at', 'id'], name='suratumum_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='suratundangan',
+            index=models.Index(fields=['created_at', 'id'], name='undangan_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='suratundangan',
+            index=models.Index(fields=['tanggal_ditetapkan'], name='undangan_ditetapkan_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='suratusulan',
+            index=models.Index(fields=['tanggal', 'id'], name='suratusulan_tanggal_idx'),
+        ),
+    ]
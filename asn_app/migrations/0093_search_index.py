@@ -0,0 +1,72 @@
+# Generated by Django 4.2.30 on 2026-10-18 12:05
+
+from django.db import migrations
+
+# Salinan dari asn_app/search.py saat migrasi ini dibuat; perubahan sumber
+# pencarian berikutnya diterapkan lewat ``manage.py rebuild_search_index``
+TABLE = 'asn_app_search'
+ROWID_SPAN = 10 ** 12
+CREATE_SQL = (
+    f'CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} '
+    f"USING fts5(title, body, tokenize = 'unicode61 remove_diacritics 2')"
+)
+DROP_SQL = f'DROP TABLE IF EXISTS {TABLE}'
+
+# (model, kode rowid, kolom title, kolom body)
+SOURCES = [
+    ('ASN', 1, ['nama'], ['nip', 'jabatan']),
+    ('Siswa', 2, ['nama'], ['nis', 'kelas', 'jurusan']),
+    ('SuratCuti', 3, ['perihal_surat'], ['nomor_surat']),
+    ('SuratPerintahTugas', 4, ['nama_kegiatan'], ['nomor_spt']),
+    ('SuratSantunanKorpri', 5, ['perihal'], ['nomor_surat']),
+    ('NotaDinas', 6, ['hal'], ['nomor']),
+    ('SuratUsulan', 7, ['hal'], ['nomor']),
+    ('SuratResmi', 8, ['perihal'], ['nomor', 'pejabat_tujuan_surat']),
+    ('SPTJM', 9, [], ['nomor_surat', 'isi_surat']),
+    ('SPMT', 10, ['tentang'], ['nomor_surat']),
+    ('SuratKeterangan', 11, [], ['nomor_surat']),
+    ('SuratRekomendasiStudiLanjut', 12, ['program_studi', 'nama_universitas'], ['nomor_surat']),
+    ('SuratPanggilanSiswa', 13, ['alasan_panggilan'], ['nomor_surat']),
+    ('SuratUndangan', 14, ['perihal'], ['nomor_surat']),
+    ('SuratDispensasi', 15, ['nama_kegiatan'], ['nomor_surat']),
+    ('StSatyalancana', 16, ['kepada_nama'], ['nomor']),
+    ('SuratPengantar', 17, ['tujuan_surat'], ['nomor_surat']),
+]
+
+
+def _text(values):
+    return ' '.join('' if value is None else str(value) for value in values)
+
+
+def create_search_index(apps, schema_editor):
+    # Tabel FTS5 hanya ada di SQLite; database lain memakai icontains
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(CREATE_SQL)
+
+    insert = f'INSERT OR REPLACE INTO {TABLE} (rowid, title, body) VALUES (%s, %s, %s)'
+    with schema_editor.connection.cursor() as cursor:
+        for model_name, code, title_fields, body_fields in SOURCES:
+            model = apps.get_model('asn_app', model_name)
+            split = len(title_fields)
+            rows = model.objects.order_by('pk').values_list('pk', *title_fields, *body_fields)
+            cursor.executemany(insert, [
+                (code * ROWID_SPAN + pk, _text(values[:split]), _text(values[split:]))
+                for pk, *values in rows.iterator(chunk_size=1000)
+            ])
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(DROP_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asn_app', '0092_hot_column_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.30 on 2026-10-18 12:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asn_app', '0093_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='asn',
+            name='foto_cetak',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='asn_fotos/cetak/', verbose_name='Foto (Cetak)'),
+        ),
+        migrations.AddField(
+            model_name='asn',
+            name='foto_thumb',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='asn_fotos/thumb/', verbose_name='Foto (Thumbnail)'),
+        ),
+        migrations.AddField(
+            model_name='fotokegiatan',
+            name='foto_cetak',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='foto_kegiatan/cetak/', verbose_name='Foto (Cetak)'),
+        ),
+        migrations.AddField(
+            model_name='fotokegiatan',
+            name='foto_thumb',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='foto_kegiatan/thumb/', verbose_name='Foto (Thumbnail)'),
+        ),
+        migrations.AddField(
+            model_name='siswa',
+            name='foto_cetak',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='siswa_fotos/cetak/', verbose_name='Foto (Cetak)'),
+        ),
+        migrations.AddField(
+            model_name='siswa',
+            name='foto_thumb',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='siswa_fotos/thumb/', verbose_name='Foto (Thumbnail)'),
+        ),
+    ]
@@ -1,10 +1,71 @@
 # asn_app/models.py
+import os
+
 from django.db import models
 from django.urls import reverse
 from django.core.exceptions import ValidationError
 
 
-class ASN(models.Model):
+class FotoTurunanMixin:
+    """
+    Model dengan field ``foto`` beserta turunannya ``foto_cetak`` (dipakai PDF)
+    dan ``foto_thumb`` (dipakai halaman daftar/detail). Turunan dibuat sekali
+    setelah foto di-upload atau diganti (lihat ``asn_app/images.py``).
+    """
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if self.pk and (update_fields is None or 'foto' in update_fields):
+            old_foto = type(self).objects.filter(pk=self.pk).values_list('foto', flat=True).first()
+            if old_foto != self.foto.name:
+                self.foto_cetak = None
+                self.foto_thumb = None
+        super().save(*args, **kwargs)
+        if self.foto and not self.foto_cetak:
+            self.generate_foto_turunan()
+
+    def generate_foto_turunan(self, commit=True):
+        """
+        Buat ulang versi cetak dan thumbnail dari foto asli. Dengan
+        ``commit=False`` kolom turunan tidak langsung di-update (untuk
+        ``bulk_update`` oleh pemanggil).
+        """
+        try:
+            self.foto.open('rb')
+            created = self.build_foto_turunan(self.foto)
+        except (OSError, ValueError):
+            created = False
+        finally:
+            self.foto.close()
+        if created and commit:
+            type(self).objects.filter(pk=self.pk).update(foto_cetak=self.foto_cetak.name, foto_thumb=self.foto_thumb.name)
+        return created
+
+    def build_foto_turunan(self, source):
+        """Tulis file turunan dari ``source`` tanpa menyimpan baris (dipakai juga upload massal)."""
+        from .images import make_foto_derivatives
+
+        derivatives = make_foto_derivatives(source)
+        if derivatives is None:
+            return False
+        cetak, thumb = derivatives
+        base_name = os.path.splitext(os.path.basename(self.foto.name))[0]
+        self.foto_cetak.save(f'{base_name}.jpg', cetak, save=False)
+        self.foto_thumb.save(f'{base_name}.jpg', thumb, save=False)
+        return True
+
+    @property
+    def foto_pdf(self):
+        """Foto untuk PDF/cetak: versi cetak bila ada, selain itu foto asli."""
+        return self.foto_cetak or self.foto
+
+    @property
+    def foto_preview(self):
+        """Foto untuk halaman daftar/detail: thumbnail bila ada, selain itu foto asli."""
+        return self.foto_thumb or self.foto
+
+
+class ASN(FotoTurunanMixin, models.Model):
     JENIS_KELAMIN_CHOICES = [
         ('L', 'Laki-laki'),
         ('P', 'Perempuan'),
@@ -34,6 +95,8 @@ class ASN(models.Model):
     nama_istri_suami = models.CharField(max_length=100, blank=True, null=True, verbose_name='Nama Istri/Suami')
     unit_kerja = models.CharField(max_length=100)
     foto = models.ImageField(upload_to='asn_fotos/', blank=True, null=True)
+    foto_cetak = models.ImageField(upload_to='asn_fotos/cetak/', blank=True, null=True, editable=False, verbose_name='Foto (Cetak)')
+    foto_thumb = models.ImageField(upload_to='asn_fotos/thumb/', blank=True, null=True, editable=False, verbose_name='Foto (Thumbnail)')
     pendidikan_terakhir = models.CharField(max_length=255, blank=True, verbose_name='Pendidikan Terakhir')
     tmt_pangkat = models.DateField(null=True, blank=True, verbose_name='TMT Pangkat')
     tmt_cpns = models.DateField(null=True, blank=True, verbose_name='TMT CPNS')
@@ -41,6 +104,12 @@ class ASN(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['nama'], name='asn_nama_idx'),
+            models.Index(fields=['updated_at', 'id'], name='asn_updated_idx'),
+        ]
+
     def __str__(self):
         return f"{self.nip} - {self.nama}"
 
@@ -48,6 +117,8 @@ class ASN(models.Model):
 class KopSurat(models.Model):
     nama = models.CharField(max_length=100, verbose_name='Nama Kop Surat')
     gambar = models.ImageField(upload_to='kop_surat/', verbose_name='Gambar Kop Surat')
+    # Versi cetak (diperkecil + dikompres) yang dipakai semua template PDF
+    gambar_cetak = models.ImageField(upload_to='kop_surat/cetak/', blank=True, null=True, editable=False, verbose_name='Gambar Kop Surat (Cetak)')
     deskripsi = models.TextField(blank=True, null=True, verbose_name='Deskripsi')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -55,6 +126,39 @@ class KopSurat(models.Model):
     def __str__(self):
         return self.nama
 
+    def save(self, *args, **kwargs):
+        if self.pk:
+            old_gambar = KopSurat.objects.filter(pk=self.pk).values_list('gambar', flat=True).first()
+            if old_gambar != self.gambar.name:
+                self.gambar_cetak = None
+        super().save(*args, **kwargs)
+        if self.gambar and not self.gambar_cetak:
+            self.generate_gambar_cetak()
+
+    def generate_gambar_cetak(self):
+        """Buat ulang gambar versi cetak dari gambar asli (sekali per upload)."""
+        from .images import make_kop_surat_print
+
+        try:
+            self.gambar.open('rb')
+            content = make_kop_surat_print(self.gambar)
+        except (OSError, ValueError):
+            content = None
+        finally:
+            self.gambar.close()
+        if content is None:
+            return False
+
+        base_name = os.path.splitext(os.path.basename(self.gambar.name))[0]
+        self.gambar_cetak.save(f'{base_name}.png', content, save=False)
+        KopSurat.objects.filter(pk=self.pk).update(gambar_cetak=self.gambar_cetak.name)
+        return True
+
+    @property
+    def gambar_pdf(self):
+        """Gambar yang dipakai di PDF: versi cetak bila ada, selain itu gambar asli."""
+        return self.gambar_cetak or self.gambar
+
 
 class SuratPerintahTugas(models.Model):
     peserta = models.ManyToManyField(ASN, related_name='spt_peserta', verbose_name='Peserta')
@@ -87,25 +191,22 @@ class SuratPerintahTugas(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='spt_created_idx'),
+            models.Index(fields=['updated_at', 'id'], name='spt_updated_idx'),
+        ]
+
     def __str__(self):
         return f"SPT {self.nomor_spt} - {self.nama_kegiatan}"
 
     @property
     def jumlah_hari(self):
-        from .models import HariLibur
+        from .workdays import get_calendar
         if self.tanggal_pelaksanaan and self.tanggal_akhir_pelaksanaan:
-            total = 0
-            d = self.tanggal_pelaksanaan
-            while d <= self.tanggal_akhir_pelaksanaan:
-                if d.weekday() < 5 and not HariLibur.objects.filter(tanggal=d).exists():
-                    total += 1
-                d += timedelta(days=1)
-            return total
+            return get_calendar().working_days(self.tanggal_pelaksanaan, self.tanggal_akhir_pelaksanaan)
         elif self.tanggal_pelaksanaan:
-            d = self.tanggal_pelaksanaan
-            if d.weekday() < 5 and not HariLibur.objects.filter(tanggal=d).exists():
-                return 1
-            return 0
+            return 1 if get_calendar().is_working_day(self.tanggal_pelaksanaan) else 0
         return 1
 
 
@@ -123,9 +224,11 @@ class DasarSurat(models.Model):
         return f"Dasar Surat {self.urutan}: {self.isi[:50]}"
 
 
-class FotoKegiatan(models.Model):
+class FotoKegiatan(FotoTurunanMixin, models.Model):
     spt = models.ForeignKey(SuratPerintahTugas, related_name='foto_kegiatan', on_delete=models.CASCADE)
     foto = models.ImageField(upload_to='foto_kegiatan/')
+    foto_cetak = models.ImageField(upload_to='foto_kegiatan/cetak/', blank=True, null=True, editable=False, verbose_name='Foto (Cetak)')
+    foto_thumb = models.ImageField(upload_to='foto_kegiatan/thumb/', blank=True, null=True, editable=False, verbose_name='Foto (Thumbnail)')
     keterangan = models.CharField(max_length=255, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -148,6 +251,11 @@ class SuratSantunanKorpri(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='santunan_created_idx'),
+        ]
+
     def __str__(self):
         return self.nomor_surat
 
@@ -166,6 +274,11 @@ class NotaDinas(models.Model):
     penanda_tangan = models.ForeignKey(ASN, on_delete=models.CASCADE, related_name='penanda_tangan_nota_dinas')
     kop_surat = models.ForeignKey(KopSurat, on_delete=models.CASCADE, null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['tanggal', 'id'], name='notadinas_tanggal_idx'),
+        ]
+
     def __str__(self):
         return self.hal
 
@@ -182,7 +295,7 @@ class HariLibur(models.Model):
     def __str__(self):
         return f"{self.nama_hari} ({self.tanggal})"
 
-from datetime import date, timedelta
+from datetime import date
 
 class SuratCuti(models.Model):
     JENIS_CUTI_CHOICES = [
@@ -208,16 +321,30 @@ class SuratCuti(models.Model):
     alasan_cuti = models.TextField(blank=True, null=True, verbose_name='Alasan Cuti')
     penandatangan = models.ForeignKey(ASN, on_delete=models.SET_NULL, null=True, blank=True, related_name='surat_cuti_penandatangan', verbose_name='Penandatangan')
     kop_surat = models.ForeignKey(KopSurat, on_delete=models.SET_NULL, null=True, blank=True, verbose_name='Kop Surat')
+    # Jumlah hari kerja cuti, dihitung saat disimpan dan saat HariLibur berubah
+    hari_efektif = models.PositiveIntegerField(default=0, editable=False, verbose_name='Hari Efektif')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name_plural = "Surat Cuti"
         ordering = ['-tanggal_surat']
+        indexes = [
+            models.Index(fields=['pegawai', 'tanggal_awal'], name='suratcuti_pegawai_awal_idx'),
+            models.Index(fields=['tanggal_surat'], name='suratcuti_tanggal_idx'),
+            models.Index(fields=['updated_at', 'id'], name='suratcuti_updated_idx'),
+        ]
 
     def __str__(self):
         return f"Surat Cuti {self.pegawai.nama} - {self.tanggal_surat}"
 
+    def save(self, *args, **kwargs):
+        self.hari_efektif = self.calculate_effective_leave_days()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'hari_efektif'}
+        super().save(*args, **kwargs)
+
     def calculate_effective_leave_days(self):
         """
         Hitung jumlah hari cuti efektif (hari kerja).
@@ -230,25 +357,13 @@ class SuratCuti(models.Model):
         Returns:
             int: Jumlah hari kerja efektif
         """
-        if not self.tanggal_awal or not self.tanggal_akhir:
-            return 0
-
-        # Fetch all holidays in range once (avoid N+1 queries)
-        holidays = set(
-            HariLibur.objects.filter(
-                tanggal__gte=self.tanggal_awal,
-                tanggal__lte=self.tanggal_akhir
-            ).values_list('tanggal', flat=True)
-        )
+        from .workdays import working_days
+        return working_days(self.tanggal_awal, self.tanggal_akhir)
+
+def current_leave_year():
+    """Tahun N untuk SisaCuti baru."""
+    return date.today().year
 
-        total_days = 0
-        current_date = self.tanggal_awal
-        while current_date <= self.tanggal_akhir:
-            # Skip weekend (Sabtu=5, Minggu=6) dan hari libur
-            if current_date.weekday() < 5 and current_date not in holidays:
-                total_days += 1
-            current_date += timedelta(days=1)
-        return total_days
 
 class SisaCuti(models.Model):
     pegawai = models.OneToOneField(ASN, on_delete=models.CASCADE, related_name='sisa_cuti', verbose_name='Pegawai')
@@ -261,12 +376,26 @@ class SisaCuti(models.Model):
     sisa_tahun_n_1 = models.IntegerField(default=6, verbose_name='Sisa Tahun N-1')
     sisa_tahun_n_2 = models.IntegerField(default=6, verbose_name='Sisa Tahun N-2')
     total_sisa_cuti = models.IntegerField(default=24, verbose_name='Total Sisa Cuti')
+    # Hari cuti terpakai per tahun (dijaga inkremental oleh signal SuratCuti)
+    terpakai_tahun_n = models.IntegerField(default=0, editable=False, verbose_name='Terpakai Tahun N')
+    terpakai_tahun_n_1 = models.IntegerField(default=0, editable=False, verbose_name='Terpakai Tahun N-1')
+    terpakai_tahun_n_2 = models.IntegerField(default=0, editable=False, verbose_name='Terpakai Tahun N-2')
+    # Tahun kalender yang diwakili bucket N; digeser eksplisit oleh rollover_sisa_cuti
+    tahun_n = models.PositiveIntegerField(default=current_leave_year, editable=False, verbose_name='Tahun N')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    BALANCE_FIELDS = [
+        'terpakai_tahun_n', 'terpakai_tahun_n_1', 'terpakai_tahun_n_2',
+        'sisa_tahun_n', 'sisa_tahun_n_1', 'sisa_tahun_n_2', 'total_sisa_cuti', 'tahun_n', 'updated_at',
+    ]
+
     class Meta:
         verbose_name_plural = "Sisa Cuti"
         ordering = ['pegawai__nama']
+        indexes = [
+            models.Index(fields=['tahun_n'], name='sisacuti_tahun_n_idx'),
+        ]
 
     def save(self, *args, **kwargs):
         self.total_sisa_cuti = self.sisa_tahun_n + self.sisa_tahun_n_1 + self.sisa_tahun_n_2
@@ -277,69 +406,84 @@ class SisaCuti(models.Model):
 
     @staticmethod
     def get_current_year():
-        from datetime import date
-        return date.today().year
+        return current_leave_year()
 
-    def calculate_sisa_cuti_from_surat(self):
+    @staticmethod
+    def carry_over(initial_n, initial_n_1, initial_n_2, used_n, used_n_1, used_n_2):
         """
-        Calculate remaining leave (sisa cuti) for years N, N-1, N-2 based on approved SuratCuti records.
-        Uses initial allocation values (editable) and subtracts used leave.
-
-        Dynamic Continuous Logic:
+        Dynamic Continuous Logic, returns (sisa_n, sisa_n_1, sisa_n_2):
         - Year N: Initial allocation - used in year N
         - Year N-1: Initial allocation - used in year N-1, BUT if year N usage > initial N-1, then N-1 = 0
         - Year N-2: Initial allocation - used in year N-2, BUT if year N-1 usage > initial N-2, then N-2 = 0
         """
-        current_year = self.get_current_year()
+        sisa_n = max(0, initial_n - used_n)
+        sisa_n_1 = 0 if used_n > initial_n_1 else max(0, initial_n_1 - used_n_1)
+        sisa_n_2 = 0 if used_n_1 > initial_n_2 else max(0, initial_n_2 - used_n_2)
+        return sisa_n, sisa_n_1, sisa_n_2
+
+    def terpakai_field(self, year):
+        """Nama field terpakai untuk ``year``, atau None jika di luar N..N-2."""
+        offset = self.tahun_n - year
+        return {0: 'terpakai_tahun_n', 1: 'terpakai_tahun_n_1', 2: 'terpakai_tahun_n_2'}.get(offset)
+
+    def apply_carry_over(self):
+        """Hitung sisa dari alokasi awal dan hari terpakai yang tersimpan."""
+        self.sisa_tahun_n, self.sisa_tahun_n_1, self.sisa_tahun_n_2 = self.carry_over(
+            self.initial_tahun_n, self.initial_tahun_n_1, self.initial_tahun_n_2,
+            self.terpakai_tahun_n, self.terpakai_tahun_n_1, self.terpakai_tahun_n_2,
+        )
+        self.total_sisa_cuti = self.sisa_tahun_n + self.sisa_tahun_n_1 + self.sisa_tahun_n_2
+
+    def apply_leave_delta(self, year, days):
+        """
+        Tambah (atau kurangi, jika negatif) hari terpakai pada tahun ``year``
+        lalu terapkan ulang aturan sisa. False jika tahun di luar N..N-2.
+        """
+        field = self.terpakai_field(year)
+        if field is None:
+            return False
+        setattr(self, field, getattr(self, field) + days)
+        self.apply_carry_over()
+        return True
+
+    def bucket(self, year):
+        """(alokasi awal, sisa) untuk tahun kalender ``year``, atau (0, 0)."""
+        offset = self.tahun_n - year
+        if offset == 0:
+            return self.initial_tahun_n, self.sisa_tahun_n
+        if offset == 1:
+            return self.initial_tahun_n_1, self.sisa_tahun_n_1
+        if offset == 2:
+            return self.initial_tahun_n_2, self.sisa_tahun_n_2
+        return 0, 0
+
+    def calculate_sisa_cuti_from_surat(self):
+        """
+        Calculate remaining leave (sisa cuti) for years N, N-1, N-2 based on approved SuratCuti records.
+        Uses initial allocation values (editable) and subtracts used leave (see ``carry_over``).
+        Years are relative to the stored ``tahun_n``.
+        """
+        if not self.tahun_n:
+            self.tahun_n = self.get_current_year()
+        current_year = self.tahun_n
         year_n = current_year
         year_n_1 = current_year - 1
         year_n_2 = current_year - 2
 
-        # Get initial allocation (editable values)
-        initial_n = self.initial_tahun_n
-        initial_n_1 = self.initial_tahun_n_1
-        initial_n_2 = self.initial_tahun_n_2
-
-        # Get all approved surat cuti for this pegawai
-        surat_cuti_list = SuratCuti.objects.filter(pegawai=self.pegawai)
-
-        # Calculate used leave days per year
-        used_n = 0
-        used_n_1 = 0
-        used_n_2 = 0
-
-        for surat_cuti in surat_cuti_list:
-            # Get the year from tanggal_awal
-            leave_year = surat_cuti.tanggal_awal.year
-            leave_days = surat_cuti.calculate_effective_leave_days()
-
-            if leave_year == year_n:
-                used_n += leave_days
-            elif leave_year == year_n_1:
-                used_n_1 += leave_days
-            elif leave_year == year_n_2:
-                used_n_2 += leave_days
-
-        # Calculate remaining leave for year N (current year)
-        self.sisa_tahun_n = max(0, initial_n - used_n)
-
-        # Dynamic continuous logic for N-1:
-        # If year N usage > initial N-1, then N-1 becomes 0
-        # Otherwise, N-1 = initial - used in N-1
-        if used_n > initial_n_1:
-            self.sisa_tahun_n_1 = 0
-        else:
-            self.sisa_tahun_n_1 = max(0, initial_n_1 - used_n_1)
-
-        # Dynamic continuous logic for N-2:
-        # If year N-1 usage > initial N-2, then N-2 becomes 0
-        # Otherwise, N-2 = initial - used in N-2
-        if used_n_1 > initial_n_2:
-            self.sisa_tahun_n_2 = 0
-        else:
-            self.sisa_tahun_n_2 = max(0, initial_n_2 - used_n_2)
-
-        self.total_sisa_cuti = self.sisa_tahun_n + self.sisa_tahun_n_1 + self.sisa_tahun_n_2
+        # Calculate used leave days per year (stored hari_efektif, one query)
+        used_per_year = dict(
+            SuratCuti.objects.filter(
+                pegawai=self.pegawai,
+                tanggal_awal__year__in=[year_n, year_n_1, year_n_2]
+            )
+            .values_list('tanggal_awal__year')
+            .annotate(total=models.Sum('hari_efektif'))
+            .order_by()
+        )
+        self.terpakai_tahun_n = used_per_year.get(year_n) or 0
+        self.terpakai_tahun_n_1 = used_per_year.get(year_n_1) or 0
+        self.terpakai_tahun_n_2 = used_per_year.get(year_n_2) or 0
+        self.apply_carry_over()
 
         return {
             'initial_tahun_n': self.initial_tahun_n,
@@ -357,7 +501,32 @@ class SisaCuti(models.Model):
         self.save()
 
 
-class Siswa(models.Model):
+class RiwayatSisaCuti(models.Model):
+    """Saldo cuti akhir tahun, disimpan oleh rollover sebelum bucket digeser."""
+    pegawai = models.ForeignKey(ASN, on_delete=models.CASCADE, related_name='riwayat_sisa_cuti', verbose_name='Pegawai')
+    tahun = models.PositiveIntegerField(verbose_name='Tahun')
+    initial_tahun_n = models.IntegerField(verbose_name='Alokasi Awal Tahun N')
+    initial_tahun_n_1 = models.IntegerField(verbose_name='Alokasi Awal Tahun N-1')
+    initial_tahun_n_2 = models.IntegerField(verbose_name='Alokasi Awal Tahun N-2')
+    terpakai_tahun_n = models.IntegerField(verbose_name='Terpakai Tahun N')
+    terpakai_tahun_n_1 = models.IntegerField(verbose_name='Terpakai Tahun N-1')
+    terpakai_tahun_n_2 = models.IntegerField(verbose_name='Terpakai Tahun N-2')
+    sisa_tahun_n = models.IntegerField(verbose_name='Sisa Tahun N')
+    sisa_tahun_n_1 = models.IntegerField(verbose_name='Sisa Tahun N-1')
+    sisa_tahun_n_2 = models.IntegerField(verbose_name='Sisa Tahun N-2')
+    total_sisa_cuti = models.IntegerField(verbose_name='Total Sisa Cuti')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name_plural = "Riwayat Sisa Cuti"
+        ordering = ['-tahun', 'pegawai__nama']
+        unique_together = [('pegawai', 'tahun')]
+
+    def __str__(self):
+        return f"Riwayat Sisa Cuti {self.pegawai.nama} {self.tahun} - Total: {self.total_sisa_cuti}"
+
+
+class Siswa(FotoTurunanMixin, models.Model):
     STATUS_CHOICES = [
         ('Aktif', 'Aktif'),
         ('Lulus', 'Lulus'),
@@ -372,7 +541,19 @@ class Siswa(models.Model):
     no_hp = models.CharField(max_length=15, blank=True, null=True)
     nama_orang_tua = models.CharField(max_length=100, blank=True, null=True, verbose_name='Nama Orang Tua')
     foto = models.ImageField(upload_to='siswa_fotos/', blank=True, null=True)
+    foto_cetak = models.ImageField(upload_to='siswa_fotos/cetak/', blank=True, null=True, editable=False, verbose_name='Foto (Cetak)')
+    foto_thumb = models.ImageField(upload_to='siswa_fotos/thumb/', blank=True, null=True, editable=False, verbose_name='Foto (Thumbnail)')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Aktif')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['nama'], name='siswa_nama_idx'),
+            models.Index(fields=['jurusan', 'nama'], name='siswa_jurusan_nama_idx'),
+            models.Index(fields=['kelas', 'jurusan'], name='siswa_kelas_jurusan_idx'),
+            models.Index(fields=['nis'], name='siswa_nis_idx'),
+            models.Index(fields=['updated_at', 'id'], name='siswa_updated_idx'),
+        ]
 
     def __str__(self):
         return self.nama
@@ -420,6 +601,9 @@ class SiswaKeluar(models.Model):
         verbose_name = 'Siswa Keluar'
         verbose_name_plural = 'Siswa Keluar'
         ordering = ['-tanggal_keluar']
+        indexes = [
+            models.Index(fields=['tanggal_keluar'], name='siswakeluar_tanggal_idx'),
+        ]
     
     def __str__(self):
         return f"{self.siswa.nama} - Keluar {self.tanggal_keluar}"
@@ -440,6 +624,11 @@ class SuratKeterangan(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='suratket_created_idx'),
+        ]
+
     def __str__(self):
         subject = "[Tanpa Subjek]" # Default value
         if self.pegawai:
@@ -476,6 +665,10 @@ class SuratRekomendasiStudiLanjut(models.Model):
     class Meta:
         verbose_name_plural = "Surat Rekomendasi Studi Lanjut"
         ordering = ['-tanggal_ditetapkan']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='rekomendasi_created_idx'),
+            models.Index(fields=['tanggal_ditetapkan'], name='rekomendasi_ditetapkan_idx'),
+        ]
 
     def __str__(self):
         subject = self.pegawai.nama if self.pegawai else "[Tanpa Pegawai]"
@@ -501,6 +694,10 @@ class SuratKP4(models.Model):
     class Meta:
         verbose_name_plural = "Surat KP4 (Tunjangan Keluarga)"
         ordering = ['-tanggal_ditetapkan']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='kp4_created_idx'),
+            models.Index(fields=['tanggal_ditetapkan'], name='kp4_ditetapkan_idx'),
+        ]
 
     def __str__(self):
         subject = self.pegawai.nama if self.pegawai else "[Tanpa Pegawai]"
@@ -551,6 +748,10 @@ class SuratResmi(models.Model):
     class Meta:
         verbose_name_plural = "Surat Resmi"
         ordering = ['-tanggal_ditetapkan']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='suratresmi_created_idx'),
+            models.Index(fields=['tanggal_ditetapkan'], name='suratresmi_ditetapkan_idx'),
+        ]
 
     def __str__(self):
         return f"Surat Resmi {self.nomor} - {self.perihal}"
@@ -568,6 +769,11 @@ class SPTJM(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='sptjm_created_idx'),
+        ]
+
     def __str__(self):
         return self.nomor_surat
 
@@ -592,6 +798,11 @@ class SPMT(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='spmt_created_idx'),
+        ]
+
     def __str__(self):
         return self.nomor_surat
 
@@ -610,6 +821,11 @@ class SuratUmum(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='suratumum_created_idx'),
+        ]
+
     def __str__(self):
         return f"Surat Umum untuk {self.pegawai.nama}"
 
@@ -644,6 +860,10 @@ class SuratPanggilanSiswa(models.Model):
     class Meta:
         verbose_name_plural = "Surat Panggilan Siswa"
         ordering = ['-tanggal_ditetapkan']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='panggilan_created_idx'),
+            models.Index(fields=['tanggal_ditetapkan'], name='panggilan_ditetapkan_idx'),
+        ]
 
     def __str__(self):
         return f"Surat Panggilan - {self.siswa.nama} - {self.nomor_surat}"
@@ -677,6 +897,10 @@ class SuratUndangan(models.Model):
     class Meta:
         verbose_name_plural = "Surat Undangan"
         ordering = ['-tanggal_ditetapkan']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='undangan_created_idx'),
+            models.Index(fields=['tanggal_ditetapkan'], name='undangan_ditetapkan_idx'),
+        ]
 
     def __str__(self):
         return f"Surat Undangan - {self.nomor_surat}"
@@ -704,6 +928,9 @@ class SuratDispensasi(models.Model):
     class Meta:
         verbose_name_plural = "Surat Dispensasi"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='dispensasi_created_idx'),
+        ]
 
     def __str__(self):
         return f"Surat Dispensasi {self.nomor_surat} - {self.nama_kegiatan}"
@@ -793,6 +1020,11 @@ class SuratUsulan(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['tanggal', 'id'], name='suratusulan_tanggal_idx'),
+        ]
+
     def __str__(self):
         return self.hal
 
@@ -832,6 +1064,11 @@ class StSatyalancana(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['tanggal', 'id'], name='satyalancana_tanggal_idx'),
+        ]
+
     def __str__(self):
         return f"Surat Tugas Satyalancana - {self.kepada_nama}"
 
@@ -856,6 +1093,11 @@ class DRHSatyalancana(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='drh_created_idx'),
+        ]
+
     def __str__(self):
         return f"DRH Satyalancana - {self.asn.nama}"
 
@@ -877,9 +1119,50 @@ class SuratPengantar(models.Model):
     class Meta:
         verbose_name_plural = "Surat Pengantar"
         ordering = ['-tanggal_surat']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='pengantar_created_idx'),
+        ]
 
     def __str__(self):
         return f"Surat Pengantar {self.nomor_surat}"
 
     def get_absolute_url(self):
-        return reverse('surat_pengantar_detail', kwargs={'pk': self.pk})
\ No newline at end of file
+        return reverse('surat_pengantar_detail', kwargs={'pk': self.pk})
+
+class PdfJob(models.Model):
+    """Antrian render PDF di background (lihat ``asn_app/pdf_jobs.py``)."""
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Menunggu'),
+        (STATUS_RUNNING, 'Diproses'),
+        (STATUS_DONE, 'Selesai'),
+        (STATUS_FAILED, 'Gagal'),
+    ]
+
+    document = models.CharField(max_length=50, verbose_name='Jenis Dokumen')
+    object_id = models.PositiveIntegerField(null=True, blank=True, verbose_name='ID Objek')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING, db_index=True, verbose_name='Status')
+    # Data request asal, supaya worker bisa membuat URL absolut yang sama
+    scheme = models.CharField(max_length=5, default='http')
+    host = models.CharField(max_length=255, blank=True)
+    path = models.CharField(max_length=255, blank=True)
+    query_string = models.TextField(blank=True)
+    file = models.FileField(upload_to='pdf_jobs/', blank=True, null=True, verbose_name='File PDF')
+    filename = models.CharField(max_length=255, blank=True, verbose_name='Nama File')
+    error = models.TextField(blank=True, verbose_name='Pesan Error')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name_plural = "PDF Job"
+        ordering = ['created_at']
+
+    def __str__(self):
+        return f"PDF {self.document} #{self.object_id} ({self.status})"
+
+    def get_absolute_url(self):
+        return reverse('pdf_job_status', kwargs={'pk': self.pk})
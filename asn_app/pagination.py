@@ -0,0 +1,140 @@
+# asn_app/pagination.py
+"""
+Paginasi daftar surat.
+
+``Paginator`` biasa memakai OFFSET: halaman ke-500 tetap membaca dan membuang
+4990 baris pertama. ``KeysetPaginator`` mencari halaman berikutnya/sebelumnya
+lewat nilai kunci urutan baris terakhir/pertama (``?after=`` / ``?before=``),
+mis. ``WHERE (created_at, id) < (...) ORDER BY created_at DESC, id DESC
+LIMIT 10``, sehingga biaya per halaman tetap walau arsip terus bertambah.
+
+Nomor halaman tetap ada (``?page=``) agar ``get_compact_page_range`` bisa
+dipakai: tautan nomor langsung melompat dengan OFFSET, tautan
+sebelumnya/berikutnya memakai cursor. Kolom kunci harus NOT NULL dan kunci
+terakhir harus unik (``pk``).
+"""
+import base64
+import json
+
+from django.core.paginator import EmptyPage, InvalidPage, Page, PageNotAnInteger, Paginator
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+PAGE_SIZE = 10
+
+# Kunci urutan yang umum dipakai daftar surat
+NEWEST_FIRST = ('-created_at', '-pk')
+LATEST_DATE_FIRST = ('-tanggal', '-pk')
+
+
+class KeysetPage(Page):
+    """Page dengan cursor untuk halaman sebelumnya/berikutnya."""
+
+    def __init__(self, object_list, number, paginator):
+        super().__init__(list(object_list), number, paginator)
+        self.next_cursor = paginator.cursor(self.object_list[-1]) if self.object_list else None
+        self.previous_cursor = paginator.cursor(self.object_list[0]) if self.object_list else None
+
+
+class KeysetPaginator(Paginator):
+    """Paginator dengan pencarian halaman berbasis kunci urutan (keyset/seek)."""
+
+    def __init__(self, object_list, per_page, keys=NEWEST_FIRST, **kwargs):
+        self.keys = [(key.lstrip('-'), key.startswith('-')) for key in keys]
+        opts = object_list.model._meta
+        self.fields = [opts.pk if name == 'pk' else opts.get_field(name) for name, _ in self.keys]
+        super().__init__(object_list.order_by(*keys), per_page, **kwargs)
+
+    def _get_page(self, *args, **kwargs):
+        return KeysetPage(*args, **kwargs)
+
+    def cursor(self, obj):
+        """Nilai kunci urutan ``obj`` sebagai string aman untuk URL."""
+        # value_to_string menyimpan mikrodetik penuh (DjangoJSONEncoder memotongnya)
+        values = [field.value_to_string(obj) for field in self.fields]
+        raw = json.dumps(values, separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            values = json.loads(raw)
+            if not isinstance(values, list) or len(values) != len(self.fields):
+                raise ValueError
+            return [field.to_python(value) for field, value in zip(self.fields, values)]
+        except (ValueError, TypeError, ValidationError):
+            raise InvalidPage('Cursor halaman tidak valid')
+
+    def _seek(self, values, forward):
+        """Filter baris sesudah (``forward``) atau sebelum ``values`` menurut urutan kunci."""
+        condition = Q()
+        equal = Q()
+        for (name, descending), value in zip(self.keys, values):
+            lookup = 'lt' if descending == forward else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        # Batas kolom pertama yang redundan agar database bisa memakai rentang indeks,
+        # bukan memindai indeks dari awal lalu menyaring kondisi OR di atas
+        (name, descending), value = self.keys[0], values[0]
+        return Q(**{f'{name}__{"lte" if descending == forward else "gte"}': value}) & condition
+
+    def rows_after(self, cursor):
+        """Baris sesudah ``cursor`` dalam urutan daftar (belum dipotong per halaman)."""
+        return self.object_list.filter(self._seek(self.decode_cursor(cursor), forward=True))
+
+    def rows_before(self, cursor):
+        """Baris sebelum ``cursor``, urutan terbalik (terdekat dulu)."""
+        reverse = [f'{"" if descending else "-"}{name}' for name, descending in self.keys]
+        return self.object_list.filter(self._seek(self.decode_cursor(cursor), forward=False)).order_by(*reverse)
+
+    def page_after(self, cursor, number):
+        return self._get_page(self.rows_after(cursor)[:self.per_page], number, self)
+
+    def page_before(self, cursor, number):
+        return self._get_page(reversed(list(self.rows_before(cursor)[:self.per_page])), number, self)
+
+    def get_keyset_page(self, number, after=None, before=None):
+        """
+        Seperti ``get_page``, tetapi memakai cursor bila ada. Cursor yang tidak
+        valid atau sudah tidak cocok (baris terhapus) jatuh ke OFFSET biasa.
+        """
+        try:
+            number = self.validate_number(number)
+        except PageNotAnInteger:
+            number = 1
+        except EmptyPage:
+            number = self.num_pages
+        try:
+            if after:
+                page = self.page_after(after, number)
+            elif before:
+                page = self.page_before(before, number)
+            else:
+                return self.page(number)
+        except InvalidPage:
+            return self.page(number)
+        return page if page.object_list else self.page(number)
+
+
+def paginate(request, queryset, per_page=PAGE_SIZE, keys=None):
+    """
+    Page untuk ``request``. Dengan ``keys`` (mis. ``NEWEST_FIRST``) daftar
+    diurutkan dan dipaginasi secara keyset; tanpa itu Paginator biasa.
+    """
+    if keys is None:
+        return Paginator(queryset, per_page).get_page(request.GET.get('page'))
+    paginator = KeysetPaginator(queryset, per_page, keys=keys)
+    return paginator.get_keyset_page(
+        request.GET.get('page'), after=request.GET.get('after'), before=request.GET.get('before'),
+    )
+
+
+class KeysetPaginationMixin:
+    """Untuk ListView: ``paginate_keys`` mengaktifkan paginasi keyset."""
+
+    paginate_by = PAGE_SIZE
+    paginate_keys = NEWEST_FIRST
+
+    def paginate_queryset(self, queryset, page_size):
+        page = paginate(self.request, queryset, page_size, keys=self.paginate_keys)
+        return page.paginator, page, page.object_list, page.has_other_pages()
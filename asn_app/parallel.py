@@ -0,0 +1,32 @@
+# asn_app/parallel.py
+"""
+Thread pool kecil untuk pekerjaan gambar (decode, resize, encode JPEG).
+
+Pillow melepas GIL selama operasi tersebut, sehingga thread sudah berjalan
+paralel tanpa perlu menyalin data ke proses lain. Dipakai upload foto
+kegiatan (``foto_upload``).
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+
+def get_workers():
+    return getattr(settings, 'FOTO_UPLOAD_WORKERS', None) or min(os.cpu_count() or 2, 8)
+
+
+def map_parallel(func, items, on_done=None):
+    """``[func(item) ...]`` dijalankan di thread pool, urutan hasil sama dengan ``items``."""
+    items = list(items)
+    if len(items) <= 1:
+        results = [func(item) for item in items]
+        if on_done and items:
+            on_done()
+        return results
+    with ThreadPoolExecutor(max_workers=min(get_workers(), len(items))) as pool:
+        futures = [pool.submit(func, item) for item in items]
+        if on_done:
+            for future in futures:
+                future.add_done_callback(lambda _future: on_done())
+        return [future.result() for future in futures]
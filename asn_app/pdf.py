@@ -0,0 +1,215 @@
+# asn_app/pdf.py
+"""
+Layanan render PDF terpadu.
+
+Setiap jenis surat didaftarkan sekali lewat ``register()`` (lihat
+``asn_app/documents.py``). View export cukup memanggil
+``export_pdf(request, 'nama_dokumen', pk)`` sehingga pengambilan kop surat,
+stylesheet, pemanggilan WeasyPrint dan pembuatan response hanya ada di satu
+tempat.
+"""
+import logging
+import re
+
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.template.loader import render_to_string
+
+from . import pdf_cache
+from .metrics import timer
+from .pdf_assets import LOCAL_BASE_URL, get_image_cache, get_url_fetcher
+from .pdf_styles import get_font_config, get_stylesheets
+
+logger = logging.getLogger(__name__)
+
+DOCUMENTS = {}
+
+class PdfDocument:
+    """Definisi satu jenis dokumen PDF.
+
+    - ``model`` / ``queryset``: sumber objek yang dicetak (boleh kosong untuk
+      laporan yang tidak terikat satu objek, mis. daftar siswa keluar).
+    - ``template_name``: nama template atau callable ``(obj) -> str``.
+    - ``context_name``: nama variabel objek di dalam template.
+    - ``get_context``: callable ``(obj, request) -> dict`` untuk konteks tambahan.
+    - ``get_kop_surat``: callable ``(obj) -> KopSurat``; default ``obj.kop_surat``.
+    - ``filename``: callable ``(obj, context) -> str`` tanpa ekstensi.
+    - ``stylesheets``: daftar string CSS tambahan untuk ``write_pdf`` (lihat
+      ``asn_app/pdf_styles.py``).
+    - ``attachment``: jika False, PDF ditampilkan inline di browser.
+    - ``cacheable``: jika False, PDF selalu dirender ulang (mis. isinya memuat
+      waktu cetak atau bergantung pada parameter request). Nama file dokumen
+      yang di-cache tidak boleh bergantung pada konteks render.
+    - ``get_cache_extra``: callable ``(obj) -> nilai`` untuk data di luar relasi
+      objek yang ikut menentukan isi PDF (masuk ke fingerprint cache).
+    """
+
+    def __init__(self, name, template_name, model=None, queryset=None, context_name='surat',
+                 get_context=None, get_kop_surat=None, filename=None, stylesheets=(),
+                 attachment=True, cacheable=True, get_cache_extra=None):
+        self.name = name
+        self.template_name = template_name
+        self.model = model
+        self.queryset = queryset
+        self.context_name = context_name
+        self.get_context = get_context
+        self.get_kop_surat = get_kop_surat
+        self.filename = filename
+        self.stylesheets = list(stylesheets)
+        self.attachment = attachment
+        self.cacheable = cacheable
+        self.get_cache_extra = get_cache_extra
+
+    def __repr__(self):
+        return f'<PdfDocument {self.name}>'
+
+    def get_queryset(self):
+        if self.queryset is not None:
+            return self.queryset.all()
+        return self.model._default_manager.all()
+
+    def get_object(self, pk):
+        if pk is None or (self.model is None and self.queryset is None):
+            return None
+        return get_object_or_404(self.get_queryset(), pk=pk)
+
+    def resolve_template(self, obj):
+        if callable(self.template_name):
+            return self.template_name(obj)
+        return self.template_name
+
+    def resolve_kop_surat(self, obj):
+        if self.get_kop_surat is not None:
+            return self.get_kop_surat(obj)
+        return getattr(obj, 'kop_surat', None)
+
+    def build_context(self, obj, request):
+        context = {'request': request}
+        if obj is not None:
+            context[self.context_name] = obj
+            context['kop_surat_url'] = kop_surat_url(self.resolve_kop_surat(obj))
+        if self.get_context is not None:
+            context.update(self.get_context(obj, request))
+        return context
+
+    def build_filename(self, obj, context):
+        if self.filename is None:
+            base = self.name if obj is None else f'{self.name}_{obj.pk}'
+        else:
+            base = self.filename(obj, context)
+        return f'{safe_filename(base)}.pdf'
+
+
+def register(name, **options):
+    """Daftarkan jenis dokumen baru ke registry."""
+    document = PdfDocument(name, **options)
+    DOCUMENTS[name] = document
+    return document
+
+
+def get_document(name):
+    try:
+        return DOCUMENTS[name]
+    except KeyError:
+        raise LookupError(f"Jenis dokumen PDF tidak terdaftar: {name}")
+
+
+def safe_filename(value):
+    """Ganti karakter yang tidak aman untuk nama file dengan '_'."""
+    return re.sub(r'[^\w\-]', '_', str(value or '')).strip('_') or 'dokumen'
+
+
+def kop_surat_url(kop_surat):
+    """URL gambar kop surat versi cetak, atau None bila tidak ada.
+
+    Kop surat lama yang belum punya versi cetak dibuatkan sekali di sini.
+    File-nya dibaca WeasyPrint langsung dari disk (lihat ``pdf_assets``).
+    """
+    if not kop_surat or not kop_surat.gambar:
+        return None
+    if not kop_surat.gambar_cetak:
+        kop_surat.generate_gambar_cetak()
+    return kop_surat.gambar_pdf.url
+
+
+def render_html(document, obj=None, request=None):
+    context = document.build_context(obj, request)
+    html_string = render_to_string(document.resolve_template(obj), context)
+    return html_string, context
+
+
+def _weasy_html(document, html_string, request=None):
+    from weasyprint import HTML
+
+    # URL media/static di template relatif terhadap base_url ini, lalu dibaca
+    # dari disk oleh url_fetcher
+    base_url = request.build_absolute_uri() if request is not None else LOCAL_BASE_URL
+    return HTML(string=html_string, base_url=base_url, url_fetcher=get_url_fetcher())
+
+
+def write_pdf(document, html_string, request=None):
+    html = _weasy_html(document, html_string, request)
+    with timer('weasyprint'):
+        return html.write_pdf(stylesheets=get_stylesheets(document), font_config=get_font_config(),
+                              cache=get_image_cache())
+
+
+def render_document(document, obj=None, request=None):
+    """Layout dokumen tanpa menulis PDF (``weasyprint.Document``), untuk digabung."""
+    html_string, context = render_html(document, obj, request)
+    html = _weasy_html(document, html_string, request)
+    with timer('weasyprint'):
+        return html.render(stylesheets=get_stylesheets(document), font_config=get_font_config(),
+                           cache=get_image_cache()), context
+
+
+def render_pdf(document, obj=None, request=None):
+    """Render dokumen menjadi bytes PDF. Mengembalikan (pdf_bytes, context)."""
+    html_string, context = render_html(document, obj, request)
+    return write_pdf(document, html_string, request), context
+
+
+def get_pdf(document, obj=None, request=None):
+    """PDF satu dokumen, dari cache bila ada. Mengembalikan (pdf_bytes, filename)."""
+    use_cache = obj is not None and document.cacheable and pdf_cache.is_enabled()
+    if use_cache:
+        cache_key = pdf_cache.fingerprint(document, obj, request)
+        result = pdf_cache.get(document, obj, cache_key)
+        if result is not None:
+            return result, document.build_filename(obj, {})
+
+    result, context = render_pdf(document, obj, request)
+    if use_cache:
+        pdf_cache.put(document, obj, cache_key, result)
+    return result, document.build_filename(obj, context)
+
+
+def pdf_response(document, result, filename):
+    response = HttpResponse(result, content_type='application/pdf')
+    if document.attachment:
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    else:
+        response['Content-Disposition'] = f'inline; filename="{filename}"'
+    return response
+
+
+def export_pdf(request, name, pk=None):
+    """Satu jalur export PDF untuk semua jenis surat.
+
+    Dengan ``?async=1`` PDF tidak dirender di request ini, melainkan
+    dimasukkan ke antrian worker (lihat ``asn_app/pdf_jobs.py``).
+    """
+    document = get_document(name)
+    obj = document.get_object(pk)
+
+    if request.GET.get('async') == '1':
+        from .pdf_jobs import enqueue, job_response
+        return job_response(request, enqueue(request, document, obj), status=202)
+
+    try:
+        result, filename = get_pdf(document, obj, request)
+    except Exception as e:
+        logger.error(f"Error writing PDF {document.name}: {e}", exc_info=True)
+        return HttpResponse(f"Error writing PDF: {e}", status=500)
+
+    return pdf_response(document, result, filename)
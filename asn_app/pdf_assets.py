@@ -0,0 +1,132 @@
+# asn_app/pdf_assets.py
+"""
+Gambar dan file lain yang dibaca WeasyPrint saat render PDF.
+
+Template PDF memakai URL media/static biasa (``{{ kop_surat.gambar_pdf.url }}``,
+``{{ foto.foto_pdf.url }}``). ``get_url_fetcher()`` membaca URL ``MEDIA_URL``
+dan ``STATIC_URL`` langsung dari disk (``MEDIA_ROOT``/``STATIC_ROOT`` atau
+finder staticfiles), tanpa request HTTP ke server sendiri dan tanpa base64
+di HTML. URL lain diteruskan ke fetcher bawaan WeasyPrint.
+
+``get_image_cache()`` adalah cache gambar WeasyPrint (opsi ``cache``) yang
+dipakai bersama oleh semua render di proses ini, sehingga kop surat yang sama
+hanya di-decode sekali. Nama file upload tidak pernah ditimpa (Django memberi
+nama baru), jadi entri berdasarkan URL tetap valid; cache dikosongkan utuh
+bila ukurannya melewati ``PDF_IMAGE_CACHE_MAX_BYTES``.
+"""
+import logging
+import mimetypes
+import os
+import threading
+from urllib.parse import unquote, urlsplit
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.exceptions import SuspiciousFileOperation
+from django.utils._os import safe_join
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_IMAGE_CACHE_MAX_BYTES = 100 * 1024 * 1024
+# Base URL untuk render tanpa request (worker PDF): URL relatif tetap bisa
+# di-resolve, dan URL media/static tetap dibaca dari disk
+LOCAL_BASE_URL = 'http://localhost/'
+
+
+def resolve_local_path(url):
+    """Path file di disk untuk URL media/static, atau None jika bukan file lokal."""
+    parts = urlsplit(url)
+    if parts.scheme not in ('', 'http', 'https'):
+        return None
+    path = unquote(parts.path)
+    roots = [(settings.MEDIA_URL, settings.MEDIA_ROOT), (settings.STATIC_URL, settings.STATIC_ROOT)]
+    for prefix, root in roots:
+        prefix = urlsplit(prefix or '').path
+        if not prefix or not path.startswith(prefix):
+            continue
+        relative = path[len(prefix):]
+        try:
+            candidate = safe_join(root, relative) if root else None
+        except SuspiciousFileOperation:
+            return None
+        if candidate and os.path.isfile(candidate):
+            return candidate
+        if prefix == urlsplit(settings.STATIC_URL or '').path:
+            # Belum collectstatic (mis. saat development): cari di static aplikasi
+            found = finders.find(relative)
+            if found:
+                return found
+    return None
+
+
+def _read(url, path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    mime_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    return data, mime_type
+
+
+def _legacy_fetcher(url, *args, **kwargs):
+    # WeasyPrint versi lama (tanpa kelas URLFetcher): fetcher berupa fungsi yang mengembalikan dict
+    from weasyprint import default_url_fetcher
+
+    path = resolve_local_path(url)
+    if path is None:
+        return default_url_fetcher(url, *args, **kwargs)
+    data, mime_type = _read(url, path)
+    return {'string': data, 'mime_type': mime_type, 'filename': os.path.basename(path), 'redirected_url': url}
+
+
+_url_fetcher = None
+
+
+def get_url_fetcher():
+    """Fetcher WeasyPrint yang membaca media/static dari disk, dibuat sekali per proses."""
+    global _url_fetcher
+    if _url_fetcher is None:
+        try:
+            from weasyprint.urls import URLFetcher, URLFetcherResponse
+        except ImportError:
+            _url_fetcher = _legacy_fetcher
+        else:
+            class LocalFileURLFetcher(URLFetcher):
+                def fetch(self, url, headers=None):
+                    path = resolve_local_path(url)
+                    if path is None:
+                        return super().fetch(url, headers)
+                    data, mime_type = _read(url, path)
+                    return URLFetcherResponse(url, data, {'Content-Type': mime_type})
+
+            _url_fetcher = LocalFileURLFetcher()
+    return _url_fetcher
+
+
+# --- Cache gambar ---
+
+_image_cache = {}
+_image_cache_lock = threading.Lock()
+
+
+def _cache_size(cache):
+    return sum(len(value) for value in list(cache.values()) if isinstance(value, (bytes, bytearray)))
+
+
+def get_image_cache():
+    """
+    Cache gambar untuk opsi ``cache`` WeasyPrint. Gambar yang sudah dipakai
+    entri lain tidak boleh dihapus satu per satu, jadi bila terlalu besar
+    cache diganti baru (render yang sedang berjalan tetap memakai yang lama).
+    """
+    global _image_cache
+    max_bytes = getattr(settings, 'PDF_IMAGE_CACHE_MAX_BYTES', DEFAULT_IMAGE_CACHE_MAX_BYTES)
+    with _image_cache_lock:
+        if max_bytes is not None and _cache_size(_image_cache) > max_bytes:
+            logger.info('PDF image cache over %s bytes, starting a new one', max_bytes)
+            _image_cache = {}
+        return _image_cache
+
+
+def clear_image_cache():
+    global _image_cache
+    with _image_cache_lock:
+        _image_cache = {}
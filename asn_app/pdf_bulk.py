@@ -0,0 +1,122 @@
+# asn_app/pdf_bulk.py
+"""
+Cetak massal: banyak surat sekaligus sebagai ZIP atau satu PDF gabungan.
+
+Mode ZIP merender surat-surat di pool proses milik request itu sendiri
+(dibuka dan ditutup di dalam ``export_zip``), sehingga proses web tidak
+menyimpan proses anak di antara request. FontConfiguration dan stylesheet
+yang sudah di-parse (lihat ``asn_app/pdf_styles.py``) dipakai ulang antar
+dokumen dalam satu worker. Mode gabungan harus me-layout semua halaman di
+satu proses karena halaman WeasyPrint tidak bisa dipindah antar proses.
+"""
+import logging
+import os
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.db import connections
+from django.http import Http404
+
+from .metrics import timer
+from .pdf import get_document, get_pdf, render_document, safe_filename
+from .pdf_jobs import build_request
+from .pdf_styles import warm_up_on_start
+
+logger = logging.getLogger(__name__)
+
+
+def get_max_documents():
+    return getattr(settings, 'PDF_BULK_MAX_DOCUMENTS', 300)
+
+
+def _init_worker():
+    # Koneksi database hasil fork tidak boleh dipakai bersama proses induk
+    connections.close_all()
+    warm_up_on_start()
+
+
+def get_processes(count):
+    """Jumlah proses untuk ``count`` surat, paling banyak ``PDF_BULK_PROCESSES``."""
+    processes = getattr(settings, 'PDF_BULK_PROCESSES', None) or os.cpu_count() or 2
+    return max(1, min(processes, count))
+
+
+def _request_data(request):
+    """Bagian request yang dibutuhkan worker (request asli tidak bisa di-pickle)."""
+    return {
+        'scheme': request.scheme,
+        'host': request.get_host(),
+        'path': request.path,
+        'query_string': '',
+    }
+
+
+def _render_one(name, pk, request_data):
+    """Dijalankan di proses worker: (bytes PDF, nama file) satu surat, None jika sudah dihapus."""
+    document = get_document(name)
+    try:
+        obj = document.get_object(pk)
+    except Http404:
+        return None
+    return get_pdf(document, obj, build_request(**request_data))
+
+
+def _unique_name(filename, used):
+    base, ext = os.path.splitext(filename)
+    candidate = filename
+    counter = 2
+    while candidate in used:
+        candidate = f'{base}_{counter}{ext}'
+        counter += 1
+    used.add(candidate)
+    return candidate
+
+
+def export_zip(request, document, pks):
+    """Render semua surat secara paralel dan tulis ke file ZIP sementara."""
+    # Surat yang sudah dihapus sejak dipilih dilewati (seperti export_merged)
+    existing = set(document.get_queryset().filter(pk__in=pks).values_list('pk', flat=True))
+    pks = [pk for pk in pks if pk in existing]
+    if not pks:
+        return None, None
+
+    request_data = _request_data(request)
+    archive = tempfile.TemporaryFile(suffix='.zip')
+    used = set()
+    # Tutup koneksi sebelum fork supaya tiap proses membuka koneksinya sendiri
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=get_processes(len(pks)), initializer=_init_worker) as pool:
+        futures = [pool.submit(_render_one, document.name, pk, request_data) for pk in pks]
+        # Isi PDF sudah terkompresi, jadi cukup disimpan tanpa kompresi ulang
+        with zipfile.ZipFile(archive, 'w', zipfile.ZIP_STORED) as zf:
+            for future in futures:
+                rendered = future.result()
+                if rendered is None:
+                    continue
+                result, filename = rendered
+                zf.writestr(_unique_name(filename, used), result)
+    archive.seek(0)
+    return archive, f'{safe_filename(document.name)}_{len(pks)}_surat.zip'
+
+
+def export_merged(request, document, pks):
+    """Gabungkan semua surat menjadi satu PDF."""
+    objects = document.get_queryset().in_bulk(pks)
+    pages = []
+    first = None
+    for pk in pks:
+        obj = objects.get(pk)
+        if obj is None:
+            continue
+        rendered, _ = render_document(document, obj, request)
+        if first is None:
+            first = rendered
+        pages.extend(rendered.pages)
+
+    if first is None:
+        return None, None
+    with timer('weasyprint'):
+        result = first.copy(pages).write_pdf()
+    return result, f'{safe_filename(document.name)}_{len(pks)}_surat.pdf'
@@ -0,0 +1,226 @@
+# asn_app/pdf_cache.py
+"""
+Cache PDF hasil render di disk.
+
+Nama file berisi fingerprint dari baris surat, baris-baris terkait (peserta,
+penandatangan, kop surat, dasar surat, dll.) dan mtime file template. Selama
+datanya tidak berubah, download berikutnya langsung membaca file tanpa
+menjalankan WeasyPrint lagi. Perubahan data menghasilkan fingerprint baru,
+sehingga entri lama tidak akan pernah terbaca lagi dan akan terhapus oleh
+eviksi LRU (atau langsung oleh signal, lihat ``asn_app/signals.py``).
+"""
+import glob
+import hashlib
+import logging
+import os
+import tempfile
+
+from django.conf import settings
+from django.db import models
+from django.template.loader import get_template
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+
+def get_cache_dir():
+    return getattr(settings, 'PDF_CACHE_DIR', os.path.join(settings.MEDIA_ROOT, 'pdf_cache'))
+
+
+def get_max_bytes():
+    return getattr(settings, 'PDF_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES)
+
+
+def is_enabled():
+    return getattr(settings, 'PDF_CACHE_ENABLED', True)
+
+
+def _row_values(obj):
+    """Nilai semua kolom konkret satu baris, urut sesuai definisi model."""
+    values = [obj._meta.label]
+    for field in obj._meta.concrete_fields:
+        value = field.value_from_object(obj)
+        if isinstance(field, models.FileField):
+            value = value.name if value else ''
+        values.append((field.attname, str(value)))
+    return values
+
+
+def _file_stamp(field_file):
+    if not field_file:
+        return None
+    try:
+        return (field_file.name, os.path.getmtime(field_file.path))
+    except (OSError, ValueError, NotImplementedError):
+        return (field_file.name, None)
+
+
+def _related_values(obj):
+    """Baris-baris yang ikut menentukan isi surat.
+
+    - ForeignKey (penandatangan, kop surat, pegawai, ...)
+    - ManyToMany (peserta, pegawai, siswa)
+    - relasi balik one-to-many (dasar surat, peserta nota dinas, anggota
+      keluarga KP4, ...) beserta ForeignKey milik baris tersebut
+    """
+    values = []
+    for field in obj._meta.get_fields():
+        if field.many_to_one and field.concrete:
+            related = getattr(obj, field.name)
+            values.append((field.name, _row_values(related) if related else None))
+        elif field.many_to_many and not field.auto_created:
+            rows = getattr(obj, field.name).order_by('pk')
+            values.append((field.name, [_row_values(row) for row in rows]))
+        elif field.one_to_many and field.auto_created:
+            accessor = field.get_accessor_name()
+            rows = getattr(obj, accessor).order_by('pk')
+            children = []
+            for row in rows:
+                child = _row_values(row)
+                for child_field in row._meta.concrete_fields:
+                    if child_field.many_to_one and child_field.remote_field.model is not type(obj):
+                        related = getattr(row, child_field.name)
+                        child.append((child_field.name, _row_values(related) if related else None))
+                children.append(child)
+            values.append((accessor, children))
+    return values
+
+
+def _template_stamp(template_name):
+    template = get_template(template_name)
+    path = getattr(template.origin, 'name', None)
+    try:
+        return (template_name, os.path.getmtime(path))
+    except (OSError, TypeError):
+        return (template_name, None)
+
+
+def fingerprint(document, obj, request=None):
+    """Hash isi surat: baris + relasi + kop surat + template + host request."""
+    parts = [
+        document.name,
+        _row_values(obj),
+        _related_values(obj),
+        _template_stamp(document.resolve_template(obj)),
+        document.stylesheets,
+    ]
+
+    kop_surat = document.resolve_kop_surat(obj)
+    if kop_surat is not None:
+        parts.append(_row_values(kop_surat))
+        parts.append(_file_stamp(kop_surat.gambar))
+
+    if document.get_cache_extra is not None:
+        parts.append(document.get_cache_extra(obj))
+
+    # URL absolut (tautan lampiran) bergantung pada host
+    if request is not None:
+        parts.append((request.scheme, request.get_host()))
+
+    return hashlib.sha256(repr(parts).encode('utf-8')).hexdigest()[:32]
+
+
+def _entry_prefix(name, pk):
+    return os.path.join(get_cache_dir(), f'{name}_{pk}_')
+
+
+def cache_path(document, obj, key):
+    return f'{_entry_prefix(document.name, obj.pk)}{key}.pdf'
+
+
+def get(document, obj, key):
+    """Baca PDF dari cache; None jika belum ada."""
+    path = cache_path(document, obj, key)
+    try:
+        with open(path, 'rb') as f:
+            result = f.read()
+    except OSError:
+        return None
+    # Sentuh mtime supaya entri yang sering dipakai tidak ikut tereviksi
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return result
+
+
+def put(document, obj, key, result):
+    """Simpan PDF ke cache (atomik), lalu jalankan eviksi jika perlu."""
+    cache_dir = get_cache_dir()
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Entri lama untuk surat yang sama sudah pasti basi
+        purge(document.name, obj.pk)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(result)
+        os.replace(tmp_path, cache_path(document, obj, key))
+    except OSError as e:
+        logger.error(f"Error writing PDF cache: {e}")
+        return
+    evict()
+
+
+def purge(name, pk):
+    """Hapus semua entri cache untuk satu surat."""
+    for path in glob.glob(f'{glob.escape(_entry_prefix(name, pk))}*.pdf'):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def evict(max_bytes=None):
+    """Hapus entri yang paling lama tidak dipakai sampai total ukuran <= batas."""
+    if max_bytes is None:
+        max_bytes = get_max_bytes()
+
+    entries = []
+    total = 0
+    for path in glob.glob(os.path.join(glob.escape(get_cache_dir()), '*.pdf')):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+        total += stat.st_size
+
+    if total <= max_bytes:
+        return
+
+    entries.sort()
+    for _, size, path in entries:
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        if total <= max_bytes:
+            break
+
+
+def invalidate_instance(instance, documents):
+    """Hapus cache surat yang terkait langsung dengan ``instance``.
+
+    Dipanggil dari signal. Mencakup surat itu sendiri dan surat induk dari
+    baris anak (mis. DasarSurat -> SPT, PesertaNotaDinas -> NotaDinas).
+    Perubahan pada baris yang dipakai banyak surat (ASN, KopSurat) cukup
+    ditangani fingerprint.
+    """
+    if not os.path.isdir(get_cache_dir()):
+        return
+    for document in documents:
+        if not document.cacheable:
+            continue
+        model = document.model or (document.queryset.model if document.queryset is not None else None)
+        if model is None:
+            continue
+        if isinstance(instance, model):
+            purge(document.name, instance.pk)
+            continue
+        for field in instance._meta.concrete_fields:
+            if field.many_to_one and field.remote_field.model is model:
+                parent_pk = getattr(instance, field.attname)
+                if parent_pk is not None:
+                    purge(document.name, parent_pk)
@@ -0,0 +1,139 @@
+# asn_app/pdf_jobs.py
+"""
+Antrian render PDF di background.
+
+``export_pdf`` dengan ``?async=1`` hanya membuat baris ``PdfJob`` lalu
+langsung mengembalikan id job. Proses ``python manage.py pdf_worker``
+mengambil job dari tabel tersebut dan merendernya di pool proses, sehingga
+worker web tidak tertahan oleh WeasyPrint. Hasilnya diambil lewat
+``pdf_job_status``.
+"""
+import logging
+from datetime import timedelta
+
+from django.core.files.base import ContentFile
+from django.db import close_old_connections
+from django.http import HttpRequest, JsonResponse, QueryDict
+from django.utils import timezone
+
+from .models import PdfJob
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(request, document, obj=None):
+    """Masukkan satu dokumen ke antrian dan kembalikan ``PdfJob``-nya."""
+    query = request.GET.copy()
+    query.pop('async', None)
+    return PdfJob.objects.create(
+        document=document.name,
+        object_id=obj.pk if obj is not None else None,
+        scheme=request.scheme,
+        host=request.get_host(),
+        path=request.path,
+        query_string=query.urlencode(),
+    )
+
+
+def build_request(scheme='http', host='', path='/', query_string=''):
+    """Request tiruan dengan host, path dan query yang sama seperti request asal."""
+    request = HttpRequest()
+    request.method = 'GET'
+    request.path = request.path_info = path or '/'
+    request.GET = QueryDict(query_string)
+    request.META['HTTP_HOST'] = host or 'localhost'
+    request.META['SERVER_NAME'] = (host or 'localhost').split(':')[0]
+    request.META['SERVER_PORT'] = '443' if scheme == 'https' else '80'
+    request.META['QUERY_STRING'] = query_string
+    if scheme == 'https':
+        # Dibaca lewat SECURE_PROXY_SSL_HEADER
+        request.META['HTTP_X_FORWARDED_PROTO'] = 'https'
+    return request
+
+
+def claim_next_job():
+    """Ambil satu job 'pending' secara atomik; None jika antrian kosong.
+
+    UPDATE bersyarat status memastikan satu job hanya diambil satu worker
+    walaupun ada beberapa proses ``pdf_worker`` yang berjalan.
+    """
+    while True:
+        job_id = (
+            PdfJob.objects.filter(status=PdfJob.STATUS_PENDING)
+            .order_by('created_at', 'pk')
+            .values_list('pk', flat=True)
+            .first()
+        )
+        if job_id is None:
+            return None
+        claimed = PdfJob.objects.filter(pk=job_id, status=PdfJob.STATUS_PENDING).update(
+            status=PdfJob.STATUS_RUNNING,
+            started_at=timezone.now(),
+        )
+        if claimed:
+            return job_id
+
+
+def run_job(job_id):
+    """Render satu job. Dijalankan di proses worker."""
+    from .pdf import get_document, get_pdf
+
+    close_old_connections()
+    job = PdfJob.objects.get(pk=job_id)
+    try:
+        document = get_document(job.document)
+        obj = document.get_object(job.object_id)
+        request = build_request(job.scheme, job.host, job.path, job.query_string)
+        result, filename = get_pdf(document, obj, request)
+    except Exception as e:
+        logger.error(f"Error writing PDF job {job.pk}: {e}", exc_info=True)
+        job.status = PdfJob.STATUS_FAILED
+        job.error = str(e)
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'error', 'finished_at'])
+        return job.status
+
+    job.file.save(f'{job.pk}_{filename}', ContentFile(result), save=False)
+    job.filename = filename
+    job.status = PdfJob.STATUS_DONE
+    job.finished_at = timezone.now()
+    job.save(update_fields=['file', 'filename', 'status', 'finished_at'])
+    return job.status
+
+
+def requeue_stale_jobs(older_than=timedelta(minutes=30)):
+    """Kembalikan job 'running' yang worker-nya mati ke antrian."""
+    cutoff = timezone.now() - older_than
+    return PdfJob.objects.filter(status=PdfJob.STATUS_RUNNING, started_at__lt=cutoff).update(
+        status=PdfJob.STATUS_PENDING,
+        started_at=None,
+    )
+
+
+def delete_old_jobs(older_than=timedelta(days=7)):
+    """Hapus job lama beserta file PDF-nya."""
+    cutoff = timezone.now() - older_than
+    count = 0
+    for job in PdfJob.objects.filter(created_at__lt=cutoff).exclude(status=PdfJob.STATUS_RUNNING):
+        if job.file:
+            job.file.delete(save=False)
+        job.delete()
+        count += 1
+    return count
+
+
+def job_response(request, job, status=200):
+    """Status job dalam bentuk JSON."""
+    data = {
+        'id': job.pk,
+        'document': job.document,
+        'object_id': job.object_id,
+        'status': job.status,
+        'status_url': request.build_absolute_uri(job.get_absolute_url()),
+    }
+    if job.status == PdfJob.STATUS_DONE:
+        data['download_url'] = data['status_url']
+        data['filename'] = job.filename
+    elif job.status == PdfJob.STATUS_FAILED:
+        data['error'] = job.error
+    return JsonResponse(data, status=status)
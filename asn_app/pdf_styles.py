@@ -0,0 +1,158 @@
+# asn_app/pdf_styles.py
+"""
+Stylesheet cetak bersama dan objek font WeasyPrint.
+
+``FontConfiguration`` dibuat sekali per proses dan setiap string CSS di-parse
+sekali menjadi objek ``CSS`` yang dipakai ulang oleh semua ``write_pdf``
+(dokumen dengan CSS yang sama, mis. ``LETTER_CSS``, memakai objek yang sama).
+
+``warm_up()`` dipanggil saat proses web/worker mulai (lihat
+``asn_crud/wsgi.py``, ``pdf_bulk`` dan ``pdf_worker``): memuat font,
+mem-parse semua stylesheet terdaftar dan merender satu halaman kecil, agar PDF
+pertama setelah deploy tidak menanggung biaya inisialisasi WeasyPrint.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+# CSS yang sebelumnya dibuat inline di masing-masing view
+LETTER_CSS = """
+    body { font-family: 'Times New Roman', serif; font-size: 12pt; }
+    .center { text-align: center; }
+    .left { text-align: left; }
+    .justify { text-align: justify; }
+    .signature { padding-left: 250pt; }
+"""
+
+SPMT_CSS = LETTER_CSS + """
+    table { border-collapse: collapse; width: 100%; }
+    td { vertical-align: top; }
+    .label { width: 150px; }
+    .colon { width: 10px; }
+    .kop-surat img { max-width: 100%; height: auto; }
+"""
+
+SPTJM_CSS = """
+    @page {
+        size: A4;
+        margin: 2.5cm;
+    }
+    body {
+        font-family: 'Times New Roman', serif;
+        font-size: 12pt;
+        line-height: 1.5;
+    }
+    .text-center {
+        text-align: center;
+    }
+    .text-left {
+        text-align: left;
+    }
+    .signer-section {
+        padding-left: 250pt;
+        text-align: left;
+    }
+    .signer-details {
+        margin-top: 50pt;
+    }
+    .employee-list {
+        list-style-type: decimal;
+        padding-left: 40px;
+    }
+    .details-table {
+        border-collapse: collapse;
+        width: 100%;
+    }
+    .details-table td {
+        padding: 2px 0;
+        vertical-align: top;
+    }
+    .details-table .label {
+        width: 120px;
+    }
+    .details-table .colon {
+        width: 10px;
+    }
+    .kop-surat {
+        text-align: center;
+        margin-bottom: 20px;
+        border-bottom: 2px solid #000;
+        padding-bottom: 10px;
+    }
+    .kop-surat img {
+        max-width: 100%;
+        height: auto;
+    }
+"""
+
+
+# Halaman contoh untuk warm-up: memuat font yang dipakai surat
+WARM_UP_HTML = """
+<html><body style="font-family: 'Times New Roman', serif; font-size: 12pt">
+<p>Warm-up <b>tebal</b> <i>miring</i> 0123456789</p>
+</body></html>
+"""
+
+# Objek WeasyPrint yang mahal dibuat sekali per proses lalu dipakai ulang
+_font_config = None
+_parsed = {}
+_lock = threading.Lock()
+
+
+def get_font_config():
+    """FontConfiguration bersama untuk semua render di proses ini."""
+    global _font_config
+    if _font_config is None:
+        with _lock:
+            if _font_config is None:
+                from weasyprint.text.fonts import FontConfiguration
+                _font_config = FontConfiguration()
+    return _font_config
+
+
+def get_stylesheet(css):
+    """Objek ``CSS`` untuk string ``css``, di-parse sekali per proses."""
+    stylesheet = _parsed.get(css)
+    if stylesheet is None:
+        from weasyprint import CSS
+        stylesheet = CSS(string=css, font_config=get_font_config())
+        _parsed[css] = stylesheet
+    return stylesheet
+
+
+def get_stylesheets(document):
+    """Stylesheet tambahan dokumen, di-parse sekali per proses."""
+    return [get_stylesheet(css) for css in document.stylesheets]
+
+
+def warm_up():
+    """Siapkan font dan stylesheet semua dokumen terdaftar. Mengembalikan detik."""
+    from weasyprint import HTML
+
+    from . import documents  # noqa: F401 (mendaftarkan jenis dokumen PDF)
+    from .pdf import DOCUMENTS
+
+    started = time.perf_counter()
+    font_config = get_font_config()
+    for document in DOCUMENTS.values():
+        get_stylesheets(document)
+    HTML(string=WARM_UP_HTML).write_pdf(font_config=font_config)
+    return time.perf_counter() - started
+
+
+def warm_up_on_start():
+    """Hook start proses: warm-up bila ``PDF_WARM_UP_ON_START``; error hanya dicatat."""
+    if not getattr(settings, 'PDF_WARM_UP_ON_START', True):
+        return
+    try:
+        seconds = warm_up()
+    except Exception as e:
+        # WeasyPrint/library sistem tidak tersedia: aplikasi tetap jalan
+        logger.warning(f"PDF warm-up failed: {e}")
+    else:
+        logger.info(f"PDF warm-up done in {seconds:.2f}s")
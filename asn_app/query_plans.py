@@ -0,0 +1,242 @@
+# asn_app/query_plans.py
+"""
+Rencana query (select_related/prefetch_related) per halaman.
+
+Template daftar dan detail menelusuri pegawai, penandatangan, kop surat,
+peserta, dll. Tanpa rencana query, setiap baris memicu query tambahan (N+1).
+Setiap view daftar/detail dan setiap export PDF mengambil querysetnya dari
+``planned('<nama>')`` sehingga relasi yang dibutuhkan template dideklarasikan
+di satu tempat.
+
+Nama rencana sama dengan nama URL view (mis. ``spt_list``, ``spt_detail``)
+atau ``pdf:<nama dokumen>`` untuk export PDF. ``max_queries`` adalah jumlah
+query satu request halaman tersebut, tidak bergantung pada jumlah baris;
+diuji di ``asn_app/tests/test_query_plans.py`` dengan data beberapa baris per
+model. ``python manage.py check_query_counts`` dapat dipakai untuk memeriksa
+database yang sedang berjalan.
+"""
+from django.db.models import Prefetch
+
+from .models import (
+    SuratPerintahTugas, SuratSantunanKorpri, NotaDinas, SuratCuti, SisaCuti,
+    SuratKeterangan, SuratResmi, SPTJM, SPMT, SuratUmum, SuratPanggilanSiswa, SiswaKeluar,
+    SuratRekomendasiStudiLanjut, SuratKP4, SuratUndangan, SuratDispensasi, SuratUsulan,
+    StSatyalancana, DRHSatyalancana, SuratPengantar, PesertaNotaDinas, PesertaSuratUsulan,
+    PesertaDispensasi,
+)
+
+PLANS = {}
+
+
+class QueryPlan:
+    """Relasi yang dimuat bersama satu model untuk satu halaman."""
+
+    def __init__(self, name, model, select_related=(), prefetch_related=(), max_queries=None):
+        self.name = name
+        self.model = model
+        self.select_related = list(select_related)
+        self.prefetch_related = list(prefetch_related)
+        self.max_queries = max_queries
+
+    def __repr__(self):
+        return f'<QueryPlan {self.name}>'
+
+    def apply(self, queryset):
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        return queryset
+
+    def queryset(self):
+        return self.apply(self.model._default_manager.all())
+
+
+def register(name, model, **options):
+    """Daftarkan rencana query baru ke registry."""
+    plan = QueryPlan(name, model, **options)
+    PLANS[name] = plan
+    return plan
+
+
+def get_plan(name):
+    try:
+        return PLANS[name]
+    except KeyError:
+        raise LookupError(f"Rencana query tidak terdaftar: {name}")
+
+
+def planned(name, queryset=None):
+    """Queryset dengan relasi dari rencana ``name`` (atau terapkan ke ``queryset``)."""
+    plan = get_plan(name)
+    if queryset is None:
+        return plan.queryset()
+    return plan.apply(queryset)
+
+
+# Peserta dengan pegawai/siswa-nya, dipakai detail dan PDF
+PESERTA_NOTA_DINAS = Prefetch(
+    'peserta_nota_dinas', queryset=PesertaNotaDinas.objects.select_related('pegawai', 'siswa').order_by('id'),
+)
+PESERTA_SURAT_USULAN = Prefetch(
+    'peserta_surat_usulan', queryset=PesertaSuratUsulan.objects.select_related('pegawai', 'siswa').order_by('id'),
+)
+PESERTA_DISPENSASI = Prefetch(
+    'peserta_dispensasi', queryset=PesertaDispensasi.objects.select_related('siswa', 'guru'),
+)
+
+
+# SPT
+register(
+    'spt_detail', SuratPerintahTugas,
+    select_related=['penandatangan', 'kuasa_pengguna_anggaran'],
+    prefetch_related=['dasar_surat_items', 'peserta', 'foto_kegiatan'],
+    max_queries=4,
+)
+SPT_PDF = dict(
+    select_related=['penandatangan', 'kuasa_pengguna_anggaran', 'kop_surat'],
+    prefetch_related=['dasar_surat_items', 'peserta'],
+)
+# +2 untuk memuat kalender hari libur sekali per proses (jumlah hari di template biasa)
+register('pdf:spt', SuratPerintahTugas, max_queries=5, **SPT_PDF)
+register('pdf:spt_large', SuratPerintahTugas, max_queries=3, **SPT_PDF)
+
+# Surat Santunan Korpri
+register('surat_santunan_korpri_list', SuratSantunanKorpri, select_related=['pegawai'], max_queries=2)
+register(
+    'surat_santunan_korpri_detail', SuratSantunanKorpri,
+    select_related=['pegawai', 'penandatangan', 'kop_surat'], max_queries=1,
+)
+register(
+    'pdf:surat_santunan_korpri', SuratSantunanKorpri,
+    select_related=['pegawai', 'penandatangan', 'kop_surat'], max_queries=1,
+)
+
+# Nota Dinas
+register(
+    'nota_dinas_detail', NotaDinas,
+    select_related=['penanda_tangan', 'kop_surat'],
+    prefetch_related=[PESERTA_NOTA_DINAS, 'pegawai', 'siswa'],
+    max_queries=4,
+)
+register(
+    'pdf:nota_dinas', NotaDinas,
+    select_related=['penanda_tangan', 'kop_surat'],
+    prefetch_related=[PESERTA_NOTA_DINAS, 'pegawai', 'siswa'],
+    max_queries=4,
+)
+register(
+    'pdf:nota_dinas_lampiran', NotaDinas,
+    select_related=['penanda_tangan', 'kop_surat'],
+    prefetch_related=[PESERTA_NOTA_DINAS, 'pegawai', 'siswa'],
+    max_queries=4,
+)
+register('peserta_nota_dinas_list', PesertaNotaDinas, select_related=['nota_dinas', 'pegawai', 'siswa'], max_queries=2)
+
+# Surat Usulan
+register(
+    'surat_usulan_detail', SuratUsulan,
+    select_related=['penanda_tangan', 'kop_surat'], prefetch_related=[PESERTA_SURAT_USULAN],
+    max_queries=2,
+)
+register(
+    'pdf:surat_usulan', SuratUsulan,
+    select_related=['penanda_tangan', 'kop_surat'], prefetch_related=[PESERTA_SURAT_USULAN],
+    max_queries=2,
+)
+register(
+    'pdf:surat_usulan_lampiran', SuratUsulan,
+    select_related=['penanda_tangan', 'kop_surat'], prefetch_related=[PESERTA_SURAT_USULAN],
+    max_queries=2,
+)
+register('peserta_surat_usulan_list', PesertaSuratUsulan, select_related=['surat_usulan', 'pegawai', 'siswa'], max_queries=2)
+
+# ST & DRH Satyalancana
+register('st_satyalancana_detail', StSatyalancana, select_related=['penanda_tangan', 'kepada_pegawai', 'kop_surat'], max_queries=1)
+register('pdf:st_satyalancana', StSatyalancana, select_related=['penanda_tangan', 'kepada_pegawai', 'kop_surat'], max_queries=1)
+register('drh_satyalancana_list', DRHSatyalancana, select_related=['asn'], max_queries=2)
+register('drh_satyalancana_detail', DRHSatyalancana, select_related=['asn', 'atasan_langsung'], max_queries=1)
+register('pdf:drh_satyalancana', DRHSatyalancana, select_related=['asn', 'atasan_langsung'], max_queries=2)
+
+# Surat Cuti & Sisa Cuti
+register('surat_cuti_list', SuratCuti, select_related=['pegawai'], max_queries=2)
+register('surat_cuti_detail', SuratCuti, select_related=['pegawai', 'penandatangan', 'kop_surat'], max_queries=1)
+register('pdf:surat_cuti', SuratCuti, select_related=['pegawai', 'penandatangan', 'kop_surat'], max_queries=1)
+register('sisa_cuti_list', SisaCuti, select_related=['pegawai'], max_queries=3)
+register('sisa_cuti_detail', SisaCuti, select_related=['pegawai'], max_queries=1)
+
+# Siswa
+register('siswa_keluar_list', SiswaKeluar, select_related=['siswa'], max_queries=4)
+register('siswa_keluar_detail', SiswaKeluar, select_related=['siswa'], max_queries=1)
+
+# Surat dengan pola standar (kop surat + penandatangan + pegawai/siswa)
+register('surat_keterangan_list', SuratKeterangan, select_related=['pegawai', 'siswa'], max_queries=2)
+register(
+    'surat_keterangan_detail', SuratKeterangan,
+    select_related=['kop_surat', 'penandatangan', 'pegawai', 'siswa'], max_queries=1,
+)
+register(
+    'pdf:surat_keterangan', SuratKeterangan,
+    select_related=['kop_surat', 'penandatangan', 'pegawai', 'siswa'], max_queries=1,
+)
+register('surat_rekomendasi_list', SuratRekomendasiStudiLanjut, select_related=['pegawai'], max_queries=2)
+register(
+    'surat_rekomendasi_detail', SuratRekomendasiStudiLanjut,
+    select_related=['kop_surat', 'penandatangan', 'pegawai'], max_queries=1,
+)
+register(
+    'pdf:surat_rekomendasi', SuratRekomendasiStudiLanjut,
+    select_related=['kop_surat', 'penandatangan', 'pegawai'], max_queries=1,
+)
+register(
+    'surat_kp4_list', SuratKP4,
+    select_related=['pegawai', 'penandatangan'], prefetch_related=['anggota_keluarga'], max_queries=3,
+)
+register(
+    'surat_kp4_detail', SuratKP4,
+    select_related=['kop_surat', 'pegawai', 'penandatangan'], prefetch_related=['anggota_keluarga'],
+    max_queries=2,
+)
+register(
+    'pdf:surat_kp4', SuratKP4,
+    select_related=['kop_surat', 'pegawai', 'penandatangan'], prefetch_related=['anggota_keluarga'],
+    max_queries=2,
+)
+register('surat_resmi_list', SuratResmi, select_related=['penandatangan'], max_queries=2)
+register(
+    'surat_resmi_detail', SuratResmi,
+    select_related=['kop_surat', 'penandatangan'], prefetch_related=['pegawai'], max_queries=2,
+)
+register(
+    'pdf:surat_resmi', SuratResmi,
+    select_related=['kop_surat', 'penandatangan'], prefetch_related=['pegawai'], max_queries=2,
+)
+register('sptjm_list', SPTJM, select_related=['penandatangan'], max_queries=2)
+register('sptjm_detail', SPTJM, select_related=['kop_surat', 'penandatangan'], prefetch_related=['pegawai'], max_queries=2)
+register('pdf:sptjm', SPTJM, select_related=['kop_surat', 'penandatangan'], prefetch_related=['pegawai'], max_queries=2)
+register('spmt_list', SPMT, select_related=['pegawai'], max_queries=2)
+register('spmt_detail', SPMT, select_related=['kop_surat', 'pegawai', 'penandatangan'], max_queries=1)
+register('pdf:spmt', SPMT, select_related=['kop_surat', 'pegawai', 'penandatangan'], max_queries=1)
+register('surat_umum_list', SuratUmum, select_related=['pegawai', 'penandatangan'], max_queries=2)
+register('surat_umum_detail', SuratUmum, select_related=['kop_surat', 'pegawai', 'penandatangan'], max_queries=1)
+register('pdf:surat_umum', SuratUmum, select_related=['kop_surat', 'pegawai', 'penandatangan'], max_queries=1)
+
+# Surat untuk siswa
+SURAT_PANGGILAN_RELATIONS = ['kop_surat', 'siswa', 'wali_kelas', 'guru_bk', 'wakasek_kesiswaan']
+register('surat_panggilan_siswa_list', SuratPanggilanSiswa, select_related=['siswa'], max_queries=2)
+register('surat_panggilan_siswa_detail', SuratPanggilanSiswa, select_related=SURAT_PANGGILAN_RELATIONS, max_queries=1)
+register('pdf:surat_panggilan_siswa', SuratPanggilanSiswa, select_related=SURAT_PANGGILAN_RELATIONS, max_queries=1)
+register('surat_undangan_list', SuratUndangan, select_related=['siswa'], max_queries=2)
+register('surat_undangan_detail', SuratUndangan, select_related=['kop_surat', 'siswa', 'kepala_sekolah'], max_queries=1)
+register('pdf:surat_undangan', SuratUndangan, select_related=['kop_surat', 'siswa', 'kepala_sekolah'], max_queries=1)
+register('surat_dispensasi_list', SuratDispensasi, select_related=['penandatangan'], max_queries=2)
+register(
+    'surat_dispensasi_detail', SuratDispensasi,
+    select_related=['kop_surat', 'penandatangan'], prefetch_related=[PESERTA_DISPENSASI], max_queries=2,
+)
+register(
+    'pdf:surat_dispensasi', SuratDispensasi,
+    select_related=['kop_surat', 'penandatangan'], prefetch_related=[PESERTA_DISPENSASI], max_queries=2,
+)
+register('surat_pengantar_detail', SuratPengantar, select_related=['kop_surat', 'penandatangan'], max_queries=1)
+register('pdf:surat_pengantar', SuratPengantar, select_related=['kop_surat', 'penandatangan'], max_queries=1)
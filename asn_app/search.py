@@ -0,0 +1,243 @@
+# asn_app/search.py
+"""
+Pencarian teks ASN, Siswa dan surat dengan indeks SQLite FTS5.
+
+Semua sumber memakai satu tabel virtual ``asn_app_search`` berkolom ``title``
+dan ``body``. ``rowid`` dibentuk dari kode sumber dan pk (``code * ROWID_SPAN
++ pk``), sehingga satu baris bisa diganti/dihapus langsung dan pencarian per
+sumber cukup membatasi rentang rowid. Indeks dijaga oleh signal (lihat
+``asn_app/signals.py``) dan oleh import Excel; ``rebuild_search_index``
+membangun ulang seluruhnya.
+
+Kata kunci dicocokkan sebagai awalan kata (``budi sant`` menemukan "Budi
+Santoso") dan hasil diurutkan dengan bm25, kolom ``title`` berbobot lebih
+tinggi. Di database selain SQLite pencarian jatuh ke ``icontains`` biasa.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.urls import reverse
+
+from .models import (
+    ASN, SPMT, SPTJM, NotaDinas, Siswa, StSatyalancana, SuratCuti, SuratDispensasi, SuratKeterangan,
+    SuratPanggilanSiswa, SuratPengantar, SuratPerintahTugas, SuratRekomendasiStudiLanjut, SuratResmi,
+    SuratSantunanKorpri, SuratUndangan, SuratUsulan,
+)
+
+TABLE = 'asn_app_search'
+ROWID_SPAN = 10 ** 12
+TITLE_WEIGHT = 5.0
+TOKEN = re.compile(r'\w+')
+
+CREATE_SQL = (
+    f'CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} '
+    f"USING fts5(title, body, tokenize = 'unicode61 remove_diacritics 2')"
+)
+DROP_SQL = f'DROP TABLE IF EXISTS {TABLE}'
+
+
+class SearchSource:
+    """Satu model yang bisa dicari: kolom ``title_fields`` dan ``body_fields`` masuk indeks."""
+
+    def __init__(self, name, model, code, title_fields, body_fields, label, url_name):
+        self.name = name
+        self.model = model
+        self.code = code
+        self.title_fields = list(title_fields)
+        self.body_fields = list(body_fields)
+        self.label = label
+        self.url_name = url_name
+
+    @property
+    def fields(self):
+        return self.title_fields + self.body_fields
+
+    @property
+    def rowid_range(self):
+        return self.code * ROWID_SPAN, (self.code + 1) * ROWID_SPAN - 1
+
+    def document(self, pk, values):
+        """Baris indeks ``(rowid, title, body)`` dari nilai ``fields``."""
+        values = ['' if value is None else str(value) for value in values]
+        split = len(self.title_fields)
+        return self.code * ROWID_SPAN + pk, ' '.join(values[:split]), ' '.join(values[split:])
+
+    def contains_q(self, text):
+        """Q ``icontains`` untuk database tanpa FTS5."""
+        condition = Q()
+        for field in self.fields:
+            condition |= Q(**{f'{field}__icontains': text})
+        return condition
+
+
+SOURCES = {}
+SOURCES_BY_MODEL = {}
+
+
+def register(name, model, code, title_fields, body_fields, label, url_name):
+    source = SearchSource(name, model, code, title_fields, body_fields, label, url_name)
+    SOURCES[name] = source
+    SOURCES_BY_MODEL[model] = source
+    return source
+
+
+def get_source(name):
+    try:
+        return SOURCES[name]
+    except KeyError:
+        raise LookupError(f'Unknown search source: {name}')
+
+
+class SearchHit:
+    def __init__(self, source, object_id, title, body, rank):
+        self.source = source
+        self.object_id = object_id
+        self.title = title or body
+        self.body = body if title else ''
+        self.rank = rank
+
+    @property
+    def url(self):
+        return reverse(self.source.url_name, kwargs={'pk': self.object_id})
+
+    def as_dict(self):
+        return {
+            'kind': self.source.name, 'label': self.source.label, 'id': self.object_id,
+            'title': self.title, 'body': self.body, 'url': self.url,
+        }
+
+
+def is_available():
+    return connection.vendor == 'sqlite'
+
+
+def match_expression(text):
+    """Query FTS5 dari teks bebas: setiap kata menjadi awalan ``"kata"*`` (AND)."""
+    tokens = TOKEN.findall(text or '')
+    return ' '.join(f'"{token}"*' for token in tokens) or None
+
+
+# --- Pemeliharaan indeks ---
+
+def _write(documents):
+    if documents:
+        with connection.cursor() as cursor:
+            cursor.executemany(f'INSERT OR REPLACE INTO {TABLE} (rowid, title, body) VALUES (%s, %s, %s)', documents)
+
+
+def index_instances(model, instances):
+    """Tulis ulang entri indeks ``instances`` (dipakai signal dan import massal)."""
+    source = SOURCES_BY_MODEL.get(model)
+    if source is None or not is_available():
+        return
+    _write([
+        source.document(instance.pk, [getattr(instance, field) for field in source.fields])
+        for instance in instances if instance.pk is not None
+    ])
+
+
+def remove_instance(instance):
+    source = SOURCES_BY_MODEL.get(type(instance))
+    if source is None or instance.pk is None or not is_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE} WHERE rowid = %s', [source.code * ROWID_SPAN + instance.pk])
+
+
+def rebuild(batch_size=1000):
+    """Bangun ulang seluruh indeks. Mengembalikan jumlah baris terindeks."""
+    total = 0
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE}')
+    for source in SOURCES.values():
+        batch = []
+        for pk, *values in source.model._default_manager.order_by('pk').values_list('pk', *source.fields).iterator(chunk_size=batch_size):
+            batch.append(source.document(pk, values))
+            if len(batch) >= batch_size:
+                _write(batch)
+                total += len(batch)
+                batch = []
+        _write(batch)
+        total += len(batch)
+    return total
+
+
+# --- Query ---
+
+def filter_queryset(queryset, text):
+    """Batasi ``queryset`` ke baris yang cocok dengan ``text``; urutan queryset tidak diubah."""
+    source = SOURCES_BY_MODEL[queryset.model]
+    if not is_available():
+        return queryset.filter(source.contains_q(text))
+    expression = match_expression(text)
+    if expression is None:
+        return queryset.none()
+    low, high = source.rowid_range
+    return queryset.filter(pk__in=RawSQL(
+        f'SELECT rowid - %s FROM {TABLE} WHERE {TABLE} MATCH %s AND rowid BETWEEN %s AND %s',
+        (low, expression, low, high),
+    ))
+
+
+def search(text, kinds=None, limit=20):
+    """Hasil pencarian global (``SearchHit``) dari semua sumber atau ``kinds`` saja, paling relevan dulu."""
+    sources = [get_source(kind) for kind in kinds] if kinds else list(SOURCES.values())
+    if not is_available():
+        return _search_contains(text, sources, limit)
+    expression = match_expression(text)
+    if expression is None:
+        return []
+
+    ranges = ' OR '.join(['rowid BETWEEN %s AND %s'] * len(sources))
+    params = [expression]
+    for source in sources:
+        params.extend(source.rowid_range)
+    params.append(limit)
+    sql = (
+        f'SELECT rowid, title, body, bm25({TABLE}, %s, 1.0) AS rank FROM {TABLE} '
+        f'WHERE {TABLE} MATCH %s AND ({ranges}) ORDER BY rank LIMIT %s'
+    )
+    by_code = {source.code: source for source in sources}
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [TITLE_WEIGHT] + params)
+        rows = cursor.fetchall()
+    return [
+        SearchHit(by_code[rowid // ROWID_SPAN], rowid % ROWID_SPAN, title, body, rank)
+        for rowid, title, body, rank in rows
+    ]
+
+
+def _search_contains(text, sources, limit):
+    hits = []
+    for source in sources:
+        rows = source.model._default_manager.filter(source.contains_q(text)).values_list('pk', *source.fields)[:limit]
+        for pk, *values in rows:
+            _, title, body = source.document(pk, values)
+            hits.append(SearchHit(source, pk, title, body, 0))
+    return hits[:limit]
+
+
+register('asn', ASN, 1, ['nama'], ['nip', 'jabatan'], 'ASN', 'asn_detail')
+register('siswa', Siswa, 2, ['nama'], ['nis', 'kelas', 'jurusan'], 'Siswa', 'siswa_detail')
+register('surat_cuti', SuratCuti, 3, ['perihal_surat'], ['nomor_surat'], 'Surat Cuti', 'surat_cuti_detail')
+register('spt', SuratPerintahTugas, 4, ['nama_kegiatan'], ['nomor_spt'], 'SPT', 'spt_detail')
+register('surat_santunan_korpri', SuratSantunanKorpri, 5, ['perihal'], ['nomor_surat'],
+         'Surat Santunan Korpri', 'surat_santunan_korpri_detail')
+register('nota_dinas', NotaDinas, 6, ['hal'], ['nomor'], 'Nota Dinas', 'nota_dinas_detail')
+register('surat_usulan', SuratUsulan, 7, ['hal'], ['nomor'], 'Surat Usulan', 'surat_usulan_detail')
+register('surat_resmi', SuratResmi, 8, ['perihal'], ['nomor', 'pejabat_tujuan_surat'], 'Surat Resmi', 'surat_resmi_detail')
+register('sptjm', SPTJM, 9, [], ['nomor_surat', 'isi_surat'], 'SPTJM', 'sptjm_detail')
+register('spmt', SPMT, 10, ['tentang'], ['nomor_surat'], 'SPMT', 'spmt_detail')
+register('surat_keterangan', SuratKeterangan, 11, [], ['nomor_surat'], 'Surat Keterangan', 'surat_keterangan_detail')
+register('surat_rekomendasi', SuratRekomendasiStudiLanjut, 12, ['program_studi', 'nama_universitas'], ['nomor_surat'],
+         'Surat Rekomendasi', 'surat_rekomendasi_detail')
+register('surat_panggilan_siswa', SuratPanggilanSiswa, 13, ['alasan_panggilan'], ['nomor_surat'],
+         'Surat Panggilan Siswa', 'surat_panggilan_siswa_detail')
+register('surat_undangan', SuratUndangan, 14, ['perihal'], ['nomor_surat'], 'Surat Undangan', 'surat_undangan_detail')
+register('surat_dispensasi', SuratDispensasi, 15, ['nama_kegiatan'], ['nomor_surat'],
+         'Surat Dispensasi', 'surat_dispensasi_detail')
+register('st_satyalancana', StSatyalancana, 16, ['kepada_nama'], ['nomor'], 'ST Satyalancana', 'st_satyalancana_detail')
+register('surat_pengantar', SuratPengantar, 17, ['tujuan_surat'], ['nomor_surat'],
+         'Surat Pengantar', 'surat_pengantar_detail')
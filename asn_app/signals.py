@@ -1,30 +1,46 @@
 # asn_app/signals.py
-from django.db.models.signals import post_save, post_delete
+from collections import defaultdict
+
+from django.db.models import Q
+from django.db.models.signals import pre_save, post_save, post_delete, m2m_changed
 from django.dispatch import receiver
-from .models import SuratCuti, SisaCuti
+from .models import SuratCuti, SisaCuti, HariLibur
+from . import leave_balance
+from . import workdays
+from . import documents  # noqa: F401 (registry jenis dokumen PDF)
+from . import pdf_cache
+from . import search
+from .pdf import DOCUMENTS
+
+
+@receiver(pre_save, sender=SuratCuti)
+def remember_old_surat_cuti_leave(sender, instance, **kwargs):
+    """Simpan pegawai/tahun/hari_efektif lama untuk menghitung selisih di post_save."""
+    instance._old_leave = None
+    if instance.pk:
+        row = (
+            SuratCuti.objects.filter(pk=instance.pk)
+            .values_list('pegawai_id', 'tanggal_awal', 'hari_efektif')
+            .first()
+        )
+        if row:
+            instance._old_leave = leave_balance.leave_snapshot(*row)
 
 
 @receiver(post_save, sender=SuratCuti)
 def update_sisa_cuti_on_surat_cuti_save(sender, instance, created, **kwargs):
     """
     Automatically update SisaCuti when a SuratCuti is created or updated.
-    This ensures sisa cuti is always in sync with approved leave letters.
+    Only the difference in hari_efektif is applied to the affected year
+    bucket, so the cost does not grow with the employee's number of letters.
     """
-    # Get or create SisaCuti for this pegawai
-    sisa_cuti, created = SisaCuti.objects.get_or_create(
-        pegawai=instance.pegawai,
-        defaults={
-            'initial_tahun_n': 12,
-            'initial_tahun_n_1': 6,
-            'initial_tahun_n_2': 6,
-            'sisa_tahun_n': 12,
-            'sisa_tahun_n_1': 6,
-            'sisa_tahun_n_2': 6,
-        }
-    )
-
-    # Recalculate and save
-    sisa_cuti.recalculate_and_save()
+    new = leave_balance.leave_snapshot(instance.pegawai_id, instance.tanggal_awal, instance.hari_efektif)
+    deltas = leave_balance.leave_deltas(getattr(instance, '_old_leave', None), new)
+    if deltas:
+        leave_balance.apply_deltas(deltas)
+    elif created or not SisaCuti.objects.filter(pegawai_id=instance.pegawai_id).exists():
+        # Surat 0 hari efektif: pegawai tetap dibuatkan SisaCuti seperti sebelumnya
+        SisaCuti.objects.get_or_create(pegawai_id=instance.pegawai_id, defaults=leave_balance.DEFAULT_ALLOCATION)
 
 
 @receiver(post_delete, sender=SuratCuti)
@@ -33,11 +49,97 @@ def update_sisa_cuti_on_surat_cuti_delete(sender, instance, **kwargs):
     Automatically update SisaCuti when a SuratCuti is deleted.
     This restores the leave days that were used by the deleted leave letter.
     """
-    # Get SisaCuti for this pegawai if it exists
-    try:
-        sisa_cuti = SisaCuti.objects.get(pegawai=instance.pegawai)
-        # Recalculate and save
-        sisa_cuti.recalculate_and_save()
-    except SisaCuti.DoesNotExist:
-        # No SisaCuti record, nothing to update
-        pass
+    old = leave_balance.leave_snapshot(instance.pegawai_id, instance.tanggal_awal, instance.hari_efektif)
+    leave_balance.apply_deltas(leave_balance.leave_deltas(old, None))
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_pdf_cache(sender, instance, **kwargs):
+    """
+    Hapus PDF ter-cache milik surat yang barusan diubah/dihapus, termasuk
+    surat induk dari baris anak (DasarSurat, PesertaNotaDinas, dll.).
+    """
+    if sender._meta.app_label != 'asn_app':
+        return
+    pdf_cache.invalidate_instance(instance, DOCUMENTS.values())
+
+
+@receiver(post_save)
+def update_search_index(sender, instance, **kwargs):
+    """ASN, Siswa dan surat yang bisa dicari: tulis ulang entri indeks FTS-nya."""
+    if sender in search.SOURCES_BY_MODEL:
+        search.index_instances(sender, [instance])
+
+
+@receiver(post_delete)
+def remove_from_search_index(sender, instance, **kwargs):
+    if sender in search.SOURCES_BY_MODEL:
+        search.remove_instance(instance)
+
+
+@receiver(m2m_changed)
+def invalidate_pdf_cache_on_m2m_change(sender, instance, action, **kwargs):
+    """Peserta/pegawai ManyToMany berubah -> cache surat tidak berlaku lagi."""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if instance._meta.app_label != 'asn_app':
+        return
+    pdf_cache.invalidate_instance(instance, DOCUMENTS.values())
+
+
+@receiver(pre_save, sender=HariLibur)
+def remember_old_hari_libur_date(sender, instance, **kwargs):
+    """Simpan tanggal lama supaya surat cuti di tanggal itu ikut dihitung ulang."""
+    instance._old_tanggal = None
+    if instance.pk:
+        instance._old_tanggal = (
+            HariLibur.objects.filter(pk=instance.pk).values_list('tanggal', flat=True).first()
+        )
+
+
+def refresh_hari_efektif(dates):
+    """
+    Hitung ulang hari_efektif hanya untuk surat cuti yang rentangnya mencakup
+    salah satu tanggal di ``dates``, lalu perbarui SisaCuti pegawainya.
+    """
+    workdays.invalidate()
+    dates = {d for d in dates if d}
+    if not dates:
+        return 0
+
+    overlap = Q()
+    for d in dates:
+        overlap |= Q(tanggal_awal__lte=d, tanggal_akhir__gte=d)
+    affected = list(SuratCuti.objects.filter(overlap).only('pk', 'pegawai_id', 'tanggal_awal', 'tanggal_akhir', 'hari_efektif'))
+
+    calendar = workdays.get_calendar()
+    changed = []
+    for surat_cuti in affected:
+        hari_efektif = calendar.working_days(surat_cuti.tanggal_awal, surat_cuti.tanggal_akhir)
+        if hari_efektif != surat_cuti.hari_efektif:
+            surat_cuti._old_hari_efektif = surat_cuti.hari_efektif
+            surat_cuti.hari_efektif = hari_efektif
+            changed.append(surat_cuti)
+    if not changed:
+        return 0
+
+    deltas = defaultdict(int)
+    for surat_cuti in changed:
+        deltas[(surat_cuti.pegawai_id, surat_cuti.tanggal_awal.year)] += surat_cuti.hari_efektif - surat_cuti._old_hari_efektif
+
+    SuratCuti.objects.bulk_update(changed, ['hari_efektif'])
+    leave_balance.apply_deltas(deltas)
+    return len(changed)
+
+
+@receiver(post_save, sender=HariLibur)
+def update_hari_efektif_on_hari_libur_save(sender, instance, **kwargs):
+    """Hari libur ditambah/diubah: muat ulang kalender dan hitung ulang surat yang terkena."""
+    refresh_hari_efektif({instance.tanggal, getattr(instance, '_old_tanggal', None)})
+
+
+@receiver(post_delete, sender=HariLibur)
+def update_hari_efektif_on_hari_libur_delete(sender, instance, **kwargs):
+    """Hari libur dihapus: muat ulang kalender dan hitung ulang surat yang terkena."""
+    refresh_hari_efektif({instance.tanggal})
@@ -0,0 +1,222 @@
+// asn_app/static/asn_app/js/autocomplete.js
+// Select ASN/Siswa yang opsinya dimuat dari /asn/autocomplete/<nama>/ (lihat asn_app/widgets.py).
+// Server hanya merender opsi terpilih; pilihan lain dicari per halaman lewat JSON.
+(function () {
+    'use strict';
+
+    const DELAY = 250;
+    const FORWARD_PREFIX = 'data-autocomplete-forward-';
+
+    function forwardParams(select) {
+        const params = {};
+        Array.from(select.attributes).forEach(function (attr) {
+            if (attr.name.indexOf(FORWARD_PREFIX) === 0) {
+                const source = document.querySelector(attr.value);
+                if (source && source.value) {
+                    params[attr.name.slice(FORWARD_PREFIX.length)] = source.value;
+                }
+            }
+        });
+        return params;
+    }
+
+    function setData(option, data) {
+        Object.keys(data || {}).forEach(function (key) {
+            option.setAttribute('data-' + key, data[key]);
+        });
+    }
+
+    function findOption(select, value) {
+        return Array.from(select.options).find(function (option) { return option.value === value; });
+    }
+
+    function setup(select) {
+        if (select.dataset.autocompleteReady) {
+            return;
+        }
+        select.dataset.autocompleteReady = '1';
+
+        const multiple = select.multiple;
+        const wrapper = document.createElement('div');
+        wrapper.className = 'position-relative';
+        select.parentNode.insertBefore(wrapper, select);
+        wrapper.appendChild(select);
+        select.classList.add('d-none');
+
+        const chips = document.createElement('div');
+        chips.className = 'd-flex flex-wrap gap-1 mb-1';
+        const input = document.createElement('input');
+        input.type = 'text';
+        input.className = 'form-control';
+        input.autocomplete = 'off';
+        input.placeholder = 'Ketik untuk mencari...';
+        const menu = document.createElement('div');
+        menu.className = 'list-group position-absolute w-100 shadow-sm d-none';
+        menu.style.zIndex = 1050;
+        menu.style.maxHeight = '240px';
+        menu.style.overflowY = 'auto';
+        if (multiple) {
+            wrapper.appendChild(chips);
+        }
+        wrapper.appendChild(input);
+        wrapper.appendChild(menu);
+
+        let timer = null;
+        let page = 1;
+        let more = false;
+        let loading = false;
+        let request = 0;
+
+        function selectedText() {
+            const option = select.options[select.selectedIndex];
+            return option && option.value ? option.text : '';
+        }
+
+        function renderChips() {
+            chips.innerHTML = '';
+            Array.from(select.selectedOptions).forEach(function (option) {
+                const chip = document.createElement('span');
+                chip.className = 'badge bg-secondary d-inline-flex align-items-center';
+                chip.textContent = option.text;
+                const remove = document.createElement('button');
+                remove.type = 'button';
+                remove.className = 'btn-close btn-close-white ms-1';
+                remove.style.fontSize = '0.6em';
+                remove.setAttribute('aria-label', 'Hapus');
+                remove.addEventListener('click', function () {
+                    option.remove();
+                    renderChips();
+                    select.dispatchEvent(new Event('change', { bubbles: true }));
+                });
+                chip.appendChild(remove);
+                chips.appendChild(chip);
+            });
+        }
+
+        function close() {
+            menu.classList.add('d-none');
+            if (!multiple) {
+                input.value = selectedText();
+            }
+        }
+
+        function choose(item) {
+            let option = findOption(select, item.id);
+            if (!option) {
+                option = new Option(item.text, item.id);
+                select.appendChild(option);
+            }
+            setData(option, item.data);
+            option.selected = true;
+            if (multiple) {
+                input.value = '';
+                renderChips();
+            }
+            close();
+            select.dispatchEvent(new Event('change', { bubbles: true }));
+        }
+
+        function render(results, append) {
+            if (!append) {
+                menu.innerHTML = '';
+            }
+            results.forEach(function (item) {
+                const entry = document.createElement('button');
+                entry.type = 'button';
+                entry.className = 'list-group-item list-group-item-action py-1';
+                if (findOption(select, item.id) && findOption(select, item.id).selected) {
+                    entry.classList.add('active');
+                }
+                entry.textContent = item.text;
+                if (item.hint) {
+                    const hint = document.createElement('div');
+                    hint.className = 'small text-muted';
+                    hint.textContent = item.hint;
+                    entry.appendChild(hint);
+                }
+                entry.addEventListener('mousedown', function (event) {
+                    event.preventDefault();
+                    choose(item);
+                });
+                menu.appendChild(entry);
+            });
+            if (!menu.children.length) {
+                const empty = document.createElement('div');
+                empty.className = 'list-group-item small text-muted';
+                empty.textContent = 'Tidak ada data yang cocok.';
+                menu.appendChild(empty);
+            }
+            menu.classList.remove('d-none');
+        }
+
+        function load(append) {
+            const current = ++request;
+            const query = multiple || input.value !== selectedText() ? input.value.trim() : '';
+            const params = new URLSearchParams(Object.assign({ q: query, page: page }, forwardParams(select)));
+            loading = true;
+            fetch(select.dataset.autocompleteUrl + '?' + params.toString(), { headers: { 'Accept': 'application/json' } })
+                .then(function (response) { return response.json(); })
+                .then(function (payload) {
+                    if (current !== request) {
+                        return;
+                    }
+                    more = payload.more;
+                    render(payload.results, append);
+                })
+                .finally(function () { loading = false; });
+        }
+
+        function search() {
+            page = 1;
+            load(false);
+        }
+
+        input.addEventListener('focus', search);
+        input.addEventListener('input', function () {
+            clearTimeout(timer);
+            if (!multiple && !input.value && !select.required) {
+                select.value = '';
+                select.dispatchEvent(new Event('change', { bubbles: true }));
+            }
+            timer = setTimeout(search, DELAY);
+        });
+        input.addEventListener('keydown', function (event) {
+            if (event.key === 'Escape') {
+                close();
+            } else if (event.key === 'Enter') {
+                event.preventDefault();
+                const first = menu.querySelector('.list-group-item-action');
+                if (first && !menu.classList.contains('d-none')) {
+                    first.dispatchEvent(new Event('mousedown'));
+                }
+            }
+        });
+        input.addEventListener('blur', close);
+        menu.addEventListener('scroll', function () {
+            if (more && !loading && menu.scrollTop + menu.clientHeight >= menu.scrollHeight - 20) {
+                page += 1;
+                load(true);
+            }
+        });
+        select.addEventListener('change', function () {
+            if (multiple) {
+                renderChips();
+            } else if (document.activeElement !== input) {
+                input.value = selectedText();
+            }
+        });
+
+        if (multiple) {
+            renderChips();
+        } else {
+            input.value = selectedText();
+        }
+    }
+
+    function initAutocomplete(root) {
+        (root || document).querySelectorAll('select[data-autocomplete-url]').forEach(setup);
+    }
+
+    window.initAutocomplete = initAutocomplete;
+    document.addEventListener('DOMContentLoaded', function () { initAutocomplete(document); });
+})();
@@ -0,0 +1,35 @@
+import hashlib
+
+from django import template
+from django.db import models
+
+register = template.Library()
+
+
+def _version(obj):
+    if obj is None:
+        return None
+    if hasattr(obj, 'updated_at'):
+        return (obj._meta.label, obj.pk, str(obj.updated_at))
+    # Tanpa updated_at (mis. PesertaNotaDinas): nilai kolomnya sendiri beserta
+    # versi relasi yang sudah dimuat (pegawai/siswa dari select_related)
+    values = [obj._meta.label]
+    for field in obj._meta.concrete_fields:
+        values.append(str(field.value_from_object(obj)))
+    for name, related in sorted(obj._state.fields_cache.items()):
+        if isinstance(related, models.Model):
+            values.append((name, _version(related)))
+    return tuple(values)
+
+
+@register.filter
+def fragment_version(value):
+    """
+    Kunci versi untuk ``{% cache %}``: berubah setiap kali baris (atau salah
+    satu baris dalam daftar) berubah. Usage: ``{{ spt.peserta.all|fragment_version }}``
+    """
+    if isinstance(value, models.Model) or value is None:
+        versions = _version(value)
+    else:
+        versions = [_version(obj) for obj in value]
+    return hashlib.sha1(repr(versions).encode('utf-8')).hexdigest()[:16]
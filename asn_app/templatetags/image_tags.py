@@ -1,6 +1,4 @@
 from django import template
-import base64
-import os
 import logging
 from datetime import datetime
 
@@ -62,45 +60,6 @@ def terbilang_filter(value):
     except (ValueError, TypeError):
         return value
 
-@register.filter
-def image_to_base64(image_field):
-    """
-    Convert ImageField to base64 data URI
-    Usage: {{ image_field|image_to_base64 }}
-    """
-    if not image_field:
-        return ''
-    
-    try:
-        # Pastikan file exists
-        if not image_field.path or not os.path.exists(image_field.path):
-            logger.warning(f"Image file not found: {image_field.path}")
-            return ''
-        
-        # Baca file dan encode
-        with open(image_field.path, 'rb') as f:
-            image_data = f.read()
-        
-        encoded = base64.b64encode(image_data).decode('utf-8')
-        
-        # Determine MIME type
-        ext = os.path.splitext(image_field.path)[1].lower()
-        mime_types = {
-            '.png': 'image/png',
-            '.jpg': 'image/jpeg', 
-            '.jpeg': 'image/jpeg',
-            '.gif': 'image/gif',
-            '.webp': 'image/webp',
-            '.bmp': 'image/bmp'
-        }
-        mime = mime_types.get(ext, 'image/jpeg')  # default to jpeg
-        
-        return f'data:{mime};base64,{encoded}'
-        
-    except Exception as e:
-        logger.error(f"Error converting image to base64: {e}")
-        return ''
-
 @register.filter
 def days_between(start_date, end_date):
     """
@@ -34,3 +34,17 @@ def get_compact_page_range(context):
     pages.append({'num': total_pages, 'ellipsis': False})
 
     return pages
+
+
+@register.simple_tag(takes_context=True)
+def page_url(context, page, after=None, before=None):
+    """Query string halaman ``page`` dengan filter lain (q, search, ...) tetap dipertahankan."""
+    params = context['request'].GET.copy()
+    for key in ('page', 'after', 'before'):
+        params.pop(key, None)
+    params['page'] = page
+    if after:
+        params['after'] = after
+    elif before:
+        params['before'] = before
+    return f'?{params.urlencode()}'
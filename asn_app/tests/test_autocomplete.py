@@ -0,0 +1,47 @@
+# asn_app/tests/test_autocomplete.py
+"""
+Halaman sumber autocomplete gabungan (``asn_app/autocomplete.py``): isi setiap
+halaman sama dengan daftar pegawai lalu siswa yang dipotong per ``PAGE_SIZE``,
+dan tidak ada query COUNT.
+"""
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from asn_app.autocomplete import PAGE_SIZE, get_source
+from asn_app.models import ASN, Siswa
+
+from .test_query_plans import make
+
+
+class CombinedSourceTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        # Batas pegawai/siswa jatuh di tengah halaman kedua
+        for i in range(PAGE_SIZE + 5):
+            make(ASN, nip=f'19800101200501{i:04}', nama=f'Pegawai {i:02}')
+        for i in range(PAGE_SIZE + 3):
+            make(Siswa, nama=f'Siswa {i:02}', nis=f'200{i:02}')
+
+    def expected(self):
+        values = [f'pegawai_{pk}' for pk in ASN.objects.order_by('nama', 'pk').values_list('pk', flat=True)]
+        values += [f'siswa_{pk}' for pk in Siswa.objects.order_by('nama', 'pk').values_list('pk', flat=True)]
+        return values
+
+    def test_pages_follow_parts_in_order(self):
+        source = get_source('person')
+        expected = self.expected()
+        pages = (len(expected) + PAGE_SIZE - 1) // PAGE_SIZE
+        for number in range(1, pages + 2):
+            with self.subTest(page=number):
+                with CaptureQueriesContext(connection) as queries:
+                    results, more = source.page({'page': str(number)})
+                start = (number - 1) * PAGE_SIZE
+                self.assertEqual([result['id'] for result in results], expected[start:start + PAGE_SIZE])
+                self.assertEqual(more, start + PAGE_SIZE < len(expected))
+                self.assertFalse([q for q in queries if 'COUNT(' in q['sql'].upper()])
+
+    def test_first_page_only_queries_first_part(self):
+        with self.assertNumQueries(1):
+            get_source('person').page({'page': '1'})
@@ -0,0 +1,197 @@
+# asn_app/tests/test_leave_balance.py
+"""
+Saldo SisaCuti yang dijaga inkremental (``asn_app/leave_balance.py`` dan signal
+SuratCuti/HariLibur) harus selalu sama dengan hitung ulang penuh, termasuk
+setelah rollover tahun dan setelah ``recalculate_sisa_cuti``.
+"""
+import datetime
+import io
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from asn_app import leave_balance, workdays
+from asn_app.leave_balance import CHECKED_FIELDS, SNAPSHOT_FIELDS, check_balances, rollover
+from asn_app.models import ASN, HariLibur, RiwayatSisaCuti, SisaCuti, SuratCuti
+
+from .test_query_plans import make
+
+YEAR = SisaCuti.get_current_year()
+
+
+def monday(year, week):
+    """Senin pada minggu ke-``week`` tahun ``year``."""
+    return datetime.date.fromisocalendar(year, week, 1)
+
+
+class LeaveBalanceTestCase(TestCase):
+
+    def setUp(self):
+        workdays.invalidate()
+
+    def make_pegawai(self, nip):
+        return make(ASN, nip=nip, nama=f'Pegawai {nip[-2:]}')
+
+    def make_cuti(self, pegawai, start, weekdays):
+        """Surat cuti mulai ``start`` (Senin) sepanjang ``weekdays`` hari kerja tanpa hari libur."""
+        weeks, rest = divmod(weekdays - 1, 5)
+        return make(SuratCuti, pegawai=pegawai, tanggal_awal=start,
+                    tanggal_akhir=start + datetime.timedelta(days=weeks * 7 + rest))
+
+    def balances(self):
+        return {
+            sisa_cuti.pegawai_id: {field: getattr(sisa_cuti, field) for field in CHECKED_FIELDS + ['tahun_n']}
+            for sisa_cuti in SisaCuti.objects.all()
+        }
+
+    def assertMatchesFullRecalculation(self):
+        mismatches, missing = check_balances()
+        self.assertEqual([(sisa_cuti.pegawai_id, diff) for sisa_cuti, diff in mismatches], [])
+        self.assertEqual(missing, [])
+        # Hitung ulang massal (implementasi terpisah) tidak boleh mengubah saldo
+        # yang ada; pegawai tanpa SisaCuti dibuatkan dengan alokasi awal
+        before = self.balances()
+        call_command('recalculate_sisa_cuti', stdout=io.StringIO())
+        after = self.balances()
+        self.assertEqual({pegawai_id: after[pegawai_id] for pegawai_id in before}, before)
+
+
+class CarryOverTests(TestCase):
+
+    def test_carry_over(self):
+        cases = [
+            # (initial N, N-1, N-2, terpakai N, N-1, N-2) -> (sisa N, N-1, N-2)
+            ((12, 6, 6, 0, 0, 0), (12, 6, 6)),
+            ((12, 6, 6, 5, 2, 1), (7, 4, 5)),
+            # Terpakai N melebihi alokasi N-1: sisa N-1 hangus
+            ((12, 6, 6, 7, 0, 0), (5, 0, 6)),
+            # Terpakai N-1 melebihi alokasi N-2: sisa N-2 hangus
+            ((12, 6, 6, 0, 7, 0), (12, 0, 0)),
+            # Sisa tidak pernah negatif
+            ((12, 6, 6, 15, 6, 8), (0, 0, 0)),
+        ]
+        for args, expected in cases:
+            with self.subTest(args=args):
+                self.assertEqual(SisaCuti.carry_over(*args), expected)
+
+
+class IncrementalBalanceTests(LeaveBalanceTestCase):
+
+    def test_create_edit_delete(self):
+        pegawai = self.make_pegawai('198001012005011001')
+        lain = self.make_pegawai('198001012005011002')
+
+        surat = self.make_cuti(pegawai, monday(YEAR, 10), 3)
+        sisa_cuti = SisaCuti.objects.get(pegawai=pegawai)
+        self.assertEqual((sisa_cuti.terpakai_tahun_n, sisa_cuti.sisa_tahun_n), (3, 9))
+        self.assertMatchesFullRecalculation()
+
+        self.make_cuti(pegawai, monday(YEAR - 1, 20), 4)
+        self.make_cuti(pegawai, monday(YEAR - 2, 30), 2)
+        self.assertMatchesFullRecalculation()
+
+        # Diperpanjang sampai melewati alokasi N-1 (sisa N-1 hangus)
+        surat.tanggal_akhir = surat.tanggal_awal + datetime.timedelta(days=11)
+        surat.save()
+        self.assertEqual(SisaCuti.objects.get(pegawai=pegawai).sisa_tahun_n_1, 0)
+        self.assertMatchesFullRecalculation()
+
+        # Dipindah ke tahun sebelumnya
+        surat.tanggal_awal = monday(YEAR - 1, 40)
+        surat.tanggal_akhir = surat.tanggal_awal + datetime.timedelta(days=1)
+        surat.save()
+        self.assertMatchesFullRecalculation()
+
+        # Dipindah ke pegawai lain
+        surat.pegawai = lain
+        surat.save()
+        self.assertMatchesFullRecalculation()
+
+        surat.delete()
+        self.assertMatchesFullRecalculation()
+        self.assertEqual(SisaCuti.objects.get(pegawai=lain).terpakai_tahun_n_1, 0)
+
+    def test_letter_outside_buckets(self):
+        pegawai = self.make_pegawai('198001012005011003')
+        self.make_cuti(pegawai, monday(YEAR - 3, 10), 5)
+        self.assertMatchesFullRecalculation()
+        sisa_cuti = SisaCuti.objects.get(pegawai=pegawai)
+        self.assertEqual(sisa_cuti.total_sisa_cuti, 24)
+
+    def test_holiday_change(self):
+        pegawai = self.make_pegawai('198001012005011004')
+        surat = self.make_cuti(pegawai, monday(YEAR, 12), 5)
+
+        hari_libur = make(HariLibur, tanggal=surat.tanggal_awal + datetime.timedelta(days=2))
+        self.assertEqual(SisaCuti.objects.get(pegawai=pegawai).terpakai_tahun_n, 4)
+        self.assertMatchesFullRecalculation()
+
+        hari_libur.delete()
+        self.assertEqual(SisaCuti.objects.get(pegawai=pegawai).terpakai_tahun_n, 5)
+        self.assertMatchesFullRecalculation()
+
+
+class RolloverTests(LeaveBalanceTestCase):
+
+    def test_rollover(self):
+        # Bucket masih di tahun lalu, seperti sebelum rollover_sisa_cuti dijalankan
+        usage = {
+            # nip: [(tahun, hari kerja), ...]
+            '198001012005011011': [(YEAR - 1, 3), (YEAR - 2, 2)],
+            # Terpakai N melebihi alokasi N-2 -> setelah digeser sisa N-2 hangus
+            # walaupun terpakai N-1 masih di bawah alokasinya
+            '198001012005011012': [(YEAR - 1, 8), (YEAR - 2, 2), (YEAR - 3, 1)],
+            # Surat cuti tahun baru sudah dibuat sebelum rollover
+            '198001012005011013': [(YEAR - 1, 4), (YEAR, 2)],
+            '198001012005011014': [],
+        }
+        pegawai = {}
+        for nip, letters in usage.items():
+            pegawai[nip] = self.make_pegawai(nip)
+            SisaCuti.objects.create(pegawai=pegawai[nip], tahun_n=YEAR - 1, **leave_balance.DEFAULT_ALLOCATION)
+            for week, (year, days) in enumerate(letters, start=10):
+                self.make_cuti(pegawai[nip], monday(year, week), days)
+
+        before = {
+            sisa_cuti.pegawai_id: {field: getattr(sisa_cuti, field) for field in SNAPSHOT_FIELDS}
+            for sisa_cuti in SisaCuti.objects.all()
+        }
+        self.assertEqual(rollover(YEAR), {YEAR - 1: len(usage)})
+
+        # Saldo akhir tahun lalu tersimpan apa adanya
+        for riwayat in RiwayatSisaCuti.objects.filter(tahun=YEAR - 1):
+            self.assertEqual({field: getattr(riwayat, field) for field in SNAPSHOT_FIELDS}, before[riwayat.pegawai_id])
+        self.assertEqual(RiwayatSisaCuti.objects.count(), len(usage))
+
+        self.assertFalse(SisaCuti.objects.exclude(tahun_n=YEAR).exists())
+        shifted = SisaCuti.objects.get(pegawai=pegawai['198001012005011012'])
+        self.assertEqual(
+            (shifted.terpakai_tahun_n, shifted.terpakai_tahun_n_1, shifted.terpakai_tahun_n_2), (0, 8, 2),
+        )
+        self.assertEqual((shifted.sisa_tahun_n, shifted.sisa_tahun_n_1, shifted.sisa_tahun_n_2), (12, 0, 0))
+        charged = SisaCuti.objects.get(pegawai=pegawai['198001012005011013'])
+        self.assertEqual((charged.terpakai_tahun_n, charged.sisa_tahun_n), (2, 10))
+        self.assertMatchesFullRecalculation()
+
+        # Rollover kedua kali tidak mengubah apa pun
+        self.assertEqual(rollover(YEAR), {})
+
+
+class RecalculateCommandTests(LeaveBalanceTestCase):
+
+    def test_repairs_corrupted_balances(self):
+        for i in range(3):
+            pegawai = self.make_pegawai(f'19800101200501102{i}')
+            self.make_cuti(pegawai, monday(YEAR, 10 + i), 2 + i)
+            self.make_cuti(pegawai, monday(YEAR - 1, 10 + i), 1 + i)
+        expected = self.balances()
+
+        SuratCuti.objects.update(hari_efektif=0)
+        SisaCuti.objects.update(terpakai_tahun_n=99, sisa_tahun_n=0, total_sisa_cuti=0)
+        SisaCuti.objects.filter(pegawai__nip='198001012005011020').delete()
+
+        call_command('recalculate_sisa_cuti', stdout=io.StringIO())
+        self.assertEqual(self.balances(), expected)
+        for surat in SuratCuti.objects.all():
+            self.assertEqual(surat.hari_efektif, workdays.working_days(surat.tanggal_awal, surat.tanggal_akhir))
+        self.assertMatchesFullRecalculation()
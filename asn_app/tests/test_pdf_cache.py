@@ -0,0 +1,73 @@
+# asn_app/tests/test_pdf_cache.py
+"""
+Fingerprint cache PDF (``asn_app/pdf_cache.py``) harus berubah bila isi surat
+berubah, termasuk data di luar relasi surat seperti tabel HariLibur, dan
+tidak boleh berubah hanya karena surat dirender.
+"""
+import datetime
+
+from django.test import TestCase, override_settings
+
+from asn_app import workdays
+from asn_app.models import ASN, FotoKegiatan, HariLibur, SuratPerintahTugas
+from asn_app.pdf import get_document, render_html
+from asn_app.pdf_cache import fingerprint
+
+from .test_query_plans import MEDIA_ROOT, TANGGAL, make, png_file
+
+
+class SptFingerprintTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        asn = make(ASN, nip='198001012005011001', nama='Pegawai')
+        # Senin s.d. Jumat
+        cls.spt = make(SuratPerintahTugas, penandatangan=asn, kuasa_pengguna_anggaran=asn,
+                       tanggal_pelaksanaan=TANGGAL, tanggal_akhir_pelaksanaan=TANGGAL + datetime.timedelta(days=4))
+        cls.spt.peserta.set([asn])
+
+    def setUp(self):
+        workdays.invalidate()
+
+    def fingerprints(self):
+        spt = SuratPerintahTugas.objects.get(pk=self.spt.pk)
+        return {name: fingerprint(get_document(name), spt) for name in ('spt', 'spt_large')}
+
+    def test_holiday_changes_fingerprint(self):
+        before = self.fingerprints()
+        hari_libur = make(HariLibur, tanggal=TANGGAL + datetime.timedelta(days=2))
+        with_holiday = self.fingerprints()
+        for name in before:
+            self.assertNotEqual(before[name], with_holiday[name], name)
+
+        # Hari libur dipindah ke luar rentang SPT: jumlah hari kembali seperti semula
+        hari_libur.tanggal = TANGGAL + datetime.timedelta(days=14)
+        hari_libur.save()
+        self.assertEqual(self.fingerprints(), before)
+
+    def test_holiday_outside_range_keeps_fingerprint(self):
+        before = self.fingerprints()
+        make(HariLibur, tanggal=TANGGAL + datetime.timedelta(days=14))
+        self.assertEqual(self.fingerprints(), before)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class FotoKegiatanFingerprintTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        asn = make(ASN, nip='198001012005011001', nama='Pegawai')
+        cls.spt = make(SuratPerintahTugas, penandatangan=asn, kuasa_pengguna_anggaran=asn)
+        # Foto lama tanpa versi cetak
+        foto = FotoKegiatan(spt=cls.spt, keterangan='Kegiatan')
+        foto.foto.save('kegiatan.png', png_file('kegiatan.png'), save=False)
+        FotoKegiatan.objects.bulk_create([foto])
+
+    def test_render_does_not_change_fingerprint(self):
+        document = get_document('foto_kegiatan')
+        spt = SuratPerintahTugas.objects.get(pk=self.spt.pk)
+        before = fingerprint(document, spt)
+        html, context = render_html(document, spt)
+        self.assertEqual(len(context['grouped_fotos'][0]), 1)
+        self.assertFalse(FotoKegiatan.objects.get(spt=spt).foto_cetak)
+        self.assertEqual(fingerprint(document, SuratPerintahTugas.objects.get(pk=spt.pk)), before)
@@ -0,0 +1,168 @@
+# asn_app/tests/test_query_plans.py
+"""
+Jumlah query setiap halaman yang punya rencana query (``asn_app/query_plans.py``).
+
+Setiap model diisi beberapa baris yang masing-masing punya peserta, pegawai,
+penandatangan, kop surat, dll., lalu setiap rencana harus tepat memakai
+``max_queries`` query. Karena relasi sudah lebih dari satu baris, N+1 akan
+menambah jumlah query dan membuat test gagal.
+"""
+import datetime
+import io
+import shutil
+import tempfile
+
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import models
+from django.test import TestCase, override_settings
+from django.test.client import RequestFactory
+from django.urls import NoReverseMatch, reverse
+from PIL import Image
+
+from asn_app import documents  # noqa: F401 (mendaftarkan jenis dokumen PDF)
+from asn_app import workdays
+from asn_app.models import (
+    ASN, KopSurat, SuratPerintahTugas, DasarSurat, SuratSantunanKorpri, NotaDinas, PesertaNotaDinas,
+    HariLibur, SuratCuti, SisaCuti, Siswa, SiswaKeluar, SuratKeterangan, SuratRekomendasiStudiLanjut,
+    SuratKP4, AnggotaKeluargaKP4, SuratResmi, SPTJM, SPMT, SuratUmum, SuratPanggilanSiswa,
+    SuratUndangan, SuratDispensasi, PesertaDispensasi, SuratUsulan, PesertaSuratUsulan,
+    StSatyalancana, DRHSatyalancana, SuratPengantar,
+)
+from asn_app.pdf import get_document, render_html
+from asn_app.query_plans import PLANS
+
+ROWS = 5
+TANGGAL = datetime.date(2025, 3, 3)
+MEDIA_ROOT = tempfile.mkdtemp(prefix='asn_test_media_')
+
+
+def make(model, **values):
+    """Buat satu baris ``model``; kolom wajib yang tidak diberikan diisi nilai contoh."""
+    for field in model._meta.concrete_fields:
+        if field.name in values or field.attname in values:
+            continue
+        if field.primary_key or field.null or field.has_default() or field.is_relation:
+            continue
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+            continue
+        if isinstance(field, models.FileField):
+            continue
+        if field.choices:
+            values[field.name] = field.choices[0][0]
+        elif isinstance(field, models.DateTimeField):
+            values[field.name] = datetime.datetime(2025, 3, 3, 8, 0)
+        elif isinstance(field, models.DateField):
+            values[field.name] = TANGGAL
+        elif isinstance(field, models.TimeField):
+            values[field.name] = datetime.time(8, 0)
+        elif isinstance(field, models.IntegerField):
+            values[field.name] = 1
+        elif isinstance(field, (models.CharField, models.TextField)):
+            values[field.name] = f'{field.name} {model.__name__}'[:field.max_length or 255]
+    return model.objects.create(**values)
+
+
+def png_file(name):
+    buffer = io.BytesIO()
+    Image.new('RGB', (40, 10), 'white').save(buffer, format='PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, PDF_CACHE_DIR=f'{MEDIA_ROOT}/pdf_cache')
+class QueryPlanTests(TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    @classmethod
+    def setUpTestData(cls):
+        asn = [make(ASN, nip=f'1980010120050110{i:02}', nama=f'Pegawai {i}') for i in range(ROWS * 2)]
+        siswa = [make(Siswa, nama=f'Siswa {i}', nis=f'100{i}') for i in range(ROWS * 2)]
+        kop = make(KopSurat, gambar=png_file('kop.png'))
+        make(HariLibur, tanggal=TANGGAL + datetime.timedelta(days=2))
+        signer = {'penandatangan': asn[0], 'kop_surat': kop}
+
+        for i in range(ROWS):
+            pegawai = asn[i]
+            spt = make(SuratPerintahTugas, kuasa_pengguna_anggaran=asn[1],
+                       tanggal_akhir_pelaksanaan=TANGGAL + datetime.timedelta(days=4), **signer)
+            # Template SPT biasa hanya dipakai sampai 3 peserta (lebih dari itu: SPT large)
+            spt.peserta.set(asn[:3])
+            for urutan in range(3):
+                make(DasarSurat, spt=spt, urutan=urutan, isi=f'Dasar {urutan}')
+
+            make(SuratSantunanKorpri, pegawai=pegawai, **signer)
+
+            nota_dinas = make(NotaDinas, penanda_tangan=asn[0], kop_surat=kop)
+            nota_dinas.pegawai.set(asn[:ROWS])
+            nota_dinas.siswa.set(siswa[:ROWS])
+            for j in range(ROWS):
+                make(PesertaNotaDinas, nota_dinas=nota_dinas, pegawai=asn[j], siswa=siswa[j])
+
+            usulan = make(SuratUsulan, penanda_tangan=asn[0], kop_surat=kop)
+            for j in range(ROWS):
+                make(PesertaSuratUsulan, surat_usulan=usulan, pegawai=asn[j], siswa=siswa[j])
+
+            make(StSatyalancana, penanda_tangan=asn[0], kepada_pegawai=pegawai, kop_surat=kop)
+            make(DRHSatyalancana, asn=pegawai, atasan_langsung=asn[0])
+            make(SuratCuti, pegawai=pegawai, tanggal_awal=TANGGAL, tanggal_akhir=TANGGAL + datetime.timedelta(days=4),
+                 **signer)
+            SisaCuti.objects.get_or_create(pegawai=pegawai)
+            make(SiswaKeluar, siswa=siswa[ROWS + i])
+            make(SuratKeterangan, pegawai=pegawai, siswa=siswa[i], **signer)
+            make(SuratRekomendasiStudiLanjut, pegawai=pegawai, **signer)
+
+            kp4 = make(SuratKP4, pegawai=pegawai, **signer)
+            for j in range(3):
+                make(AnggotaKeluargaKP4, surat=kp4, nama=f'Anggota {j}')
+
+            resmi = make(SuratResmi, **signer)
+            resmi.pegawai.set(asn[:ROWS])
+            sptjm = make(SPTJM, **signer)
+            sptjm.pegawai.set(asn[:ROWS])
+            make(SPMT, pegawai=pegawai, **signer)
+            make(SuratUmum, pegawai=pegawai, **signer)
+            make(SuratPanggilanSiswa, siswa=siswa[i], kop_surat=kop, wali_kelas=asn[1], guru_bk=asn[2],
+                 wakasek_kesiswaan=asn[3])
+            make(SuratUndangan, siswa=siswa[i], kop_surat=kop, kepala_sekolah=asn[0])
+
+            dispensasi = make(SuratDispensasi, **signer)
+            for j in range(ROWS):
+                make(PesertaDispensasi, surat=dispensasi, siswa=siswa[j], guru=asn[j])
+
+            make(SuratPengantar, **signer)
+
+    def setUp(self):
+        # Setiap halaman diukur dari kondisi dingin: kalender hari libur dan
+        # fragmen template belum ada di cache proses
+        workdays.invalidate()
+        for alias in ('default', 'template_fragments'):
+            caches[alias].clear()
+
+    def render(self, plan, obj):
+        if plan.name.startswith('pdf:'):
+            document = get_document(plan.name[4:])
+            render_html(document, document.get_object(obj.pk), RequestFactory().get('/'))
+            return 200
+        try:
+            url = reverse(plan.name)
+        except NoReverseMatch:
+            url = reverse(plan.name, kwargs={'pk': obj.pk})
+        return self.client.get(url).status_code
+
+    def test_models_have_rows(self):
+        for plan in PLANS.values():
+            with self.subTest(plan=plan.name):
+                self.assertGreaterEqual(plan.model._default_manager.count(), ROWS)
+
+    def test_query_counts(self):
+        for name, plan in sorted(PLANS.items()):
+            with self.subTest(plan=name):
+                self.setUp()
+                obj = plan.model._default_manager.order_by('-pk').first()
+                with self.assertNumQueries(plan.max_queries):
+                    status = self.render(plan, obj)
+                self.assertEqual(status, 200)
@@ -22,9 +22,24 @@ urlpatterns = [
     path('spt/<int:pk>/print/', views.spt_print_view, name='spt_print_view'),
     path('spt/<int:pk>/laporan/', views.spt_laporan, name='spt_laporan'),
     path('spt/<int:spt_pk>/upload_foto/', views.upload_foto_kegiatan, name='upload_foto_kegiatan'),
+    path('spt/<int:spt_pk>/upload_foto/progress/<str:upload_id>/', views.upload_foto_kegiatan_progress, name='upload_foto_kegiatan_progress'),
     path('foto_kegiatan/<int:foto_pk>/delete/', views.delete_foto_kegiatan, name='delete_foto_kegiatan'),
     path('spt/<int:spt_pk>/cetak_foto_pdf/', views.cetak_foto_kegiatan_pdf, name='cetak_foto_kegiatan_pdf'),
 
+    # PDF di background (?async=1 pada URL export PDF)
+    path('pdf_jobs/<int:pk>/', views.pdf_job_status, name='pdf_job_status'),
+    # Cetak massal dari halaman daftar (?format=pdf untuk satu PDF gabungan)
+    path('pdf_bulk/<str:name>/', views.bulk_export_pdf, name='bulk_export_pdf'),
+    path('data/<str:name>.<str:fmt>', views.data_export, name='data_export'),
+
+    # Pencarian global ASN, Siswa dan surat
+    path('search/', views.global_search, name='global_search'),
+    path('autocomplete/<str:name>/', views.autocomplete, name='autocomplete'),
+
+    # Metrik waktu per halaman (staff)
+    path('metrics/', views.request_metrics, name='request_metrics'),
+    path('metrics/profile/<str:filename>', views.request_metrics_profile, name='request_metrics_profile'),
+
     # Kop Surat routes
     path('kop_surat/', views.kop_surat_list, name='kop_surat_list'),
     path('kop_surat/create/', views.kop_surat_create, name='kop_surat_create'),
@@ -51,6 +66,12 @@ urlpatterns = [
     path('nota_dinas/<int:pk>/pdf/', views.nota_dinas_export_pdf, name='nota_dinas_export_pdf'),
     path('nota_dinas/<int:pk>/lampiran/pdf/', views.nota_dinas_lampiran_pdf, name='nota_dinas_lampiran_pdf'),
 
+    # Peserta Nota Dinas routes
+    path('peserta-nota-dinas/', views.peserta_nota_dinas_list, name='peserta_nota_dinas_list'),
+    path('peserta-nota-dinas/create/', views.peserta_nota_dinas_create, name='peserta_nota_dinas_create'),
+    path('peserta-nota-dinas/<int:pk>/update/', views.peserta_nota_dinas_update, name='peserta_nota_dinas_update'),
+    path('peserta-nota-dinas/<int:pk>/delete/', views.peserta_nota_dinas_delete, name='peserta_nota_dinas_delete'),
+
     # Surat Usulan routes
     path('surat_usulan/', views.surat_usulan_list, name='surat_usulan_list'),
     path('surat_usulan/create/', views.surat_usulan_create, name='surat_usulan_create'),
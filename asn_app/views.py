@@ -1,19 +1,32 @@
 from django.conf import settings
 import logging
-import re
+from datetime import datetime
 from django.shortcuts import render, get_object_or_404, redirect
-from django.http import HttpResponse
-from django.template.loader import render_to_string
+from django.http import HttpResponse, FileResponse, Http404, JsonResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from django.utils.timezone import now
 from django.core.paginator import Paginator
 from django.contrib import messages
-from django.db.models import Q, Count
-from .models import ASN, SuratPerintahTugas, KopSurat, SuratSantunanKorpri, NotaDinas, HariLibur, SuratCuti, SisaCuti, Siswa, SuratKeterangan, SuratResmi, SPTJM, SPMT, FotoKegiatan, SuratUmum, SuratPanggilanSiswa, SiswaKeluar, SuratRekomendasiStudiLanjut, SuratKP4, AnggotaKeluargaKP4, SuratUndangan, PesertaNotaDinas, SuratDispensasi, PesertaDispensasi, SuratUsulan, PesertaSuratUsulan, StSatyalancana, DRHSatyalancana, SuratPengantar
+from django.contrib.admin.views.decorators import staff_member_required
+from django.contrib.auth.views import redirect_to_login
+from django.db.models import Q, Count, Sum
+from .models import ASN, SuratPerintahTugas, KopSurat, SuratSantunanKorpri, NotaDinas, HariLibur, SuratCuti, SisaCuti, Siswa, SuratKeterangan, SuratResmi, SPTJM, SPMT, FotoKegiatan, SuratUmum, SuratPanggilanSiswa, SiswaKeluar, SuratRekomendasiStudiLanjut, SuratKP4, AnggotaKeluargaKP4, SuratUndangan, PesertaNotaDinas, SuratDispensasi, PesertaDispensasi, SuratUsulan, PesertaSuratUsulan, StSatyalancana, DRHSatyalancana, SuratPengantar, PdfJob
 from .forms import ASNForm, SPTForm, KopSuratForm, SuratSantunanKorpriForm, NotaDinasForm, HariLiburForm, SuratCutiForm, SisaCutiForm, SiswaForm, SuratKeteranganForm, SuratResmiForm, SPTJMForm, SPMTForm, FotoKegiatanForm, SuratUmumForm, SuratPanggilanSiswaForm, SiswaKeluarForm, SuratRekomendasiStudiLanjutForm, SuratKP4Form, AnggotaKeluargaKP4FormSet, SuratUndanganForm, PesertaNotaDinasForm, PesertaNotaDinasCRUDForm, PesertaNotaDinasFormSet, SuratDispensasiForm, PesertaDispensasiFormSet, SuratUsulanForm, PesertaSuratUsulanForm, PesertaSuratUsulanCRUDForm, PesertaSuratUsulanFormSet, StSatyalancanaForm, DRHSatyalancanaForm, DasarSuratFormSet, SuratPengantarForm
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.urls import reverse_lazy, reverse
 import base64
 import os
+from .pdf import export_pdf
+from .pdf_jobs import job_response
+from .excel_import import get_import, run_import
+from .foto_upload import get_progress as get_foto_upload_progress, save_foto_batch
+from .exports import DATA_FORMATS, data_export_response, xlsx_response
+from .pagination import LATEST_DATE_FIRST, NEWEST_FIRST, KeysetPaginationMixin, paginate
+from .query_plans import planned
+from . import metrics, search
+from .autocomplete import get_source as get_autocomplete_source
+from . import documents  # noqa: F401 (mendaftarkan jenis dokumen PDF)
 
 
 
@@ -21,7 +34,7 @@ def asn_list(request):
     """Menampilkan daftar semua ASN"""
     query = request.GET.get('q')
     if query:
-        asn_queryset = ASN.objects.filter(nama__icontains=query).order_by('nama')
+        asn_queryset = search.filter_queryset(ASN.objects.all(), query).order_by('nama')
     else:
         asn_queryset = ASN.objects.all().order_by('nama')
 
@@ -43,43 +56,38 @@ def asn_detail(request, pk):
         max_year=Max('tanggal_awal__year')
     )
 
-    # Generate list of years: current year (N), N-1, N-2
-    years = []
-    for i in range(3):
-        years.append(current_year - i)
-
     # Get SisaCuti for this ASN
     try:
         sisa_cuti = SisaCuti.objects.get(pegawai=asn)
+        # Tahun N mengikuti saldo tersimpan (digeser oleh rollover_sisa_cuti)
+        current_year = sisa_cuti.tahun_n
     except SisaCuti.DoesNotExist:
         sisa_cuti = None
 
+    # Generate list of years: current year (N), N-1, N-2
+    years = []
+    for i in range(3):
+        years.append(current_year - i)
+
     # Calculate used leave days and remaining balance for each year (n, n-1, n-2)
     leave_data = {}
     total_initial = 0  # Total initial allocation (before deduct)
     total_remaining_after_deduct = 0  # Total remaining after deduct
 
-    for year in years:
-        # Get all surat cuti for this year
-        surat_cuti_qs = SuratCuti.objects.filter(
-            pegawai=asn,
-            tanggal_awal__year=year
-        )
+    # Hari cuti terpakai per tahun dalam satu query agregat
+    used_per_year = dict(
+        SuratCuti.objects.filter(pegawai=asn, tanggal_awal__year__in=years)
+        .values_list('tanggal_awal__year')
+        .annotate(total=Sum('hari_efektif'))
+        .order_by()
+    )
 
-        # Calculate total used days
-        used_days = sum(sc.calculate_effective_leave_days() for sc in surat_cuti_qs)
+    for year in years:
+        used_days = used_per_year.get(year) or 0
 
-        # Get initial allocation and remaining balance from SisaCuti
+        # Get initial allocation and remaining balance from SisaCuti (bucket per tahun_n)
         if sisa_cuti:
-            if year == current_year:
-                initial = sisa_cuti.initial_tahun_n
-                remaining = sisa_cuti.sisa_tahun_n
-            elif year == current_year - 1:
-                initial = sisa_cuti.initial_tahun_n_1
-                remaining = sisa_cuti.sisa_tahun_n_1
-            else:  # current_year - 2
-                initial = sisa_cuti.initial_tahun_n_2
-                remaining = sisa_cuti.sisa_tahun_n_2
+            initial, remaining = sisa_cuti.bucket(year)
         else:
             initial = 0
             remaining = 0
@@ -105,7 +113,6 @@ def asn_detail(request, pk):
 def asn_leave_history(request, pk, year, leave_type):
     """Menampilkan riwayat cuti ASN untuk tahun tertentu"""
     asn = get_object_or_404(ASN, pk=pk)
-    current_year = now().year
 
     # Get surat cuti for the specified year
     surat_cuti_list = SuratCuti.objects.filter(
@@ -114,27 +121,17 @@ def asn_leave_history(request, pk, year, leave_type):
     ).order_by('-tanggal_surat')
 
     # Calculate used days for each surat cuti
-    leave_details = []
-    for sc in surat_cuti_list:
-        leave_details.append({
-            'surat_cuti': sc,
-            'days': sc.calculate_effective_leave_days()
-        })
+    leave_details = [
+        {'surat_cuti': sc, 'days': sc.hari_efektif}
+        for sc in surat_cuti_list
+    ]
 
-    total_days = sum(item['days'] for item in leave_details)
+    total_days = surat_cuti_list.aggregate(total=Sum('hari_efektif'))['total'] or 0
 
     # Get initial allocation and remaining balance from SisaCuti
     try:
         sisa_cuti = SisaCuti.objects.get(pegawai=asn)
-        if year == current_year:
-            initial = sisa_cuti.initial_tahun_n
-            remaining = sisa_cuti.sisa_tahun_n
-        elif year == current_year - 1:
-            initial = sisa_cuti.initial_tahun_n_1
-            remaining = sisa_cuti.sisa_tahun_n_1
-        else:  # current_year - 2
-            initial = sisa_cuti.initial_tahun_n_2
-            remaining = sisa_cuti.sisa_tahun_n_2
+        initial, remaining = sisa_cuti.bucket(year)
     except SisaCuti.DoesNotExist:
         initial = 0
         remaining = 0
@@ -184,31 +181,7 @@ def asn_delete(request, pk):
 
 def asn_export_pdf(request, pk):
     """Export profil ASN ke PDF"""
-    from weasyprint import HTML
-
-    asn = get_object_or_404(ASN, pk=pk)
-
-    # Render template HTML dengan current time
-    html_string = render_to_string('asn_app/asn_pdf_template.html', {
-        'asn': asn,
-        'current_time': now(),
-        'request': request,
-    })
-
-    # Create PDF
-    try:
-        html = HTML(string=html_string)
-        result = html.write_pdf()
-    except Exception as e:
-        logging.error(f"Error writing PDF: {e}")
-        return HttpResponse(f"Error writing PDF: {e}", status=500)
-
-
-    # Create HTTP response dgn PDF
-    response = HttpResponse(result, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename=profil_{asn.nip}_{asn.nama}.pdf'
-
-    return response
+    return export_pdf(request, 'asn', pk)
 
 def asn_print_view(request, pk):
     """Tampilan khusus untuk print"""
@@ -221,12 +194,12 @@ def asn_print_view(request, pk):
 # SPT Views
 def spt_list(request):
     """Menampilkan daftar semua SPT"""
-    spt_list = SuratPerintahTugas.objects.all().order_by('-created_at')
-    return render(request, 'asn_app/spt_list.html', {'spt_list': spt_list})
+    page_obj = paginate(request, SuratPerintahTugas.objects.all(), keys=NEWEST_FIRST)
+    return render(request, 'asn_app/spt_list.html', {'spt_list': page_obj, 'page_obj': page_obj})
 
 def spt_detail(request, pk):
     """Menampilkan detail SPT"""
-    spt = get_object_or_404(SuratPerintahTugas, pk=pk)
+    spt = get_object_or_404(planned('spt_detail'), pk=pk)
     fotos = spt.foto_kegiatan.all()
     return render(request, 'asn_app/spt_detail.html', {'spt': spt, 'fotos': fotos})
 
@@ -258,21 +231,30 @@ def upload_foto_kegiatan(request, spt_pk):
                 # Render kembali halaman dengan form yang ada
                 return render(request, 'asn_app/upload_foto_kegiatan.html', {'form': form, 'spt': spt})
 
-            for f in files:
-                instance = FotoKegiatan(
-                    spt=spt,
-                    foto=f,
-                    keterangan=form.cleaned_data['keterangan']
-                )
-                instance.save()
-
-            messages.success(request, f'{len(files)} foto berhasil diupload.')
+            saved, failed = save_foto_batch(
+                spt, files, form.cleaned_data['keterangan'], upload_id=request.POST.get('upload_id')
+            )
+            messages.success(request, f'{len(saved)} foto berhasil diupload.')
+            if failed:
+                messages.error(request, f'{failed} foto gagal disimpan.')
+            if request.GET.get('format') == 'json':
+                # Upload lewat XHR dari halaman upload (dengan progress bar)
+                return JsonResponse({'saved': len(saved), 'failed': failed,
+                                     'redirect': reverse('spt_detail', kwargs={'pk': spt.pk})})
             return redirect('spt_detail', pk=spt.pk)
     else:
         form = FotoKegiatanForm()
     return render(request, 'asn_app/upload_foto_kegiatan.html', {'form': form, 'spt': spt})
 
 
+def upload_foto_kegiatan_progress(request, spt_pk, upload_id):
+    """Progres pemrosesan upload foto (JSON), dipolling halaman upload"""
+    progress = get_foto_upload_progress(upload_id)
+    if progress is None:
+        return JsonResponse({'status': 'pending'})
+    return JsonResponse(progress)
+
+
 def delete_foto_kegiatan(request, foto_pk):
     foto = get_object_or_404(FotoKegiatan, pk=foto_pk)
     spt_pk = foto.spt.pk
@@ -284,57 +266,7 @@ def delete_foto_kegiatan(request, foto_pk):
 
 def cetak_foto_kegiatan_pdf(request, spt_pk):
     """Export activity photos to PDF"""
-    import os
-    import base64
-    from weasyprint import HTML
-
-    spt = get_object_or_404(SuratPerintahTugas, pk=spt_pk)
-    fotos = spt.foto_kegiatan.all()
-
-    # Encode images to base64
-    encoded_fotos = []
-    for foto in fotos:
-        if foto.foto and os.path.exists(foto.foto.path):
-            try:
-                with open(foto.foto.path, 'rb') as image_file:
-                    image_data = image_file.read()
-                    image_format = foto.foto.name.split('.')[-1].lower()
-                    if image_format == 'jpg':
-                        image_format = 'jpeg'
-                    encoded_foto = f"data:image/{image_format};base64,{base64.b64encode(image_data).decode('utf-8')}"
-                    encoded_fotos.append({
-                        'base64': encoded_foto,
-                        'keterangan': foto.keterangan
-                    })
-            except Exception as e:
-                logging.error(f"Error encoding image to base64: {e}")
-
-    # Group photos into sets of four for display on A4 page (2x2 grid)
-    grouped_fotos = []
-    for i in range(0, len(encoded_fotos), 4):
-        grouped_fotos.append(encoded_fotos[i:i + 4])
-
-    # Render template HTML
-    html_string = render_to_string('asn_app/cetak_foto_kegiatan_pdf.html', {
-        'spt': spt,
-        'grouped_fotos': grouped_fotos,
-    })
-
-    # Create PDF
-    try:
-        html = HTML(string=html_string, base_url=request.build_absolute_uri())
-        result = html.write_pdf()
-    except Exception as e:
-        logging.error(f"Error writing PDF: {e}")
-        return HttpResponse(f"Error writing PDF: {e}", status=500)
-
-    # Create HTTP response dgn PDF
-    response = HttpResponse(result, content_type='application/pdf')
-    safe_nomor = re.sub(r'[^\w\-]', '_', spt.nomor_spt)
-    response['Content-Disposition'] = f'attachment; filename="foto_kegiatan_{safe_nomor}.pdf"'
-
-    return response
-
+    return export_pdf(request, 'foto_kegiatan', spt_pk)
 
 def spt_create(request):
     """Membuat SPT baru"""
@@ -376,67 +308,7 @@ def spt_delete(request, pk):
 
 def spt_export_pdf(request, pk):
     """Export SPT ke PDF"""
-    import os
-    import base64
-    from weasyprint import HTML
-
-    spt = get_object_or_404(SuratPerintahTugas, pk=pk)
-
-    # Debug logging
-    logger = logging.getLogger(__name__)
-    logger.info(f"spt: {spt}")
-    logger.info(f"spt.kop_surat: {spt.kop_surat}")
-
-    kop_surat_base64 = None
-    if spt.kop_surat and spt.kop_surat.gambar:
-        logger.info(f"spt.kop_surat.gambar: {spt.kop_surat.gambar}")
-        logger.info(f"spt.kop_surat.gambar.url: {spt.kop_surat.gambar.url}")
-        logger.info(f"spt.kop_surat.gambar.path: {spt.kop_surat.gambar.path}")
-
-        # Cek apakah file benar-benar ada
-        if os.path.exists(spt.kop_surat.gambar.path):
-            logger.info("File gambar KOP SURAT ADA di filesystem")
-            # Encode gambar ke base64
-            try:
-                with open(spt.kop_surat.gambar.path, 'rb') as image_file:
-                    image_data = image_file.read()
-                    image_format = spt.kop_surat.gambar.name.split('.')[-1].lower()
-                    if image_format == 'jpg':
-                        image_format = 'jpeg'
-                    kop_surat_base64 = f"data:image/{image_format};base64,{base64.b64encode(image_data).decode('utf-8')}"
-                    logger.info("Gambar berhasil di-encode ke base64")
-            except Exception as e:
-                logger.error(f"Error encoding image to base64: {e}")
-        else:
-            logger.error("File gambar KOP SURAT TIDAK ADA di filesystem")
-
-    # Choose template based on participant count
-    template_name = 'asn_app/spt_pdf_template_large.html' if spt.peserta.all().count() > 3 else 'asn_app/spt_pdf_template.html'
-
-    # Render template HTML
-    html_string = render_to_string(template_name, {
-        'spt': spt,
-        'current_time': now(),
-        'request': request,
-        'MEDIA_URL': '/media/',  # Tambahkan MEDIA_URL secara manual
-        'kop_surat_base64': kop_surat_base64,
-    })
-
-    # Create PDF
-    try:
-        html = HTML(string=html_string, base_url=request.build_absolute_uri())
-        result = html.write_pdf()
-    except Exception as e:
-        logger.error(f"Error writing PDF: {e}")
-        return HttpResponse(f"Error writing PDF: {e}", status=500)
-
-    # Create HTTP response dgn PDF
-    response = HttpResponse(result, content_type='application/pdf')
-    safe_nomor = re.sub(r'[^\w\-]', '_', spt.nomor_spt)
-    safe_nama = re.sub(r'[^\w\-]', '_', spt.nama_kegiatan)
-    response['Content-Disposition'] = f'attachment; filename="spt_{safe_nomor}_{safe_nama}.pdf"'
-
-    return response
+    return export_pdf(request, 'spt', pk)
 
 def spt_print_view(request, pk):
     """Tampilan khusus untuk print SPT"""
@@ -448,55 +320,13 @@ def spt_print_view(request, pk):
 
 def spt_export_pdf_large(request, pk):
     """Export SPT ke PDF dengan daftar peserta lengkap"""
-    import os
-    import base64
-    from weasyprint import HTML
-
-    spt = get_object_or_404(SuratPerintahTugas, pk=pk)
-
-    logger = logging.getLogger(__name__)
-
-    kop_surat_base64 = None
-    if spt.kop_surat and spt.kop_surat.gambar:
-        if os.path.exists(spt.kop_surat.gambar.path):
-            try:
-                with open(spt.kop_surat.gambar.path, 'rb') as image_file:
-                    image_data = image_file.read()
-                    image_format = spt.kop_surat.gambar.name.split('.')[-1].lower()
-                    if image_format == 'jpg':
-                        image_format = 'jpeg'
-                    kop_surat_base64 = f"data:image/{image_format};base64,{base64.b64encode(image_data).decode('utf-8')}"
-            except Exception as e:
-                logger.error(f"Error encoding image to base64 for large PDF: {e}")
-
-    html_string = render_to_string('asn_app/spt_pdf_template_large.html', {
-        'spt': spt,
-        'current_time': now(),
-        'request': request,
-        'MEDIA_URL': '/media/',
-        'kop_surat_base64': kop_surat_base64,
-    })
-
-    try:
-        html = HTML(string=html_string, base_url=request.build_absolute_uri())
-        result = html.write_pdf()
-    except Exception as e:
-        logger.error(f"Error writing large PDF: {e}")
-        return HttpResponse(f"Error writing large PDF: {e}", status=500)
-
-    response = HttpResponse(result, content_type='application/pdf')
-    safe_nomor = re.sub(r'[^\w\-]', '_', spt.nomor_spt)
-    safe_nama = re.sub(r'[^\w\-]', '_', spt.nama_kegiatan)
-    response['Content-Disposition'] = f'attachment; filename="spt_lengkap_{safe_nomor}_{safe_nama}.pdf"'
-
-    return response
-
+    return export_pdf(request, 'spt_large', pk)
 
 # Kop Surat Views
 def kop_surat_list(request):
     """Menampilkan daftar semua Kop Surat"""
-    kop_surat_list = KopSurat.objects.all().order_by('-created_at')
-    return render(request, 'asn_app/kop_surat_list.html', {'kop_surat_list': kop_surat_list})
+    page_obj = paginate(request, KopSurat.objects.all(), keys=NEWEST_FIRST)
+    return render(request, 'asn_app/kop_surat_list.html', {'kop_surat_list': page_obj, 'page_obj': page_obj})
 
 def kop_surat_detail(request, pk):
     """Menampilkan detail Kop Surat"""
@@ -536,103 +366,38 @@ def kop_surat_delete(request, pk):
 
 def export_asn_excel(request):
     """Export all ASN data to an Excel file."""
-    import openpyxl
-    from openpyxl.utils import get_column_letter
-
-    asns = ASN.objects.all()
-    workbook = openpyxl.Workbook()
-    sheet = workbook.active
-    sheet.title = 'ASN Data'
-
-    # Write headers
-    headers = [
-        'NIP', 'Nama', 'Tempat Lahir', 'Tanggal Lahir', 'Jenis Kelamin',
-        'Agama', 'Alamat', 'Email', 'Telepon', 'Jabatan', 'Pangkat',
-        'Golongan', 'Unit Kerja'
-    ]
-    for col_num, header in enumerate(headers, 1):
-        col_letter = get_column_letter(col_num)
-        sheet[f'{col_letter}1'] = header
-
-    # Write data
-    for row_num, asn in enumerate(asns, 2):
-        sheet[f'A{row_num}'] = asn.nip
-        sheet[f'B{row_num}'] = asn.nama
-        sheet[f'C{row_num}'] = asn.tempat_lahir
-        sheet[f'D{row_num}'] = asn.tanggal_lahir.strftime('%Y-%m-%d') if asn.tanggal_lahir else ''
-        sheet[f'E{row_num}'] = asn.get_jenis_kelamin_display()
-        sheet[f'F{row_num}'] = asn.agama
-        sheet[f'G{row_num}'] = asn.alamat
-        sheet[f'H{row_num}'] = asn.email
-        sheet[f'I{row_num}'] = asn.telepon
-        sheet[f'J{row_num}'] = asn.jabatan
-        sheet[f'K{row_num}'] = asn.pangkat
-        sheet[f'L{row_num}'] = asn.golongan
-        sheet[f'M{row_num}'] = asn.unit_kerja
-
-    response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-    response['Content-Disposition'] = 'attachment; filename=asn_data.xlsx'
-    workbook.save(response)
-    return response
+    return xlsx_response('asn')
+
+def excel_import_view(request, name, template_name, success_url, context=None):
+    """Form upload + proses import Excel; baris yang gagal ditampilkan per nomor baris."""
+    spec = get_import(name)
+    context = dict(context or {})
+    context['upsert_available'] = spec.supports_upsert
+    if request.method == 'POST':
+        excel_file = request.FILES.get('excel_file')
+        if excel_file is None:
+            context['upload_error'] = 'Pilih file Excel terlebih dahulu.'
+            return render(request, template_name, context)
+
+        mode = 'upsert' if spec.supports_upsert and request.POST.get('mode') == 'upsert' else 'insert'
+        result = run_import(spec, excel_file, mode=mode)
+        if result.ok:
+            messages.success(request, result.summary())
+            return redirect(success_url)
+        context['result'] = result
+    return render(request, template_name, context)
 
 def import_asn_excel(request):
     """Import ASN data from an Excel file."""
-    if request.method == 'POST':
-        import openpyxl
-        from datetime import datetime
-
-        excel_file = request.FILES['excel_file']
-        workbook = openpyxl.load_workbook(excel_file)
-        sheet = workbook.active
-
-        for row in sheet.iter_rows(min_row=2, values_only=True):
-            (
-                nip, nama, tempat_lahir, tanggal_lahir_val, jenis_kelamin,
-                agama, alamat, email, telepon, jabatan, pangkat,
-                golongan, unit_kerja
-            ) = row
-
-            # Handle date conversion
-            tanggal_lahir = None
-            if isinstance(tanggal_lahir_val, datetime):
-                tanggal_lahir = tanggal_lahir_val.date()
-            elif isinstance(tanggal_lahir_val, str):
-                try:
-                    tanggal_lahir = datetime.strptime(tanggal_lahir_val, '%Y-%m-%d').date()
-                except ValueError:
-                    # Handle other date formats if necessary
-                    pass
-
-            # Handle choices
-            jenis_kelamin_code = jenis_kelamin[0].upper() if jenis_kelamin else ''
-            agama_code = agama.upper() if agama else ''
-
-            ASN.objects.create(
-                nip=nip,
-                nama=nama,
-                tempat_lahir=tempat_lahir,
-                tanggal_lahir=tanggal_lahir,
-                jenis_kelamin=jenis_kelamin_code,
-                agama=agama_code,
-                alamat=alamat,
-                email=email,
-                telepon=telepon,
-                jabatan=jabatan,
-                pangkat=pangkat,
-                golongan=golongan,
-                unit_kerja=unit_kerja
-            )
-        return redirect('asn_list')
-    return render(request, 'asn_app/import_form.html')
-
+    return excel_import_view(request, 'asn', 'asn_app/import_form.html', 'asn_list')
 
 # Surat Santunan Korpri Views
 def surat_santunan_korpri_list(request):
-    surat_list = SuratSantunanKorpri.objects.all().order_by('-created_at')
-    return render(request, 'asn_app/surat_santunan_korpri_list.html', {'surat_list': surat_list})
+    page_obj = paginate(request, planned('surat_santunan_korpri_list'), keys=NEWEST_FIRST)
+    return render(request, 'asn_app/surat_santunan_korpri_list.html', {'surat_list': page_obj, 'page_obj': page_obj})
 
 def surat_santunan_korpri_detail(request, pk):
-    surat = get_object_or_404(SuratSantunanKorpri, pk=pk)
+    surat = get_object_or_404(planned('surat_santunan_korpri_detail'), pk=pk)
     return render(request, 'asn_app/surat_santunan_korpri_detail.html', {'surat': surat})
 
 def surat_santunan_korpri_create(request):
@@ -664,50 +429,15 @@ def surat_santunan_korpri_delete(request, pk):
     return render(request, 'asn_app/surat_santunan_korpri_confirm_delete.html', {'surat': surat})
 
 def surat_santunan_korpri_export_pdf(request, pk):
-    import os
-    import base64
-    from weasyprint import HTML
-
-    surat = get_object_or_404(SuratSantunanKorpri, pk=pk)
-
-    kop_surat_base64 = None
-    if surat.kop_surat and surat.kop_surat.gambar:
-        if os.path.exists(surat.kop_surat.gambar.path):
-            try:
-                with open(surat.kop_surat.gambar.path, 'rb') as image_file:
-                    image_data = image_file.read()
-                    image_format = surat.kop_surat.gambar.name.split('.')[-1].lower()
-                    if image_format == 'jpg':
-                        image_format = 'jpeg'
-                    kop_surat_base64 = f"data:image/{image_format};base64,{base64.b64encode(image_data).decode('utf-8')}"
-            except Exception as e:
-                logging.error(f"Error encoding image to base64 for large PDF: {e}")
-
-    html_string = render_to_string('asn_app/surat_santunan_korpri_pdf_template.html', {
-        'surat': surat,
-        'request': request,
-        'kop_surat_base64': kop_surat_base64,
-    })
-
-    try:
-        html = HTML(string=html_string, base_url=request.build_absolute_uri())
-        result = html.write_pdf()
-    except Exception as e:
-        logging.error(f"Error writing PDF: {e}")
-        return HttpResponse(f"Error writing PDF: {e}", status=500)
-
-    response = HttpResponse(result, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename=surat_santunan_{surat.nomor_surat}.pdf'
-
-    return response
+    return export_pdf(request, 'surat_santunan_korpri', pk)
 
 # Nota Dinas Views
 def nota_dinas_list(request):
-    nota_dinas_list = NotaDinas.objects.all().order_by('-tanggal')
-    return render(request, 'asn_app/nota_dinas_list.html', {'nota_dinas_list': nota_dinas_list})
+    page_obj = paginate(request, NotaDinas.objects.all(), keys=LATEST_DATE_FIRST)
+    return render(request, 'asn_app/nota_dinas_list.html', {'nota_dinas_list': page_obj, 'page_obj': page_obj})
 
 def nota_dinas_detail(request, pk):
-    nota_dinas = get_object_or_404(NotaDinas, pk=pk)
+    nota_dinas = get_object_or_404(planned('nota_dinas_detail'), pk=pk)
     return render(request, 'asn_app/nota_dinas_detail.html', {'nota_dinas': nota_dinas})
 
 def nota_dinas_create(request):
@@ -761,13 +491,16 @@ def nota_dinas_delete(request, pk):
 
 def peserta_nota_dinas_list(request):
     nota_dinas_id = request.GET.get('nota_dinas')
-    peserta_list = PesertaNotaDinas.objects.select_related('nota_dinas', 'pegawai', 'siswa').all().order_by('nota_dinas__tanggal', 'id')
+    peserta_list = planned('peserta_nota_dinas_list').order_by('nota_dinas__tanggal', 'id')
     nota_dinas = None
     if nota_dinas_id:
         peserta_list = peserta_list.filter(nota_dinas_id=nota_dinas_id)
         nota_dinas = get_object_or_404(NotaDinas, pk=nota_dinas_id)
+    # Urutan lintas tabel (tanggal nota dinas), jadi tetap OFFSET
+    page_obj = paginate(request, peserta_list)
     return render(request, 'asn_app/peserta_nota_dinas_list.html', {
-        'peserta_list': peserta_list,
+        'peserta_list': page_obj,
+        'page_obj': page_obj,
         'nota_dinas': nota_dinas,
     })
 
@@ -813,96 +546,18 @@ def peserta_nota_dinas_delete(request, pk):
 
 
 def nota_dinas_export_pdf(request, pk):
-    import os
-    import base64
-    from weasyprint import HTML
-
-    nota_dinas = get_object_or_404(NotaDinas, pk=pk)
-
-    kop_surat_base64 = None
-    if nota_dinas.kop_surat and nota_dinas.kop_surat.gambar:
-        if os.path.exists(nota_dinas.kop_surat.gambar.path):
-            try:
-                with open(nota_dinas.kop_surat.gambar.path, 'rb') as image_file:
-                    image_data = image_file.read()
-                    image_format = nota_dinas.kop_surat.gambar.name.split('.')[-1].lower()
-                    if image_format == 'jpg':
-                        image_format = 'jpeg'
-                    kop_surat_base64 = f"data:image/{image_format};base64,{base64.b64encode(image_data).decode('utf-8')}"
-            except Exception as e:
-                logging.error(f"Error encoding image to base64 for large PDF: {e}")
-
-    jumlah_peserta = nota_dinas.peserta_nota_dinas.count()
-    if jumlah_peserta == 0:
-        jumlah_peserta = nota_dinas.pegawai.count() + nota_dinas.siswa.count()
-    show_lampiran_link = jumlah_peserta > 3
-    lampiran_url = request.build_absolute_uri(reverse('nota_dinas_lampiran_pdf', kwargs={'pk': nota_dinas.pk}))
-
-    html_string = render_to_string('asn_app/nota_dinas_pdf_template.html', {
-        'nota_dinas': nota_dinas,
-        'request': request,
-        'kop_surat_base64': kop_surat_base64,
-        'show_lampiran_link': show_lampiran_link,
-        'lampiran_url': lampiran_url,
-        'jumlah_peserta': jumlah_peserta,
-    })
-
-    try:
-        html = HTML(string=html_string, base_url=request.build_absolute_uri())
-        result = html.write_pdf()
-    except Exception as e:
-        logging.error(f"Error writing PDF: {e}")
-        return HttpResponse(f"Error writing PDF: {e}", status=500)
-
-    response = HttpResponse(result, content_type='application/pdf')
-    return response
-
+    return export_pdf(request, 'nota_dinas', pk)
 
 def nota_dinas_lampiran_pdf(request, pk):
-    import os
-    import base64
-    from weasyprint import HTML
-
-    nota_dinas = get_object_or_404(NotaDinas, pk=pk)
-
-    kop_surat_base64 = None
-    if nota_dinas.kop_surat and nota_dinas.kop_surat.gambar:
-        if os.path.exists(nota_dinas.kop_surat.gambar.path):
-            try:
-                with open(nota_dinas.kop_surat.gambar.path, 'rb') as image_file:
-                    image_data = image_file.read()
-                    image_format = nota_dinas.kop_surat.gambar.name.split('.')[-1].lower()
-                    if image_format == 'jpg':
-                        image_format = 'jpeg'
-                    kop_surat_base64 = f"data:image/{image_format};base64,{base64.b64encode(image_data).decode('utf-8')}"
-            except Exception as e:
-                logging.error(f"Error encoding image to base64 for lampiran PDF: {e}")
-
-    html_string = render_to_string('asn_app/nota_dinas_lampiran_template.html', {
-        'nota_dinas': nota_dinas,
-        'request': request,
-        'kop_surat_base64': kop_surat_base64,
-    })
-
-    try:
-        html = HTML(string=html_string, base_url=request.build_absolute_uri())
-        result = html.write_pdf()
-    except Exception as e:
-        logging.error(f"Error writing lampiran PDF: {e}")
-        return HttpResponse(f"Error writing lampiran PDF: {e}", status=500)
-
-    response = HttpResponse(result, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="lampiran_nota_dinas_{nota_dinas.pk}.pdf"'
-    return response
-
+    return export_pdf(request, 'nota_dinas_lampiran', pk)
 
 # Surat Usulan Views
 def surat_usulan_list(request):
-    surat_usulan_list = SuratUsulan.objects.all().order_by('-tanggal')
-    return render(request, 'asn_app/surat_usulan_list.html', {'surat_usulan_list': surat_usulan_list})
+    page_obj = paginate(request, SuratUsulan.objects.all(), keys=LATEST_DATE_FIRST)
+    return render(request, 'asn_app/surat_usulan_list.html', {'surat_usulan_list': page_obj, 'page_obj': page_obj})
 
 def surat_usulan_detail(request, pk):
-    surat_usulan = get_object_or_404(SuratUsulan, pk=pk)
+    surat_usulan = get_object_or_404(planned('surat_usulan_detail'), pk=pk)
     return render(request, 'asn_app/surat_usulan_detail.html', {'surat_usulan': surat_usulan})
 
 def surat_usulan_create(request):
@@ -948,13 +603,16 @@ def surat_usulan_delete(request, pk):
 
 def peserta_surat_usulan_list(request):
     surat_usulan_id = request.GET.get('surat_usulan')
-    peserta_list = PesertaSuratUsulan.objects.select_related('surat_usulan', 'pegawai').all().order_by('surat_usulan__tanggal', 'id')
+    peserta_list = planned('peserta_surat_usulan_list').order_by('surat_usulan__tanggal', 'id')
     surat_usulan = None
     if surat_usulan_id:
         peserta_list = peserta_list.filter(surat_usulan_id=surat_usulan_id)
         surat_usulan = get_object_or_404(SuratUsulan, pk=surat_usulan_id)
+    # Urutan lintas tabel (tanggal surat usulan), jadi tetap OFFSET
+    page_obj = paginate(request, peserta_list)
     return render(request, 'asn_app/peserta_surat_usulan_list.html', {
-        'peserta_list': peserta_list,
+        'peserta_list': page_obj,
+        'page_obj': page_obj,
         'surat_usulan': surat_usulan,
     })
 
@@ -999,95 +657,18 @@ def peserta_surat_usulan_delete(request, pk):
     })
 
 def surat_usulan_export_pdf(request, pk):
-    import os
-    import base64
-    from weasyprint import HTML
-
-    surat_usulan = get_object_or_404(SuratUsulan, pk=pk)
-
-    kop_surat_base64 = None
-    if surat_usulan.kop_surat and surat_usulan.kop_surat.gambar:
-        if os.path.exists(surat_usulan.kop_surat.gambar.path):
-            try:
-                with open(surat_usulan.kop_surat.gambar.path, 'rb') as image_file:
-                    image_data = image_file.read()
-                    image_format = surat_usulan.kop_surat.gambar.name.split('.')[-1].lower()
-                    if image_format == 'jpg':
-                        image_format = 'jpeg'
-                    kop_surat_base64 = f"data:image/{image_format};base64,{base64.b64encode(image_data).decode('utf-8')}"
-            except Exception as e:
-                logging.error(f"Error encoding image to base64 for Surat Usulan PDF: {e}")
-
-    jumlah_peserta = surat_usulan.peserta_surat_usulan.count()
-    show_lampiran_link = jumlah_peserta > 0
-    lampiran_url = request.build_absolute_uri(reverse('surat_usulan_lampiran_pdf', kwargs={'pk': surat_usulan.pk}))
-
-    html_string = render_to_string('asn_app/surat_usulan_pdf_template.html', {
-        'surat_usulan': surat_usulan,
-        'request': request,
-        'kop_surat_base64': kop_surat_base64,
-        'show_lampiran_link': show_lampiran_link,
-        'lampiran_url': lampiran_url,
-        'jumlah_peserta': jumlah_peserta,
-    })
-
-    try:
-        html = HTML(string=html_string, base_url=request.build_absolute_uri())
-        result = html.write_pdf()
-    except Exception as e:
-        logging.error(f"Error writing PDF for Surat Usulan: {e}")
-        return HttpResponse(f"Error writing PDF: {e}", status=500)
-
-    response = HttpResponse(result, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename=surat_usulan_{surat_usulan.pk}.pdf'
-    return response
-
+    return export_pdf(request, 'surat_usulan', pk)
 
 def surat_usulan_lampiran_pdf(request, pk):
-    import os
-    import base64
-    from weasyprint import HTML
-
-    surat_usulan = get_object_or_404(SuratUsulan, pk=pk)
-
-    kop_surat_base64 = None
-    if surat_usulan.kop_surat and surat_usulan.kop_surat.gambar:
-        if os.path.exists(surat_usulan.kop_surat.gambar.path):
-            try:
-                with open(surat_usulan.kop_surat.gambar.path, 'rb') as image_file:
-                    image_data = image_file.read()
-                    image_format = surat_usulan.kop_surat.gambar.name.split('.')[-1].lower()
-                    if image_format == 'jpg':
-                        image_format = 'jpeg'
-                    kop_surat_base64 = f"data:image/{image_format};base64,{base64.b64encode(image_data).decode('utf-8')}"
-            except Exception as e:
-                logging.error(f"Error encoding image to base64 for Surat Usulan Lampiran PDF: {e}")
-
-    html_string = render_to_string('asn_app/surat_usulan_lampiran_template.html', {
-        'surat_usulan': surat_usulan,
-        'request': request,
-        'kop_surat_base64': kop_surat_base64,
-    })
-
-    try:
-        html = HTML(string=html_string, base_url=request.build_absolute_uri())
-        result = html.write_pdf()
-    except Exception as e:
-        logging.error(f"Error writing lampiran PDF for Surat Usulan: {e}")
-        return HttpResponse(f"Error writing lampiran PDF: {e}", status=500)
-
-    response = HttpResponse(result, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename=lampiran_surat_usulan_{surat_usulan.pk}.pdf'
-    return response
-
+    return export_pdf(request, 'surat_usulan_lampiran', pk)
 
 # ST Satyalancana Views
 def st_satyalancana_list(request):
-    st_list = StSatyalancana.objects.all().order_by('-tanggal')
-    return render(request, 'asn_app/st_satyalancana_list.html', {'st_list': st_list})
+    page_obj = paginate(request, StSatyalancana.objects.all(), keys=LATEST_DATE_FIRST)
+    return render(request, 'asn_app/st_satyalancana_list.html', {'st_list': page_obj, 'page_obj': page_obj})
 
 def st_satyalancana_detail(request, pk):
-    st = get_object_or_404(StSatyalancana, pk=pk)
+    st = get_object_or_404(planned('st_satyalancana_detail'), pk=pk)
     return render(request, 'asn_app/st_satyalancana_detail.html', {'st': st})
 
 def st_satyalancana_create(request):
@@ -1145,50 +726,15 @@ def st_satyalancana_delete(request, pk):
     return render(request, 'asn_app/st_satyalancana_confirm_delete.html', {'st': st})
 
 def st_satyalancana_export_pdf(request, pk):
-    import os
-    import base64
-    from weasyprint import HTML
-
-    st = get_object_or_404(StSatyalancana, pk=pk)
-
-    kop_surat_base64 = None
-    if st.kop_surat and st.kop_surat.gambar:
-        if os.path.exists(st.kop_surat.gambar.path):
-            try:
-                with open(st.kop_surat.gambar.path, 'rb') as image_file:
-                    image_data = image_file.read()
-                    image_format = st.kop_surat.gambar.name.split('.')[-1].lower()
-                    if image_format == 'jpg':
-                        image_format = 'jpeg'
-                    kop_surat_base64 = f"data:image/{image_format};base64,{base64.b64encode(image_data).decode('utf-8')}"
-            except Exception as e:
-                logging.error(f"Error encoding image to base64 for ST Satyalancana PDF: {e}")
-
-    html_string = render_to_string('asn_app/st_satyalancana_pdf_template.html', {
-        'st': st,
-        'request': request,
-        'kop_surat_base64': kop_surat_base64,
-    })
-
-    try:
-        html = HTML(string=html_string, base_url=request.build_absolute_uri())
-        result = html.write_pdf()
-    except Exception as e:
-        logging.error(f"Error writing PDF for ST Satyalancana: {e}")
-        return HttpResponse(f"Error writing PDF: {e}", status=500)
-
-    response = HttpResponse(result, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename=st_satyalancana_{st.pk}.pdf'
-    return response
-
+    return export_pdf(request, 'st_satyalancana', pk)
 
 # DRH Satyalancana Views
 def drh_satyalancana_list(request):
-    drh_list = DRHSatyalancana.objects.select_related('asn').all().order_by('-created_at')
-    return render(request, 'asn_app/drh_satyalancana_list.html', {'drh_list': drh_list})
+    page_obj = paginate(request, planned('drh_satyalancana_list'), keys=NEWEST_FIRST)
+    return render(request, 'asn_app/drh_satyalancana_list.html', {'drh_list': page_obj, 'page_obj': page_obj})
 
 def drh_satyalancana_detail(request, pk):
-    drh = get_object_or_404(DRHSatyalancana.objects.select_related('asn'), pk=pk)
+    drh = get_object_or_404(planned('drh_satyalancana_detail'), pk=pk)
     return render(request, 'asn_app/drh_satyalancana_detail.html', {'drh': drh})
 
 def drh_satyalancana_create(request):
@@ -1224,47 +770,7 @@ def drh_satyalancana_delete(request, pk):
     return render(request, 'asn_app/drh_satyalancana_confirm_delete.html', {'drh': drh})
 
 def drh_satyalancana_export_pdf(request, pk):
-    import os
-    import base64
-    from weasyprint import HTML
-
-    drh = get_object_or_404(DRHSatyalancana.objects.select_related('asn'), pk=pk)
-    asn = drh.asn
-
-    kop_surat_base64 = None
-    if asn.unit_kerja:
-        # Try to get kop surat from StSatyalancana or use a default
-        kop_surat = StSatyalancana.objects.first().kop_surat if StSatyalancana.objects.exists() else None
-        if kop_surat and kop_surat.gambar:
-            if os.path.exists(kop_surat.gambar.path):
-                try:
-                    with open(kop_surat.gambar.path, 'rb') as image_file:
-                        image_data = image_file.read()
-                        image_format = kop_surat.gambar.name.split('.')[-1].lower()
-                        if image_format == 'jpg':
-                            image_format = 'jpeg'
-                        kop_surat_base64 = f"data:image/{image_format};base64,{base64.b64encode(image_data).decode('utf-8')}"
-                except Exception as e:
-                    logging.error(f"Error encoding image to base64 for DRH PDF: {e}")
-
-    html_string = render_to_string('asn_app/drh_satyalancana_pdf_template.html', {
-        'drh': drh,
-        'asn': asn,
-        'request': request,
-        'kop_surat_base64': kop_surat_base64,
-    })
-
-    try:
-        html = HTML(string=html_string, base_url=request.build_absolute_uri())
-        result = html.write_pdf()
-    except Exception as e:
-        logging.error(f"Error writing PDF for DRH Satyalancana: {e}")
-        return HttpResponse(f"Error writing PDF: {e}", status=500)
-
-    response = HttpResponse(result, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename=drh_satyalancana_{drh.pk}.pdf'
-    return response
-
+    return export_pdf(request, 'drh_satyalancana', pk)
 
 # Hari Libur Views
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
@@ -1310,16 +816,17 @@ class SuratCutiListView(ListView):
     paginate_by = 7
 
     def get_queryset(self):
-        queryset = super().get_queryset()
+        queryset = planned('surat_cuti_list', super().get_queryset())
         search_query = self.request.GET.get('nama', '')
         if search_query:
-            queryset = queryset.filter(pegawai__nama__icontains=search_query)
+            queryset = queryset.filter(pegawai__in=search.filter_queryset(ASN.objects.all(), search_query))
         return queryset
 
 class SuratCutiDetailView(DetailView):
     model = SuratCuti
     template_name = 'asn_app/surat_cuti_detail.html'
     context_object_name = 'surat_cuti'
+    queryset = planned('surat_cuti_detail')
 
 class SuratCutiCreateView(CreateView):
     model = SuratCuti
@@ -1367,21 +874,25 @@ class SisaCutiListView(ListView):
     paginate_by = 7
 
     def get_queryset(self):
-        queryset = super().get_queryset()
+        # Saldo dibaca apa adanya dari kolom tersimpan, tanpa hitung ulang per baris
+        queryset = planned('sisa_cuti_list', super().get_queryset())
         search_query = self.request.GET.get('search', '')
         if search_query:
-            queryset = queryset.filter(pegawai__nama__icontains=search_query)
+            queryset = queryset.filter(pegawai__in=search.filter_queryset(ASN.objects.all(), search_query))
         return queryset
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['search_query'] = self.request.GET.get('search', '')
+        context['current_year'] = SisaCuti.get_current_year()
+        context['rollover_pending'] = SisaCuti.objects.filter(tahun_n__lt=context['current_year']).exists()
         return context
 
 class SisaCutiDetailView(DetailView):
     model = SisaCuti
     template_name = 'asn_app/sisa_cuti_detail.html'
     context_object_name = 'sisa_cuti'
+    queryset = planned('sisa_cuti_detail')
 
 class SisaCutiCreateView(CreateView):
     model = SisaCuti
@@ -1450,258 +961,21 @@ class SisaCutiDeleteView(DeleteView):
     context_object_name = 'sisa_cuti'
 
 def surat_cuti_export_pdf(request, pk):
-    import os
-    import base64
-    from datetime import date, timedelta
-    from weasyprint import HTML
-
-    surat_cuti = get_object_or_404(SuratCuti, pk=pk)
-
-    logger = logging.getLogger(__name__)
-    logger.info(f"Generating PDF for SuratCuti: {surat_cuti}")
-
-    # Calculate leave duration
-    try:
-        leave_days = surat_cuti.calculate_effective_leave_days()
-
-        # Define Indonesian month names
-        month_names = {
-            'January': 'Januari', 'February': 'Februari', 'March': 'Maret', 'April': 'April',
-            'May': 'Mei', 'June': 'Juni', 'July': 'Juli', 'August': 'Agustus',
-            'September': 'September', 'October': 'Oktober', 'November': 'November', 'December': 'Desember'
-        }
-
-        # Format dates with English month names first, then replace with Indonesian names
-        start_date_str = surat_cuti.tanggal_awal.strftime('%d %B %Y')
-        end_date_str = surat_cuti.tanggal_akhir.strftime('%d %B %Y')
-
-        # Replace English month names with Indonesian
-        for eng_month, indo_month in month_names.items():
-            start_date_str = start_date_str.replace(eng_month, indo_month)
-            end_date_str = end_date_str.replace(eng_month, indo_month)
-
-        # Convert number to Indonesian words
-        number_words = {
-            1: "satu", 2: "dua", 3: "tiga", 4: "empat", 5: "lima",
-            6: "enam", 7: "tujuh", 8: "delapan", 9: "sembilan", 10: "sepuluh",
-            11: "sebelas", 12: "dua belas", 13: "tiga belas", 14: "empat belas",
-            15: "lima belas", 16: "enam belas", 17: "tujuh belas", 18: "delapan belas",
-            19: "sembilan belas", 20: "dua puluh"
-        }
-
-        # For leave > 30 days, show as "3 (tiga) bulan"
-        if leave_days > 30:
-            written_number = "tiga"
-            leave_duration_text = f"selama 3 ({written_number}) bulan, terhitung mulai tanggal {start_date_str} sampai dengan tanggal {end_date_str}"
-        elif surat_cuti.tanggal_awal == surat_cuti.tanggal_akhir:
-            if leave_days in number_words:
-                written_number = number_words[leave_days]
-            else:
-                written_number = str(leave_days)
-            leave_duration_text = f"selama {leave_days} ({written_number}) hari kerja pada tanggal {start_date_str}"
-        else:
-            if leave_days in number_words:
-                written_number = number_words[leave_days]
-            else:
-                written_number = str(leave_days)
-            leave_duration_text = f"selama {leave_days} ({written_number}) hari kerja, terhitung mulai tanggal {start_date_str} sampai dengan tanggal {end_date_str}"
-        logger.info(f"Leave duration: {leave_duration_text}")
-    except Exception as e:
-        logger.error(f"Error calculating leave duration: {e}")
-        leave_duration_text = "durasi cuti tidak dapat dihitung"
-
-    # Handle kop surat
-    kop_surat_base64 = None
-    if surat_cuti.kop_surat and surat_cuti.kop_surat.gambar:
-        logger.info(f"Kop surat: {surat_cuti.kop_surat}, gambar: {surat_cuti.kop_surat.gambar}")
-        if os.path.exists(surat_cuti.kop_surat.gambar.path):
-            try:
-                with open(surat_cuti.kop_surat.gambar.path, 'rb') as image_file:
-                    image_data = image_file.read()
-                    image_format = surat_cuti.kop_surat.gambar.name.split('.')[-1].lower()
-                    if image_format == 'jpg':
-                        image_format = 'jpeg'
-                    kop_surat_base64 = f"data:image/{image_format};base64,{base64.b64encode(image_data).decode('utf-8')}"
-                    logger.info("Kop surat encoded successfully")
-            except Exception as e:
-                logger.error(f"Error encoding image to base64: {e}")
-        else:
-            logger.error("Kop surat file does not exist")
-
-    try:
-        html_string = render_to_string('asn_app/surat_cuti_pdf_template.html', {
-            'surat_cuti': surat_cuti,
-            'leave_duration_text': leave_duration_text,
-            'kop_surat_base64': kop_surat_base64,
-            'request': request,
-        })
-        logger.info("HTML template rendered successfully")
-        # Write rendered HTML to a debug file to inspect template rendering
-        try:
-            from django.conf import settings
-            debug_path = getattr(settings, 'BASE_DIR', '.')
-            debug_file = os.path.join(debug_path, f'debug_surat_cuti_{surat_cuti.pk}.html')
-            with open(debug_file, 'w', encoding='utf-8') as f:
-                f.write(html_string)
-            logger.info(f"Wrote debug HTML to {debug_file}")
-        except Exception as e:
-            logger.error(f"Error writing debug HTML file: {e}")
-    except Exception as e:
-        logger.error(f"Error rendering template: {e}")
-        return HttpResponse(f"Error rendering template: {e}", status=500)
-
-    try:
-        html = HTML(string=html_string, base_url=request.build_absolute_uri())
-        result = html.write_pdf()
-        logger.info(f"PDF generated successfully, size: {len(result)} bytes")
-    except Exception as e:
-        logger.error(f"Error writing PDF: {e}")
-        return HttpResponse(f"Error writing PDF: {e}", status=500)
-
-    # Sanitize filename to avoid issues with special characters
-    safe_name = "".join(c for c in surat_cuti.pegawai.nama if c.isalnum() or c in (' ', '-', '_')).rstrip()
-    filename = f'surat_cuti_{safe_name}.pdf'
-
-    response = HttpResponse(result, content_type='application/pdf')
-    # Explicitly delete any existing Content-Disposition header before setting our own
-    if 'Content-Disposition' in response:
-        del response['Content-Disposition']
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-
-    return response
+    return export_pdf(request, 'surat_cuti', pk)
 
 def laporan_cuti_pdf(request, pk):
-    import os
-    import base64
-    from weasyprint import HTML
-
-    asn = get_object_or_404(ASN, pk=pk)
-
-    # Get year parameters from request (supports multiple years)
-    years = request.GET.getlist('years')
-
-    # If no years selected, default to current year
-    if not years:
-        years = [str(now().year)]
-
-    # Convert to integers
-    try:
-        years = [int(y) for y in years]
-    except (ValueError, TypeError):
-        years = [now().year]
-
-    # Get all surat_cuti for selected years
-    surat_cuti_queryset = SuratCuti.objects.filter(
-        pegawai=asn,
-        tanggal_awal__year__in=years
-    ).order_by('tanggal_awal')
-
-    sisa_cuti_obj = SisaCuti.objects.filter(pegawai=asn).first()
-
-    # Initialize running balances with INITIAL allocation values (not remaining)
-    initial_sisa_tahun_n = sisa_cuti_obj.initial_tahun_n if sisa_cuti_obj else 0
-    initial_sisa_tahun_n_1 = sisa_cuti_obj.initial_tahun_n_1 if sisa_cuti_obj else 0
-    initial_sisa_tahun_n_2 = sisa_cuti_obj.initial_tahun_n_2 if sisa_cuti_obj else 0
-    initial_total_sisa_cuti = (initial_sisa_tahun_n + initial_sisa_tahun_n_1 + initial_sisa_tahun_n_2) if sisa_cuti_obj else 0
-
-    # Create a list to hold processed leave data
-    processed_surat_cuti_list = []
-
-    # Start with the initial balances for the first row's "before leave" state
-    # First row ATB should show the full initial balance (not decreased)
-    current_sisa_tahun_n_balance = initial_sisa_tahun_n
-    current_total_sisa_cuti_balance = initial_total_sisa_cuti
-
-    for idx, surat_cuti in enumerate(surat_cuti_queryset):
-        lhc = surat_cuti.calculate_effective_leave_days()
-
-        # ATB for this row:
-        # - First row: show the full initial balance (not decreased)
-        # - Subsequent rows: show the balance after previous leaves
-        if idx == 0:
-            # First row - ATB is the initial total (undecreased)
-            atb_for_row = initial_total_sisa_cuti
-        else:
-            # Subsequent rows - ATB is the running balance
-            atb_for_row = current_total_sisa_cuti_balance
-
-        # STB for this row is ATB for this row minus LHC for this row
-        stb_for_row = atb_for_row - lhc
-
-        # Update running balances for the *next* iteration
-        current_sisa_tahun_n_balance -= lhc
-        current_total_sisa_cuti_balance -= lhc
-
-        processed_surat_cuti_list.append({
-            'surat_cuti': surat_cuti,
-            'lhc': lhc,
-            'atb_for_row': atb_for_row,
-            'stb_for_row': stb_for_row,
-        })
-
-    rows_per_page = 22
-    pages = []
-    for start_index in range(0, len(processed_surat_cuti_list), rows_per_page):
-        page_rows = []
-        for row_index, item in enumerate(
-            processed_surat_cuti_list[start_index:start_index + rows_per_page],
-            start=start_index + 1,
-        ):
-            row = item.copy()
-            row['number'] = row_index
-            page_rows.append(row)
-        pages.append({'rows': page_rows})
-
-    # Default penandatangan: cari pegawai dengan jabatan Kepala (bukan Wakil Kepala)
-    penandatangan = (
-        ASN.objects.filter(jabatan__icontains="kepala")
-        .exclude(jabatan__icontains="wakil")
-        .first()
-    )
-    if not penandatangan:
-        penandatangan = ASN(nama="[Nama Kepala Sekolah]", nip="[NIP Kepala Sekolah]", pangkat="[Pangkat]", golongan="[Golongan]", jabatan="Kepala Sekolah")
-
-    html_string = render_to_string('asn_app/laporan_cuti_pdf_template.html', {
-        'asn': asn,
-        'pages': pages,
-        'processed_surat_cuti_list': processed_surat_cuti_list,
-        'sisa_cuti': sisa_cuti_obj,
-        'initial_total_sisa_cuti': initial_total_sisa_cuti,
-        'penandatangan': penandatangan,
-        'request': request,
-        'years': years,  # Pass all selected years
-    })
-
-    try:
-        html = HTML(string=html_string, base_url=request.build_absolute_uri())
-        result = html.write_pdf()
-    except Exception as e:
-        logging.error(f"Error writing Laporan Cuti PDF: {e}")
-        return HttpResponse(f"Error writing Laporan Cuti PDF: {e}", status=500)
-
-    safe_name = "".join(c for c in asn.nama if c.isalnum() or c in (' ', '-', '_')).rstrip()
-    years_str = '_'.join(str(y) for y in years)
-    filename = f'laporan_cuti_{safe_name}_{years_str}.pdf'
-
-    response = HttpResponse(result, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-
-    return response
-
+    return export_pdf(request, 'laporan_cuti', pk)
 
 # Siswa Keluar Views
 def siswa_keluar_list(request):
     """Menampilkan daftar semua siswa keluar/DO"""
     search_query = request.GET.get('q', '')
 
-    siswa_keluar_list = SiswaKeluar.objects.all().order_by('-tanggal_keluar')
+    siswa_keluar_list = planned('siswa_keluar_list').order_by('-tanggal_keluar')
 
     if search_query:
         siswa_keluar_list = siswa_keluar_list.filter(
-            Q(siswa__nama__icontains=search_query) |
-            Q(siswa__nis__icontains=search_query) |
-            Q(siswa__kelas__icontains=search_query) |
-            Q(siswa__jurusan__icontains=search_query)
+            siswa__in=search.filter_queryset(Siswa.objects.all(), search_query)
         )
 
     paginator = Paginator(siswa_keluar_list, 10)
@@ -1730,7 +1004,7 @@ def siswa_keluar_list(request):
 
 def siswa_keluar_detail(request, pk):
     """Menampilkan detail siswa keluar"""
-    siswa_keluar = get_object_or_404(SiswaKeluar, pk=pk)
+    siswa_keluar = get_object_or_404(planned('siswa_keluar_detail'), pk=pk)
     return render(request, 'asn_app/siswa_keluar_detail.html', {'siswa_keluar': siswa_keluar})
 
 def siswa_keluar_create(request):
@@ -1774,7 +1048,7 @@ def siswa_list(request):
     filter_jurusan = request.GET.get('jurusan')
 
     if query:
-        siswa_queryset = Siswa.objects.filter(nama__icontains=query).order_by('nama')
+        siswa_queryset = search.filter_queryset(Siswa.objects.all(), query).order_by('nama')
     elif filter_jurusan:
         siswa_queryset = Siswa.objects.filter(jurusan=filter_jurusan).order_by('jurusan', 'nama')
     else:
@@ -1902,15 +1176,11 @@ def siswa_kelas_promosi(request):
 
 # Surat Keterangan Views
 def surat_keterangan_list(request):
-    logger = logging.getLogger(__name__)
-    queryset = SuratKeterangan.objects.filter(pk__isnull=False).order_by('-created_at')
-    paginator = Paginator(queryset, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = paginate(request, planned('surat_keterangan_list'), keys=NEWEST_FIRST)
     return render(request, 'asn_app/surat_keterangan_list.html', {'page_obj': page_obj})
 
 def surat_keterangan_detail(request, pk):
-    surat = get_object_or_404(SuratKeterangan, pk=pk)
+    surat = get_object_or_404(planned('surat_keterangan_detail'), pk=pk)
     return render(request, 'asn_app/surat_keterangan_detail.html', {'surat': surat})
 
 def surat_keterangan_create(request):
@@ -1946,54 +1216,15 @@ def surat_keterangan_delete(request, pk):
     return render(request, 'asn_app/surat_keterangan_confirm_delete.html', {'surat': surat})
 
 def surat_keterangan_export_pdf(request, pk):
-    import os
-    import base64
-    from weasyprint import HTML
-
-    surat = get_object_or_404(SuratKeterangan, pk=pk)
-
-    kop_surat_base64 = None
-    if surat.kop_surat and surat.kop_surat.gambar:
-        if os.path.exists(surat.kop_surat.gambar.path):
-            try:
-                with open(surat.kop_surat.gambar.path, 'rb') as image_file:
-                    image_data = image_file.read()
-                    image_format = surat.kop_surat.gambar.name.split('.')[-1].lower()
-                    if image_format == 'jpg':
-                        image_format = 'jpeg'
-                    kop_surat_base64 = f"data:image/{image_format};base64,{base64.b64encode(image_data).decode('utf-8')}"
-            except Exception as e:
-                logging.error(f"Error encoding image to base64: {e}")
-
-    html_string = render_to_string('asn_app/surat_keterangan_pdf_template.html', {
-        'surat': surat,
-        'request': request,
-        'kop_surat_base64': kop_surat_base64,
-    })
-
-    try:
-        html = HTML(string=html_string, base_url=request.build_absolute_uri())
-        result = html.write_pdf()
-    except Exception as e:
-        logging.error(f"Error writing PDF: {e}")
-        return HttpResponse(f"Error writing PDF: {e}", status=500)
-
-    response = HttpResponse(result, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename=surat_keterangan_{surat.nomor_surat}.pdf'
-
-    return response
+    return export_pdf(request, 'surat_keterangan', pk)
 
 # Surat Rekomendasi Studi Lanjut Views
 def surat_rekomendasi_list(request):
-    logger = logging.getLogger(__name__)
-    queryset = SuratRekomendasiStudiLanjut.objects.filter(pk__isnull=False).order_by('-created_at')
-    paginator = Paginator(queryset, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = paginate(request, planned('surat_rekomendasi_list'), keys=NEWEST_FIRST)
     return render(request, 'asn_app/surat_rekomendasi_list.html', {'page_obj': page_obj})
 
 def surat_rekomendasi_detail(request, pk):
-    surat = get_object_or_404(SuratRekomendasiStudiLanjut, pk=pk)
+    surat = get_object_or_404(planned('surat_rekomendasi_detail'), pk=pk)
     return render(request, 'asn_app/surat_rekomendasi_detail.html', {'surat': surat})
 
 def surat_rekomendasi_create(request):
@@ -2029,50 +1260,15 @@ def surat_rekomendasi_delete(request, pk):
     return render(request, 'asn_app/surat_rekomendasi_confirm_delete.html', {'surat': surat})
 
 def surat_rekomendasi_export_pdf(request, pk):
-    import os
-    import base64
-    from weasyprint import HTML
-
-    surat = get_object_or_404(SuratRekomendasiStudiLanjut, pk=pk)
-
-    kop_surat_base64 = None
-    if surat.kop_surat and surat.kop_surat.gambar:
-        if os.path.exists(surat.kop_surat.gambar.path):
-            try:
-                with open(surat.kop_surat.gambar.path, 'rb') as image_file:
-                    image_data = image_file.read()
-                    image_format = surat.kop_surat.gambar.name.split('.')[-1].lower()
-                    if image_format == 'jpg':
-                        image_format = 'jpeg'
-                    kop_surat_base64 = f"data:image/{image_format};base64,{base64.b64encode(image_data).decode('utf-8')}"
-            except Exception as e:
-                logging.error(f"Error encoding image to base64: {e}")
-
-    html_string = render_to_string('asn_app/surat_rekomendasi_pdf_template.html', {
-        'surat': surat,
-        'request': request,
-        'kop_surat_base64': kop_surat_base64,
-    })
-
-    try:
-        html = HTML(string=html_string, base_url=request.build_absolute_uri())
-        result = html.write_pdf()
-    except Exception as e:
-        logging.error(f"Error writing PDF: {e}")
-        return HttpResponse(f"Error writing PDF: {e}", status=500)
-
-    response = HttpResponse(result, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename=surat_rekomendasi_{surat.nomor_surat}.pdf'
-
-    return response
+    return export_pdf(request, 'surat_rekomendasi', pk)
 
 # Surat KP4 Views
 def surat_kp4_list(request):
-    surat_list = SuratKP4.objects.all().order_by('-created_at')
-    return render(request, 'asn_app/surat_kp4_list.html', {'surat_list': surat_list})
+    page_obj = paginate(request, planned('surat_kp4_list'), keys=NEWEST_FIRST)
+    return render(request, 'asn_app/surat_kp4_list.html', {'surat_list': page_obj, 'page_obj': page_obj})
 
 def surat_kp4_detail(request, pk):
-    surat = get_object_or_404(SuratKP4, pk=pk)
+    surat = get_object_or_404(planned('surat_kp4_detail'), pk=pk)
     return render(request, 'asn_app/surat_kp4_detail.html', {'surat': surat})
 
 def surat_kp4_create(request):
@@ -2115,42 +1311,7 @@ def surat_kp4_delete(request, pk):
     return render(request, 'asn_app/surat_kp4_confirm_delete.html', {'surat': surat})
 
 def surat_kp4_export_pdf(request, pk):
-    import os
-    import base64
-    from weasyprint import HTML
-
-    surat = get_object_or_404(SuratKP4, pk=pk)
-
-    kop_surat_base64 = None
-    if surat.kop_surat and surat.kop_surat.gambar:
-        if os.path.exists(surat.kop_surat.gambar.path):
-            try:
-                with open(surat.kop_surat.gambar.path, 'rb') as image_file:
-                    image_data = image_file.read()
-                    image_format = surat.kop_surat.gambar.name.split('.')[-1].lower()
-                    if image_format == 'jpg':
-                        image_format = 'jpeg'
-                    kop_surat_base64 = f"data:image/{image_format};base64,{base64.b64encode(image_data).decode('utf-8')}"
-            except Exception as e:
-                logging.error(f"Error encoding image to base64: {e}")
-
-    html_string = render_to_string('asn_app/surat_kp4_pdf_template.html', {
-        'surat': surat,
-        'request': request,
-        'kop_surat_base64': kop_surat_base64,
-    })
-
-    try:
-        html = HTML(string=html_string, base_url=request.build_absolute_uri())
-        result = html.write_pdf()
-    except Exception as e:
-        logging.error(f"Error writing PDF: {e}")
-        return HttpResponse(f"Error writing PDF: {e}", status=500)
-
-    response = HttpResponse(result, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename=kp4_{surat.pk}.pdf'
-
-    return response
+    return export_pdf(request, 'surat_kp4', pk)
 
 # Surat Resmi Views
 def surat_resmi_list(request):
@@ -2190,187 +1351,39 @@ def surat_resmi_delete(request, pk):
     return render(request, 'asn_app/surat_resmi_confirm_delete.html', {'surat': surat})
 
 def surat_resmi_export_pdf(request, pk):
-    import os
-    import base64
-    from weasyprint import HTML
-
-    surat = get_object_or_404(SuratResmi, pk=pk)
-
-    kop_surat_base64 = None
-    if surat.kop_surat and surat.kop_surat.gambar:
-        if os.path.exists(surat.kop_surat.gambar.path):
-            try:
-                with open(surat.kop_surat.gambar.path, 'rb') as image_file:
-                    image_data = image_file.read()
-                    image_format = surat.kop_surat.gambar.name.split('.')[-1].lower()
-                    if image_format == 'jpg':
-                        image_format = 'jpeg'
-                    kop_surat_base64 = f"data:image/{image_format};base64,{base64.b64encode(image_data).decode('utf-8')}"
-            except Exception as e:
-                logging.error(f"Error encoding image to base64: {e}")
-
-    html_string = render_to_string('asn_app/surat_resmi_pdf_template.html', {
-        'surat': surat,
-        'request': request,
-        'kop_surat_base64': kop_surat_base64,
-    })
-
-    try:
-        html = HTML(string=html_string, base_url=request.build_absolute_uri())
-        result = html.write_pdf()
-    except Exception as e:
-        logging.error(f"Error writing PDF: {e}")
-        return HttpResponse(f"Error writing PDF: {e}", status=500)
-
-    response = HttpResponse(result, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename=surat_resmi_{surat.nomor}.pdf'
-
-    return response
+    return export_pdf(request, 'surat_resmi', pk)
 
 def export_siswa_excel(request):
     """Export all Siswa data to an Excel file."""
-    import openpyxl
-    from openpyxl.utils import get_column_letter
-
-    siswas = Siswa.objects.all()
-    workbook = openpyxl.Workbook()
-    sheet = workbook.active
-    sheet.title = 'Siswa Data'
-
-    # Write headers
-    headers = [
-        'NIS', 'Nama', 'Kelas', 'Jurusan', 'Alamat', 'No HP', 'Nama Orang Tua'
-    ]
-    for col_num, header in enumerate(headers, 1):
-        col_letter = get_column_letter(col_num)
-        sheet[f'{col_letter}1'] = header
-
-    # Write data
-    for row_num, siswa in enumerate(siswas, 2):
-        sheet[f'A{row_num}'] = siswa.nis
-        sheet[f'B{row_num}'] = siswa.nama
-        sheet[f'C{row_num}'] = siswa.kelas
-        sheet[f'D{row_num}'] = siswa.jurusan
-        sheet[f'E{row_num}'] = siswa.alamat
-        sheet[f'F{row_num}'] = siswa.no_hp
-        sheet[f'G{row_num}'] = siswa.nama_orang_tua
-
-    response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-    response['Content-Disposition'] = 'attachment; filename=siswa_data.xlsx'
-    workbook.save(response)
-    return response
+    return xlsx_response('siswa')
 
 
 def import_siswa_excel(request):
     """Import Siswa data from an Excel file."""
-    if request.method == 'POST':
-        import openpyxl
-        excel_file = request.FILES['excel_file']
-        workbook = openpyxl.load_workbook(excel_file)
-        sheet = workbook.active
-
-        for row in sheet.iter_rows(min_row=2, values_only=True):
-            (
-                nama, nis, kelas, jurusan, alamat, no_hp, nama_orang_tua
-            ) = row # Assuming these are the columns in the excel
-
-            Siswa.objects.create(
-                nama=nama,
-                nis=nis,
-                kelas=kelas,
-                jurusan=jurusan,
-                alamat=alamat,
-                no_hp=no_hp,
-                nama_orang_tua=nama_orang_tua
-            )
-        return redirect('siswa_list')
-    return render(request, 'asn_app/import_form.html')
+    return excel_import_view(request, 'siswa', 'asn_app/import_form.html', 'siswa_list', {
+        'title': 'Import Siswa from Excel',
+        'cancel_url': reverse('siswa_list'),
+    })
 
 
 def export_siswa_keluar_excel(request):
     """Export all SiswaKeluar data to an Excel file."""
-    import openpyxl
-    from openpyxl.utils import get_column_letter
-
-    siswa_keluar_list = SiswaKeluar.objects.all().order_by('-tanggal_keluar')
-    workbook = openpyxl.Workbook()
-    sheet = workbook.active
-    sheet.title = 'Siswa Keluar Data'
-
-    # Write headers
-    headers = [
-        'No', 'Nama Siswa', 'NIS', 'Kelas', 'Jurusan',
-        'Tanggal Keluar', 'Alasan Keluar', 'Tanggal Dicatat'
-    ]
-    for col_num, header in enumerate(headers, 1):
-        col_letter = get_column_letter(col_num)
-        sheet[f'{col_letter}1'] = header
-
-    # Write data
-    for row_num, siswa_keluar in enumerate(siswa_keluar_list, 2):
-        sheet[f'A{row_num}'] = row_num - 1
-        sheet[f'B{row_num}'] = siswa_keluar.siswa.nama
-        sheet[f'C{row_num}'] = siswa_keluar.siswa.nis
-        sheet[f'D{row_num}'] = siswa_keluar.siswa.kelas
-        sheet[f'E{row_num}'] = siswa_keluar.siswa.jurusan
-        sheet[f'F{row_num}'] = siswa_keluar.tanggal_keluar
-        sheet[f'G{row_num}'] = siswa_keluar.alasan_keluar
-        sheet[f'H{row_num}'] = siswa_keluar.created_at.strftime('%Y-%m-%d %H:%M:%S')
-
-    response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-    response['Content-Disposition'] = 'attachment; filename=siswa_keluar_data.xlsx'
-    workbook.save(response)
-    return response
-
+    return xlsx_response('siswa_keluar')
 
 def export_siswa_keluar_pdf(request):
     """Export all SiswaKeluar data to a PDF file."""
-    from weasyprint import HTML
-    import os
-
-    siswa_keluar_list = SiswaKeluar.objects.all().order_by('-tanggal_keluar')
-    total_siswa_keluar = siswa_keluar_list.count()
-    total_siswa = Siswa.objects.count()
-    sis_aktif = total_siswa - total_siswa_keluar
-
-    html_string = render_to_string('asn_app/siswa_keluar_pdf_template.html', {
-        'siswa_keluar_list': siswa_keluar_list,
-        'total_siswa_keluar': total_siswa_keluar,
-        'total_siswa': total_siswa,
-        'sis_aktif': sis_aktif,
-        'generated_at': now(),
-    })
-
-    # Create PDF
-    try:
-        html = HTML(string=html_string, base_url=request.build_absolute_uri())
-        result = html.write_pdf()
-    except Exception as e:
-        logging.error(f"Error writing PDF: {e}")
-        return HttpResponse(f"Error writing PDF: {e}", status=500)
+    return export_pdf(request, 'siswa_keluar')
 
-    # Create HTTP response with PDF
-    response = HttpResponse(result, content_type='application/pdf')
-    response['Content-Disposition'] = 'attachment; filename=siswa_keluar_data.pdf'
-    return response
-
-
-
-class SuratResmiListView(ListView):
+class SuratResmiListView(KeysetPaginationMixin, ListView):
     model = SuratResmi
     template_name = 'asn_app/surat_resmi_list.html'
     context_object_name = 'surat_resmi_list'
-    paginate_by = 10
 
     def get_queryset(self):
-        queryset = super().get_queryset()
+        queryset = planned('surat_resmi_list', super().get_queryset())
         query = self.request.GET.get('q')
         if query:
-            queryset = queryset.filter(
-                Q(nomor__icontains=query) |
-                Q(perihal__icontains=query) |
-                Q(pejabat_tujuan_surat__icontains=query)
-            )
+            queryset = search.filter_queryset(queryset, query)
         return queryset.order_by('-created_at')
 
 
@@ -2378,6 +1391,7 @@ class SuratResmiDetailView(DetailView):
     model = SuratResmi
     template_name = 'asn_app/surat_resmi_detail.html'
     context_object_name = 'surat_resmi'
+    queryset = planned('surat_resmi_detail')
 
 
 class SuratResmiCreateView(CreateView):
@@ -2412,20 +1426,16 @@ class SuratResmiDeleteView(DeleteView):
 
 
 # SPTJM Views
-class SPTJMListView(ListView):
+class SPTJMListView(KeysetPaginationMixin, ListView):
     model = SPTJM
     template_name = 'asn_app/sptjm_list.html'
     context_object_name = 'sptjm_list'
-    paginate_by = 10
 
     def get_queryset(self):
-        queryset = super().get_queryset()
+        queryset = planned('sptjm_list', super().get_queryset())
         query = self.request.GET.get('q')
         if query:
-            queryset = queryset.filter(
-                Q(nomor_surat__icontains=query) |
-                Q(isi_surat__icontains=query)
-            )
+            queryset = search.filter_queryset(queryset, query)
         return queryset.order_by('-created_at')
 
 
@@ -2433,6 +1443,7 @@ class SPTJMDetailView(DetailView):
     model = SPTJM
     template_name = 'asn_app/sptjm_detail.html'
     context_object_name = 'sptjm'
+    queryset = planned('sptjm_detail')
 
 
 class SPTJMCreateView(CreateView):
@@ -2467,120 +1478,20 @@ class SPTJMDeleteView(DeleteView):
 
 
 def sptjm_export_pdf(request, pk):
-    import os
-    import base64
-    import logging # Import logging
-    from weasyprint import HTML, CSS
-
-    logger = logging.getLogger(__name__) # Get logger instance
-
-    sptjm = get_object_or_404(SPTJM, pk=pk);
-
-    kop_surat_base64 = None
-    if sptjm.kop_surat and sptjm.kop_surat.gambar:
-        logger.info(f"Kop surat found: {sptjm.kop_surat.nama}, image path: {sptjm.kop_surat.gambar.path}")
-        if os.path.exists(sptjm.kop_surat.gambar.path):
-            try:
-                with open(sptjm.kop_surat.gambar.path, 'rb') as image_file:
-                    image_data = image_file.read()
-                    image_format = sptjm.kop_surat.gambar.name.split('.')[-1].lower()
-                    if image_format == 'jpg':
-                        image_format = 'jpeg'
-                    kop_surat_base64 = f"data:image/{image_format};base64,{base64.b64encode(image_data).decode('utf-8')}"
-                    logger.info("Kop surat image encoded to Base64 successfully.")
-            except Exception as e:
-                logger.error(f"Error encoding image to base64 for SPTJM PDF: {e}")
-        else:
-            logger.warning(f"Kop surat image file not found at: {sptjm.kop_surat.gambar.path}")
-    else:
-        logger.info("No kop surat or image found for this SPTJM.")
-
-    html_string = render_to_string('asn_app/sptjm_pdf_template.html', {
-        'sptjm': sptjm,
-        'kop_surat_base64': kop_surat_base64,
-    })
-
-    # Adding CSS for layout as requested
-    css_string = """
-        @page {
-            size: A4;
-            margin: 2.5cm;
-        }
-        body {
-            font-family: 'Times New Roman', serif;
-            font-size: 12pt;
-            line-height: 1.5;
-        }
-        .text-center {
-            text-align: center;
-        }
-        .text-left {
-            text-align: left;
-        }
-        .signer-section {
-            padding-left: 250pt;
-            text-align: left;
-        }
-        .signer-details {
-            margin-top: 50pt;
-        }
-        .employee-list {
-            list-style-type: decimal;
-            padding-left: 40px;
-        }
-        .details-table {
-            border-collapse: collapse;
-            width: 100%;
-        }
-        .details-table td {
-            padding: 2px 0;
-            vertical-align: top;
-        }
-        .details-table .label {
-            width: 120px;
-        }
-        .details-table .colon {
-            width: 10px;
-        }
-        /* Kop Surat specific styles - already in template, but ensuring consistency */
-        .kop-surat {
-            text-align: center;
-            margin-bottom: 20px;
-            border-bottom: 2px solid #000;
-            padding-bottom: 10px;
-        }
-        .kop-surat img {
-            max-width: 100%;
-            height: auto;
-        }
-    """
-
-    try:
-        # For Base64 images, often base_url=None works better as it prevents WeasyPrint
-        # from trying to resolve the base64 string as a relative URL.
-        html = HTML(string=html_string, base_url=None)
-        result = html.write_pdf(stylesheets=[CSS(string=css_string)])
-        logger.info("SPTJM PDF generated successfully.")
-    except Exception as e:
-        logger.error(f"Error writing SPTJM PDF: {e}", exc_info=True)
-        return HttpResponse(f"Error writing SPTJM PDF: {e}", status=500)
-
-    response = HttpResponse(result, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename=sptjm_{sptjm.nomor_surat}.pdf'
-
-    return response
+    return export_pdf(request, 'sptjm', pk)
 
 # SPMT Views
-class SPMTListView(ListView):
+class SPMTListView(KeysetPaginationMixin, ListView):
     model = SPMT
     template_name = 'asn_app/spmt_list.html'
     context_object_name = 'spmt_list'
-    paginate_by = 10
+    queryset = planned('spmt_list')
 
 class SPMTDetailView(DetailView):
     model = SPMT
     template_name = 'asn_app/spmt_detail.html'
     context_object_name = 'spmt'
+    queryset = planned('spmt_detail')
 
 class SPMTCreateView(CreateView):
     model = SPMT
@@ -2614,198 +1525,30 @@ class SPMTDeleteView(DeleteView):
     context_object_name = 'spmt'
 
 def spmt_export_pdf(request, pk):
-    import os
-    import base64
-    from weasyprint import HTML, CSS
-
-    spmt = get_object_or_404(SPMT, pk=pk)
-
-    kop_surat_base64 = None
-    if spmt.kop_surat and spmt.kop_surat.gambar:
-        if os.path.exists(spmt.kop_surat.gambar.path):
-            try:
-                with open(spmt.kop_surat.gambar.path, 'rb') as image_file:
-                    image_data = image_file.read()
-                    image_format = spmt.kop_surat.gambar.name.split('.')[-1].lower()
-                    if image_format == 'jpg':
-                        image_format = 'jpeg'
-                    kop_surat_base64 = f"data:image/{image_format};base64,{base64.b64encode(image_data).decode('utf-8')}"
-            except Exception as e:
-                logging.error(f"Error encoding image to base64: {e}")
-
-    html_string = render_to_string('asn_app/spmt_pdf_template.html', {
-        'spmt': spmt,
-        'kop_surat_base64': kop_surat_base64,
-    })
-
-    css_string = """
-        body { font-family: 'Times New Roman', serif; font-size: 12pt; }
-        .center { text-align: center; }
-        .left { text-align: left; }
-        .justify { text-align: justify; }
-        .signature { padding-left: 250pt; }
-        table { border-collapse: collapse; width: 100%; }
-        td { vertical-align: top; }
-        .label { width: 150px; }
-        .colon { width: 10px; }
-        .kop-surat img { max-width: 100%; height: auto; }
-    """
-
-    try:
-        html = HTML(string=html_string, base_url=request.build_absolute_uri())
-        result = html.write_pdf(stylesheets=[CSS(string=css_string)])
-    except Exception as e:
-        logging.error(f"Error writing PDF: {e}")
-        return HttpResponse(f"Error writing PDF: {e}", status=500)
-
-    response = HttpResponse(result, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename=SPMT_{spmt.nomor_surat}.pdf'
-
-    return response
+    return export_pdf(request, 'spmt', pk)
 
 def spmt_export_excel(request):
     """Export all SPMT data to an Excel file."""
-    import openpyxl
-    from openpyxl.utils import get_column_letter
-    from datetime import datetime
-
-    spmts = SPMT.objects.all()
-    workbook = openpyxl.Workbook()
-    sheet = workbook.active
-    sheet.title = 'SPMT Data'
-
-    # Write headers
-    headers = [
-        'Nomor Surat', 'Tempat Ditetapkan', 'Tanggal Surat',
-        'Penandatangan (Nama)', 'Penandatangan (NIP)', 'Pegawai (Nama)', 'Pegawai (NIP)',
-        'Peraturan', 'Nomor Peraturan', 'Tahun Peraturan', 'Tentang',
-        'Tanggal Terhitung Mulai', 'Sebagai', 'Tempat Tugas',
-        'Created At', 'Updated At'
-    ]
-    for col_num, header in enumerate(headers, 1):
-        col_letter = get_column_letter(col_num)
-        sheet[f'{col_letter}1'] = header
-
-    # Write data
-    for row_num, spmt in enumerate(spmts, 2):
-        penandatangan_nama = spmt.penandatangan.nama if spmt.penandatangan else ''
-        penandatangan_nip = spmt.penandatangan.nip if spmt.penandatangan else ''
-        pegawai_nama = spmt.pegawai.nama if spmt.pegawai else ''
-        pegawai_nip = spmt.pegawai.nip if spmt.pegawai else ''
-
-        sheet[f'A{row_num}'] = spmt.nomor_surat
-        sheet[f'B{row_num}'] = spmt.tempat_ditetapkan
-        sheet[f'C{row_num}'] = spmt.tanggal_surat.strftime('%Y-%m-%d') if spmt.tanggal_surat else ''
-        sheet[f'D{row_num}'] = penandatangan_nama
-        sheet[f'E{row_num}'] = penandatangan_nip
-        sheet[f'F{row_num}'] = pegawai_nama
-        sheet[f'G{row_num}'] = pegawai_nip
-        sheet[f'H{row_num}'] = spmt.peraturan
-        sheet[f'I{row_num}'] = spmt.nomor_peraturan
-        sheet[f'J{row_num}'] = spmt.tahun_peraturan
-        sheet[f'K{row_num}'] = spmt.tentang
-        sheet[f'L{row_num}'] = spmt.tanggal_terhitung.strftime('%Y-%m-%d') if spmt.tanggal_terhitung else ''
-        sheet[f'M{row_num}'] = spmt.sebagai
-        sheet[f'N{row_num}'] = spmt.tempat_tugas
-        sheet[f'O{row_num}'] = spmt.created_at.strftime('%Y-%m-%d %H:%M:%S') if spmt.created_at else ''
-        sheet[f'P{row_num}'] = spmt.updated_at.strftime('%Y-%m-%d %H:%M:%S') if spmt.updated_at else ''
-
-    response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-    response['Content-Disposition'] = 'attachment; filename=spmt_data.xlsx'
-    workbook.save(response)
-    return response
+    return xlsx_response('spmt')
 
 
 def spmt_import_excel(request):
     """Import SPMT data from an Excel file."""
-    if request.method == 'POST':
-        import openpyxl
-        from datetime import datetime
-
-        excel_file = request.FILES['excel_file']
-        workbook = openpyxl.load_workbook(excel_file)
-        sheet = workbook.active
-
-        success_count = 0
-        error_count = 0
-
-        for row in sheet.iter_rows(min_row=2, values_only=True):
-            try:
-                (
-                    nomor_surat, tempat_ditetapkan, tanggal_surat_val,
-                    penandatangan_nama, penandatangan_nip, pegawai_nama, pegawai_nip,
-                    peraturan, nomor_peraturan, tahun_peraturan, tentang,
-                    tanggal_terhitung_val, sebagai, tempat_tugas
-                ) = row
-
-                # Handle date conversion
-                tanggal_surat = None
-                if isinstance(tanggal_surat_val, datetime):
-                    tanggal_surat = tanggal_surat_val.date()
-                elif isinstance(tanggal_surat_val, str):
-                    try:
-                        tanggal_surat = datetime.strptime(tanggal_surat_val, '%Y-%m-%d').date()
-                    except ValueError:
-                        pass
-
-                tanggal_terhitung = None
-                if isinstance(tanggal_terhitung_val, datetime):
-                    tanggal_terhitung = tanggal_terhitung_val.date()
-                elif isinstance(tanggal_terhitung_val, str):
-                    try:
-                        tanggal_terhitung = datetime.strptime(tanggal_terhitung_val, '%Y-%m-%d').date()
-                    except ValueError:
-                        pass
-
-                # Find penandatangan and pegawai by name (or NIP if available)
-                penandatangan = None
-                if penandatangan_nama:
-                    penandatangan = ASN.objects.filter(nama=penandatangan_nama).first()
-                    if not penandatangan and penandatangan_nip:
-                        penandatangan = ASN.objects.filter(nip=penandatangan_nip).first()
-
-                pegawai = None
-                if pegawai_nama:
-                    pegawai = ASN.objects.filter(nama=pegawai_nama).first()
-                    if not pegawai and pegawai_nip:
-                        pegawai = ASN.objects.filter(nip=pegawai_nip).first()
-
-                SPMT.objects.create(
-                    nomor_surat=nomor_surat,
-                    tempat_ditetapkan=tempat_ditetapkan,
-                    tanggal_surat=tanggal_surat,
-                    penandatangan=penandatangan,
-                    pegawai=pegawai,
-                    peraturan=peraturan,
-                    nomor_peraturan=nomor_peraturan,
-                    tahun_peraturan=str(tahun_peraturan) if tahun_peraturan else '',
-                    tentang=tentang,
-                    tanggal_terhitung=tanggal_terhitung,
-                    sebagai=sebagai,
-                    tempat_tugas=tempat_tugas
-                )
-                success_count += 1
-            except Exception as e:
-                logging.error(f"Error importing SPMT row: {e}")
-                error_count += 1
-
-        messages.success(request, f'Successfully imported {success_count} SPMT records. {error_count} errors.')
-        return redirect('spmt_list')
-
-    return render(request, 'asn_app/spmt_import_form.html')
+    return excel_import_view(request, 'spmt', 'asn_app/spmt_import_form.html', 'spmt_list')
 
 
 # Surat Umum Views
-class SuratUmumListView(ListView):
+class SuratUmumListView(KeysetPaginationMixin, ListView):
     model = SuratUmum
     template_name = 'asn_app/surat_umum_list.html'
     context_object_name = 'surat_umum_list'
-    paginate_by = 10
+    queryset = planned('surat_umum_list')
 
 class SuratUmumDetailView(DetailView):
     model = SuratUmum
     template_name = 'asn_app/surat_umum_detail.html'
     context_object_name = 'surat'
+    queryset = planned('surat_umum_detail')
 
 class SuratUmumCreateView(CreateView):
     model = SuratUmum
@@ -2839,60 +1582,17 @@ class SuratUmumDeleteView(DeleteView):
     context_object_name = 'surat'
 
 def surat_umum_export_pdf(request, pk):
-    import os
-    import base64
-    from weasyprint import HTML, CSS
-
-    surat = get_object_or_404(SuratUmum, pk=pk)
-
-    kop_surat_base64 = None
-    if surat.kop_surat and surat.kop_surat.gambar:
-        if os.path.exists(surat.kop_surat.gambar.path):
-            try:
-                with open(surat.kop_surat.gambar.path, 'rb') as image_file:
-                    image_data = image_file.read()
-                    image_format = surat.kop_surat.gambar.name.split('.')[-1].lower()
-                    if image_format == 'jpg':
-                        image_format = 'jpeg'
-                    kop_surat_base64 = f"data:image/{image_format};base64,{base64.b64encode(image_data).decode('utf-8')}"
-            except Exception as e:
-                logging.error(f"Error encoding image to base64: {e}")
-
-    html_string = render_to_string('asn_app/surat_umum_pdf_template.html', {
-        'surat': surat,
-        'kop_surat_base64': kop_surat_base64,
-    })
-
-    css_string = """
-        body { font-family: 'Times New Roman', serif; font-size: 12pt; }
-        .center { text-align: center; }
-        .left { text-align: left; }
-        .justify { text-align: justify; }
-        .signature { padding-left: 250pt; }
-    """
-
-    try:
-        html = HTML(string=html_string, base_url=request.build_absolute_uri())
-        result = html.write_pdf(stylesheets=[CSS(string=css_string)])
-    except Exception as e:
-        logging.error(f"Error writing PDF: {e}")
-        return HttpResponse(f"Error writing PDF: {e}", status=500)
-
-    response = HttpResponse(result, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename=surat_umum_{surat.pk}.pdf'
-
-    return response
-
+    return export_pdf(request, 'surat_umum', pk)
 
 # Surat Panggilan Siswa Views
 def surat_panggilan_siswa_list(request):
     """Menampilkan daftar semua Surat Panggilan Siswa"""
-    surat_list = SuratPanggilanSiswa.objects.all().order_by('-created_at')
-    return render(request, 'asn_app/surat_panggilan_siswa_list.html', {'surat_list': surat_list})
+    page_obj = paginate(request, planned('surat_panggilan_siswa_list'), keys=NEWEST_FIRST)
+    return render(request, 'asn_app/surat_panggilan_siswa_list.html', {'surat_list': page_obj, 'page_obj': page_obj})
 
 def surat_panggilan_siswa_detail(request, pk):
     """Menampilkan detail Surat Panggilan Siswa"""
-    surat = get_object_or_404(SuratPanggilanSiswa, pk=pk)
+    surat = get_object_or_404(planned('surat_panggilan_siswa_detail'), pk=pk)
     return render(request, 'asn_app/surat_panggilan_siswa_detail.html', {'surat': surat})
 
 def surat_panggilan_siswa_create(request):
@@ -2928,60 +1628,16 @@ def surat_panggilan_siswa_delete(request, pk):
 
 def surat_panggilan_siswa_export_pdf(request, pk):
     """Export Surat Panggilan Siswa ke PDF"""
-    import os
-    import base64
-    from weasyprint import HTML, CSS
-
-    surat = get_object_or_404(SuratPanggilanSiswa, pk=pk)
-
-    kop_surat_base64 = None
-    if surat.kop_surat and surat.kop_surat.gambar:
-        if os.path.exists(surat.kop_surat.gambar.path):
-            try:
-                with open(surat.kop_surat.gambar.path, 'rb') as image_file:
-                    image_data = image_file.read()
-                    image_format = surat.kop_surat.gambar.name.split('.')[-1].lower()
-                    if image_format == 'jpg':
-                        image_format = 'jpeg'
-                    kop_surat_base64 = f"data:image/{image_format};base64,{base64.b64encode(image_data).decode('utf-8')}"
-            except Exception as e:
-                logging.error(f"Error encoding image to base64: {e}")
-
-    html_string = render_to_string('asn_app/surat_panggilan_siswa_pdf_template.html', {
-        'surat': surat,
-        'kop_surat_base64': kop_surat_base64,
-        'request': request,
-    })
-
-    css_string = """
-        body { font-family: 'Times New Roman', serif; font-size: 12pt; }
-        .center { text-align: center; }
-        .left { text-align: left; }
-        .justify { text-align: justify; }
-        .signature { padding-left: 250pt; }
-    """
-
-    try:
-        html = HTML(string=html_string, base_url=request.build_absolute_uri())
-        result = html.write_pdf(stylesheets=[CSS(string=css_string)])
-    except Exception as e:
-        logging.error(f"Error writing PDF: {e}")
-        return HttpResponse(f"Error writing PDF: {e}", status=500)
-
-    response = HttpResponse(result, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename=surat_panggilan_{surat.siswa.nama}_{surat.nomor_surat}.pdf'
-
-    return response
-
+    return export_pdf(request, 'surat_panggilan_siswa', pk)
 
 def surat_undangan_list(request):
     """Menampilkan daftar semua Surat Undangan"""
-    surat_list = SuratUndangan.objects.all().order_by('-created_at')
-    return render(request, 'asn_app/surat_undangan_list.html', {'surat_list': surat_list})
+    page_obj = paginate(request, planned('surat_undangan_list'), keys=NEWEST_FIRST)
+    return render(request, 'asn_app/surat_undangan_list.html', {'surat_list': page_obj, 'page_obj': page_obj})
 
 def surat_undangan_detail(request, pk):
     """Menampilkan detail Surat Undangan"""
-    surat = get_object_or_404(SuratUndangan, pk=pk)
+    surat = get_object_or_404(planned('surat_undangan_detail'), pk=pk)
     return render(request, 'asn_app/surat_undangan_detail.html', {'surat': surat})
 
 def surat_undangan_create(request):
@@ -3017,63 +1673,18 @@ def surat_undangan_delete(request, pk):
 
 def surat_undangan_export_pdf(request, pk):
     """Export Surat Undangan ke PDF"""
-    import os
-    import base64
-    from weasyprint import HTML, CSS
-
-    surat = get_object_or_404(SuratUndangan, pk=pk)
-
-    kop_surat_base64 = None
-    if surat.kop_surat and surat.kop_surat.gambar:
-        if os.path.exists(surat.kop_surat.gambar.path):
-            try:
-                with open(surat.kop_surat.gambar.path, 'rb') as image_file:
-                    image_data = image_file.read()
-                    image_format = surat.kop_surat.gambar.name.split('.')[-1].lower()
-                    if image_format == 'jpg':
-                        image_format = 'jpeg'
-                    kop_surat_base64 = f"data:image/{image_format};base64,{base64.b64encode(image_data).decode('utf-8')}"
-            except Exception as e:
-                logging.error(f"Error encoding image to base64: {e}")
-
-    html_string = render_to_string('asn_app/surat_undangan_pdf_template.html', {
-        'surat': surat,
-        'kop_surat_base64': kop_surat_base64,
-        'request': request,
-    })
-
-    css_string = """
-        body { font-family: 'Times New Roman', serif; font-size: 12pt; }
-        .center { text-align: center; }
-        .left { text-align: left; }
-        .justify { text-align: justify; }
-        .signature { padding-left: 250pt; }
-    """
-
-    try:
-        html = HTML(string=html_string, base_url=request.build_absolute_uri())
-        result = html.write_pdf(stylesheets=[CSS(string=css_string)])
-    except Exception as e:
-        logging.error(f"Error writing PDF: {e}")
-        return HttpResponse(f"Error writing PDF: {e}", status=500)
-
-    response = HttpResponse(result, content_type='application/pdf')
-    siswa_nama = surat.siswa.nama if surat.siswa else ''
-    response['Content-Disposition'] = f'attachment; filename=surat_undangan_{siswa_nama}_{surat.nomor_surat}.pdf'
-
-    return response
-
+    return export_pdf(request, 'surat_undangan', pk)
 
 # Surat Dispensasi Views
 def surat_dispensasi_list(request):
     """Menampilkan daftar semua Surat Dispensasi"""
-    surat_list = SuratDispensasi.objects.all().order_by('-created_at')
-    return render(request, 'asn_app/surat_dispensasi_list.html', {'surat_list': surat_list})
+    page_obj = paginate(request, planned('surat_dispensasi_list'), keys=NEWEST_FIRST)
+    return render(request, 'asn_app/surat_dispensasi_list.html', {'surat_list': page_obj, 'page_obj': page_obj})
 
 
 def surat_dispensasi_detail(request, pk):
     """Menampilkan detail Surat Dispensasi"""
-    surat = get_object_or_404(SuratDispensasi, pk=pk)
+    surat = get_object_or_404(planned('surat_dispensasi_detail'), pk=pk)
     return render(request, 'asn_app/surat_dispensasi_detail.html', {'surat': surat})
 
 
@@ -3127,54 +1738,15 @@ def surat_dispensasi_delete(request, pk):
 
 def surat_dispensasi_export_pdf(request, pk):
     """Export Surat Dispensasi ke PDF"""
-    import os
-    import base64
-    from weasyprint import HTML
-
-    surat = get_object_or_404(SuratDispensasi, pk=pk)
-
-    kop_surat_base64 = None
-    if surat.kop_surat and surat.kop_surat.gambar:
-        if os.path.exists(surat.kop_surat.gambar.path):
-            try:
-                with open(surat.kop_surat.gambar.path, 'rb') as image_file:
-                    image_data = image_file.read()
-                    image_format = surat.kop_surat.gambar.name.split('.')[-1].lower()
-                    if image_format == 'jpg':
-                        image_format = 'jpeg'
-                    kop_surat_base64 = f"data:image/{image_format};base64,{base64.b64encode(image_data).decode('utf-8')}"
-            except Exception as e:
-                logging.error(f"Error encoding image to base64: {e}")
-
-    html_string = render_to_string('asn_app/surat_dispensasi_pdf_template.html', {
-        'surat': surat,
-        'kop_surat_base64': kop_surat_base64,
-        'request': request,
-    })
-
-    try:
-        html = HTML(string=html_string, base_url=request.build_absolute_uri())
-        result = html.write_pdf()
-    except Exception as e:
-        logging.error(f"Error writing PDF: {e}")
-        return HttpResponse(f"Error writing PDF: {e}", status=500)
-
-    response = HttpResponse(result, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename=surat_dispensasi_{surat.nomor_surat}.pdf'
-
-    return response
-
+    return export_pdf(request, 'surat_dispensasi', pk)
 
 # Surat Pengantar Views
 def surat_pengantar_list(request):
-    queryset = SuratPengantar.objects.filter(pk__isnull=False).order_by('-created_at')
-    paginator = Paginator(queryset, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = paginate(request, SuratPengantar.objects.all(), keys=NEWEST_FIRST)
     return render(request, 'asn_app/surat_pengantar_list.html', {'page_obj': page_obj})
 
 def surat_pengantar_detail(request, pk):
-    surat = get_object_or_404(SuratPengantar, pk=pk)
+    surat = get_object_or_404(planned('surat_pengantar_detail'), pk=pk)
     return render(request, 'asn_app/surat_pengantar_detail.html', {'surat': surat})
 
 def surat_pengantar_create(request):
@@ -3206,39 +1778,181 @@ def surat_pengantar_delete(request, pk):
     return render(request, 'asn_app/surat_pengantar_confirm_delete.html', {'surat': surat})
 
 def surat_pengantar_export_pdf(request, pk):
-    import os
-    import base64
-    from weasyprint import HTML
+    return export_pdf(request, 'surat_pengantar', pk)
+
+
+# Pencarian global
+def global_search(request):
+    """Cari ASN, Siswa dan surat sekaligus; ``?format=json`` untuk hasil JSON"""
+    query = request.GET.get('q', '').strip()
+    kinds = [kind for kind in request.GET.getlist('kind') if kind in search.SOURCES]
+    hits = search.search(query, kinds=kinds or None, limit=50) if query else []
+    if request.GET.get('format') == 'json':
+        return JsonResponse({'query': query, 'results': [hit.as_dict() for hit in hits]})
+    return render(request, 'asn_app/search.html', {
+        'query': query,
+        'kinds': kinds,
+        'sources': search.SOURCES.values(),
+        'hits': hits,
+    })
 
-    surat = get_object_or_404(SuratPengantar, pk=pk)
 
-    kop_surat_base64 = None
-    if surat.kop_surat and surat.kop_surat.gambar:
-        if os.path.exists(surat.kop_surat.gambar.path):
-            try:
-                with open(surat.kop_surat.gambar.path, 'rb') as image_file:
-                    image_data = image_file.read()
-                    image_format = surat.kop_surat.gambar.name.split('.')[-1].lower()
-                    if image_format == 'jpg':
-                        image_format = 'jpeg'
-                    kop_surat_base64 = f"data:image/{image_format};base64,{base64.b64encode(image_data).decode('utf-8')}"
-            except Exception as e:
-                logging.error(f"Error encoding image to base64: {e}")
-
-    html_string = render_to_string('asn_app/surat_pengantar_pdf_template.html', {
-        'surat': surat,
-        'kop_surat_base64': kop_surat_base64,
-        'request': request,
+# Autocomplete pilihan ASN/Siswa di form
+def autocomplete(request, name):
+    """Satu halaman pilihan autocomplete ``name`` (``?q=``, ``?page=``) dalam JSON"""
+    try:
+        source = get_autocomplete_source(name)
+    except LookupError:
+        raise Http404(f'Autocomplete {name} tidak ditemukan')
+    results, more = source.page(request.GET)
+    return JsonResponse({'results': results, 'more': more})
+
+
+# Metrik waktu per halaman (lihat asn_app/metrics.py)
+def _metrics_token_ok(request):
+    token = getattr(settings, 'REQUEST_METRICS_TOKEN', None)
+    return bool(token) and request.headers.get('Authorization') == f'Bearer {token}'
+
+
+def request_metrics(request):
+    """Dashboard metrik (staff); ``?format=json`` / ``?format=prometheus`` untuk scrape"""
+    if not (request.user.is_staff or _metrics_token_ok(request)):
+        return redirect_to_login(request.get_full_path(), reverse('admin:login'))
+    if request.method == 'POST':
+        metrics.registry.reset()
+        messages.success(request, 'Metrik berhasil direset.')
+        return redirect('request_metrics')
+
+    snapshot = metrics.registry.snapshot()
+    fmt = request.GET.get('format')
+    if fmt == 'json':
+        return JsonResponse({'started': metrics.registry.started, 'routes': snapshot})
+    if fmt == 'prometheus':
+        return HttpResponse(metrics.prometheus_text(snapshot), content_type='text/plain; version=0.0.4; charset=utf-8')
+    return render(request, 'asn_app/metrics.html', {
+        'routes': snapshot,
+        'started': datetime.fromtimestamp(metrics.registry.started),
+        'profiles': metrics.list_profiles(),
+        'profile_rate': metrics.get_profile_rate(),
+        'profile_threshold_ms': metrics.get_profile_threshold_ms(),
     })
 
+
+@staff_member_required
+def request_metrics_profile(request, filename):
+    """Download file cProfile (``.prof``) hasil sampling"""
+    path = metrics.profile_path(filename)
+    if path is None:
+        raise Http404('Profil tidak ditemukan')
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename=filename)
+
+
+# PDF Job (render di background)
+def pdf_job_status(request, pk):
+    """Status job PDF; jika sudah selesai langsung mengirim file PDF-nya"""
+    job = get_object_or_404(PdfJob, pk=pk)
+    if job.status == PdfJob.STATUS_DONE and job.file and request.GET.get('format') != 'json':
+        return FileResponse(job.file.open('rb'), as_attachment=True, filename=job.filename,
+                            content_type='application/pdf')
+    if job.status == PdfJob.STATUS_FAILED:
+        return job_response(request, job, status=500)
+    if job.status in (PdfJob.STATUS_PENDING, PdfJob.STATUS_RUNNING):
+        return job_response(request, job, status=202)
+    return job_response(request, job)
+
+
+# Cetak massal (ZIP / PDF gabungan) dari daftar surat
+BULK_EXPORT_LIST_VIEWS = {
+    # Dokumen yang daftarnya punya filter: pakai queryset dari ListView-nya
+    'surat_cuti': SuratCutiListView,
+    'sptjm': SPTJMListView,
+    'spmt': SPMTListView,
+}
+
+
+def _bulk_export_queryset(request, document):
+    list_view = BULK_EXPORT_LIST_VIEWS.get(document.name)
+    if list_view is not None:
+        view = list_view()
+        view.setup(request)
+        queryset = view.get_queryset()
+    else:
+        queryset = document.get_queryset()
+
+    ids = request.GET.get('ids')
+    if ids:
+        queryset = queryset.filter(pk__in=[int(pk) for pk in ids.split(',') if pk.strip().isdigit()])
+    if not queryset.ordered:
+        queryset = queryset.order_by('-pk')
+    return queryset
+
+
+def bulk_export_pdf(request, name):
+    """Cetak semua surat pada daftar (sesuai filter) sebagai ZIP atau satu PDF"""
+    from .pdf import get_document
+    from .pdf_bulk import export_merged, export_zip, get_max_documents
+
+    try:
+        document = get_document(name)
+    except LookupError:
+        raise Http404(f"Jenis dokumen tidak dikenal: {name}")
+    if document.model is None and document.queryset is None:
+        raise Http404("Dokumen ini tidak bisa dicetak massal")
+
+    pks = list(_bulk_export_queryset(request, document).values_list('pk', flat=True)[:get_max_documents() + 1])
+    if not pks:
+        messages.warning(request, 'Tidak ada surat untuk dicetak.')
+        return redirect(request.META.get('HTTP_REFERER') or 'asn_list')
+    if len(pks) > get_max_documents():
+        messages.error(request, f'Terlalu banyak surat ({len(pks)}+). Maksimal {get_max_documents()} surat sekali cetak, persempit filter.')
+        return redirect(request.META.get('HTTP_REFERER') or 'asn_list')
+
+    merged = request.GET.get('format') == 'pdf'
     try:
-        html = HTML(string=html_string, base_url=request.build_absolute_uri())
-        result = html.write_pdf()
+        if merged:
+            result, filename = export_merged(request, document, pks)
+        else:
+            result, filename = export_zip(request, document, pks)
     except Exception as e:
-        logging.error(f"Error writing PDF: {e}")
+        logging.error(f"Error writing bulk PDF {name}: {e}", exc_info=True)
         return HttpResponse(f"Error writing PDF: {e}", status=500)
+    if result is None:
+        # Semua surat terpilih sudah dihapus sebelum sempat dicetak
+        messages.warning(request, 'Tidak ada surat untuk dicetak.')
+        return redirect(request.META.get('HTTP_REFERER') or 'asn_list')
+    if merged:
+        response = HttpResponse(result, content_type='application/pdf')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+    return FileResponse(result, as_attachment=True, filename=filename, content_type='application/zip')
+
+
+def data_export(request, name, fmt):
+    """
+    Export data mentah untuk sinkronisasi (CSV, Parquet atau XLSX).
+    ``?updated_since=`` (tanggal atau tanggal-waktu ISO) membatasi ke baris
+    yang berubah sejak waktu tersebut.
+    """
+    if fmt not in DATA_FORMATS:
+        raise Http404("Format export tidak dikenal")
+
+    updated_since = None
+    value = request.GET.get('updated_since')
+    if value:
+        updated_since = parse_datetime(value)
+        if updated_since is None:
+            since_date = parse_date(value)
+            if since_date is not None:
+                updated_since = datetime.combine(since_date, datetime.min.time())
+        if updated_since is None:
+            return HttpResponse("Invalid updated_since, use YYYY-MM-DD or ISO 8601 datetime", status=400)
+        if settings.USE_TZ and timezone.is_naive(updated_since):
+            updated_since = timezone.make_aware(updated_since)
+        elif not settings.USE_TZ and timezone.is_aware(updated_since):
+            updated_since = timezone.make_naive(updated_since)
 
-    response = HttpResponse(result, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename=surat_pengantar_{surat.nomor_surat}.pdf'
+    try:
+        return data_export_response(name, fmt, updated_since)
+    except LookupError:
+        raise Http404("Jenis export tidak dikenal")
 
-    return response
@@ -0,0 +1,74 @@
+# asn_app/widgets.py
+"""
+Widget select yang opsinya dimuat lewat autocomplete (``asn_app/autocomplete.py``).
+
+Yang dirender hanya opsi kosong dan nilai terpilih; pencarian dan halaman
+berikutnya diambil oleh ``static/asn_app/js/autocomplete.js`` dari endpoint
+JSON. Untuk ``ModelChoiceField`` label opsi terpilih tetap memakai
+``label_from_instance`` dan queryset field (validasi tidak berubah).
+"""
+from django import forms
+from django.forms.models import ModelChoiceIterator
+from django.urls import reverse
+
+from .autocomplete import get_source, source_for_model
+
+
+class AutocompleteSelect(forms.Select):
+    def __init__(self, source, attrs=None, forward=None):
+        super().__init__(attrs)
+        self.source = source
+        # {parameter GET: selector CSS elemen yang nilainya ikut dikirim}
+        self.forward = forward or {}
+
+    def build_attrs(self, base_attrs, extra_attrs=None):
+        attrs = super().build_attrs(base_attrs, extra_attrs)
+        attrs['data-autocomplete-url'] = reverse('autocomplete', kwargs={'name': self.source})
+        for param, selector in self.forward.items():
+            attrs[f'data-autocomplete-forward-{param}'] = selector
+        return attrs
+
+    def optgroups(self, name, value, attrs=None):
+        values = [str(v) for v in value if v not in (None, '')]
+        source = get_source(self.source)
+        options = []
+        if isinstance(self.choices, ModelChoiceIterator):
+            field = self.choices.field
+            empty_label = field.empty_label
+            selected = source.selected(values, field.queryset, field.label_from_instance)
+        else:
+            empty_label = '---------'
+            selected = source.selected(values)
+        if not self.allow_multiple_selected and empty_label is not None:
+            options.append(self.create_option(name, '', empty_label, not selected, 0))
+        for index, (option_value, label) in enumerate(selected, start=len(options)):
+            options.append(self.create_option(name, option_value, label, True, index))
+        return [(None, options, 0)]
+
+
+class AutocompleteSelectMultiple(AutocompleteSelect, forms.SelectMultiple):
+    allow_multiple_selected = True
+
+
+class AutocompleteFormMixin:
+    """
+    Semua field pilihan ASN/Siswa di form memakai widget autocomplete, tanpa
+    mengubah label, queryset, atau atribut widget yang sudah diatur form.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for field in self.fields.values():
+            queryset = getattr(field, 'queryset', None)
+            source = source_for_model(queryset.model) if queryset is not None else None
+            if source is None or isinstance(field.widget, AutocompleteSelect):
+                continue
+            multiple = isinstance(field, forms.ModelMultipleChoiceField)
+            attrs = dict(field.widget.attrs)
+            if multiple:
+                # Sebelumnya daftar checkbox
+                attrs['class'] = 'form-control'
+            widget = (AutocompleteSelectMultiple if multiple else AutocompleteSelect)(source.name, attrs=attrs)
+            widget.is_required = field.required
+            widget.choices = field.choices
+            field.widget = widget
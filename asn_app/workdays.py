@@ -0,0 +1,100 @@
+# asn_app/workdays.py
+"""
+Penghitung hari kerja (Senin-Jumat, di luar HariLibur).
+
+Kalender hari libur dimuat sekali ke memori sebagai daftar ordinal tanggal
+yang terurut. Jumlah hari kerja dalam satu rentang dihitung tanpa loop per
+hari: jumlah hari Senin-Jumat dengan aritmetika minggu, dikurangi jumlah
+hari libur di rentang tersebut lewat ``bisect``.
+
+Cache dikosongkan lewat signal HariLibur (lihat ``asn_app/signals.py``).
+Proses lain (worker PDF, beberapa worker web) memeriksa perubahan tabel
+paling sering tiap ``WORKDAYS_CHECK_INTERVAL`` detik.
+"""
+import time
+from bisect import bisect_left, bisect_right
+
+from django.conf import settings
+from django.db.models import Count, Max
+
+_calendar = None
+
+
+class HolidayCalendar:
+    """Hari libur yang jatuh pada Senin-Jumat, sebagai ordinal terurut."""
+
+    def __init__(self, holidays, stamp=None):
+        self.ordinals = sorted({d.toordinal() for d in holidays if d.weekday() < 5})
+        self.stamp = stamp
+        self.checked_at = time.monotonic()
+
+    @staticmethod
+    def count_weekdays(start, end):
+        """Jumlah hari Senin-Jumat dalam [start, end], O(1)."""
+        days = end.toordinal() - start.toordinal() + 1
+        if days <= 0:
+            return 0
+        full_weeks, rest = divmod(days, 7)
+        first = start.weekday()
+        # Sisa hari (< 7) setelah minggu penuh dimulai dari hari yang sama dengan start
+        extra = sum(1 for i in range(rest) if (first + i) % 7 < 5)
+        return full_weeks * 5 + extra
+
+    def count_holidays(self, start, end):
+        """Jumlah hari libur kerja dalam [start, end], O(log n)."""
+        return bisect_right(self.ordinals, end.toordinal()) - bisect_left(self.ordinals, start.toordinal())
+
+    def is_working_day(self, day):
+        return day.weekday() < 5 and self.count_holidays(day, day) == 0
+
+    def working_days(self, start, end):
+        if not start or not end or end < start:
+            return 0
+        return self.count_weekdays(start, end) - self.count_holidays(start, end)
+
+    def working_days_batch(self, ranges):
+        """Jumlah hari kerja untuk banyak rentang ``(start, end)`` sekaligus."""
+        return [self.working_days(start, end) for start, end in ranges]
+
+
+def _table_stamp():
+    from .models import HariLibur
+    stats = HariLibur.objects.aggregate(count=Count('id'), updated=Max('updated_at'))
+    return (stats['count'], stats['updated'])
+
+
+def _load():
+    from .models import HariLibur
+    stamp = _table_stamp()
+    return HolidayCalendar(HariLibur.objects.values_list('tanggal', flat=True), stamp)
+
+
+def get_calendar():
+    """Kalender hari libur yang sedang berlaku (dimuat sekali, lalu di-cache)."""
+    global _calendar
+    if _calendar is None:
+        _calendar = _load()
+        return _calendar
+
+    interval = getattr(settings, 'WORKDAYS_CHECK_INTERVAL', 60)
+    if time.monotonic() - _calendar.checked_at > interval:
+        if _table_stamp() != _calendar.stamp:
+            _calendar = _load()
+        else:
+            _calendar.checked_at = time.monotonic()
+    return _calendar
+
+
+def invalidate():
+    """Buang kalender yang di-cache; dimuat ulang saat dipakai berikutnya."""
+    global _calendar
+    _calendar = None
+
+
+def working_days(start, end):
+    """Jumlah hari kerja efektif dari ``start`` sampai ``end`` (inklusif)."""
+    return get_calendar().working_days(start, end)
+
+
+def working_days_batch(ranges):
+    return get_calendar().working_days_batch(ranges)
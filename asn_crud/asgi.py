@@ -3,4 +3,8 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'asn_crud.settings')
-application = get_asgi_application()
\ No newline at end of file
+application = get_asgi_application()
+# Muat font dan stylesheet WeasyPrint sebelum worker menerima request
+from asn_app.pdf_styles import warm_up_on_start  # noqa: E402
+
+warm_up_on_start()
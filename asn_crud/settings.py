@@ -30,6 +30,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'asn_app.metrics.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',
@@ -46,7 +47,6 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -54,10 +54,48 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # Sama dengan default Django 4.2 bila 'loaders' tidak diisi (cached loader
+            # juga saat DEBUG, dikosongkan autoreload ketika template berubah); ditulis
+            # eksplisit supaya terlihat dan bisa diubah di satu tempat
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
         },
     },
 ]
 
+# Cache:
+# - default: data kecil, per proses
+# - upload_progress: progres upload foto (asn_app/foto_upload.py); file-based karena
+#   polling progres bisa ditangani proses server lain
+# - template_fragments: {% cache %} di template PDF (kunci memakai updated_at, lihat
+#   templatetags/fragment_tags.py), aktif jika TEMPLATE_FRAGMENT_CACHE_ENABLED.
+#   Kunci fragmen tidak ikut berubah saat file template diedit: matikan selama
+#   mengubah template PDF, atau restart server.
+TEMPLATE_FRAGMENT_CACHE_ENABLED = True
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'asn-default',
+    },
+    'upload_progress': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache', 'upload_progress'),
+    },
+    'template_fragments': {
+        'BACKEND': (
+            'django.core.cache.backends.locmem.LocMemCache' if TEMPLATE_FRAGMENT_CACHE_ENABLED
+            else 'django.core.cache.backends.dummy.DummyCache'
+        ),
+        'LOCATION': 'asn-template-fragments',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+}
+
 WSGI_APPLICATION = 'asn_crud.wsgi.application'
 
 DATABASES = {
@@ -75,6 +113,33 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Cache PDF hasil render (lihat asn_app/pdf_cache.py)
+PDF_CACHE_ENABLED = True
+PDF_CACHE_DIR = os.path.join(MEDIA_ROOT, 'pdf_cache')
+PDF_CACHE_MAX_BYTES = 200 * 1024 * 1024  # 200 MB, entri terlama dihapus lebih dulu
+
+# Cache gambar WeasyPrint di memori per proses (lihat asn_app/pdf_assets.py)
+PDF_IMAGE_CACHE_MAX_BYTES = 100 * 1024 * 1024  # dikosongkan jika lebih dari ini
+
+# Muat font dan stylesheet WeasyPrint saat proses web/worker PDF mulai (lihat asn_app/pdf_styles.py)
+PDF_WARM_UP_ON_START = True
+
+# Cetak massal (lihat asn_app/pdf_bulk.py): proses per request ZIP; None = jumlah CPU
+PDF_BULK_PROCESSES = None
+PDF_BULK_MAX_DOCUMENTS = 300
+
+# Thread untuk upload foto kegiatan massal (lihat asn_app/parallel.py); None = jumlah CPU (maks. 8)
+FOTO_UPLOAD_WORKERS = None
+
+# Metrik waktu per halaman (lihat asn_app/metrics.py), dashboard di /asn/metrics/
+REQUEST_METRICS_ENABLED = True
+REQUEST_METRICS_WINDOW = 1000  # sampel terakhir per nama URL untuk persentil
+REQUEST_METRICS_TOKEN = os.environ.get('REQUEST_METRICS_TOKEN')  # Bearer token untuk scrape Prometheus
+REQUEST_METRICS_PROFILE_RATE = 0.0  # mis. 0.05 = 5% request dijalankan dengan cProfile
+REQUEST_METRICS_PROFILE_THRESHOLD_MS = 1000  # profil disimpan jika request lebih lambat dari ini
+REQUEST_METRICS_PROFILE_DIR = os.path.join(BASE_DIR, 'profiles')
+REQUEST_METRICS_PROFILE_KEEP = 50
+
 # Security settings untuk production
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
 SESSION_COOKIE_SECURE = True
@@ -3,3 +3,8 @@ from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'asn_crud.settings')
 application = get_wsgi_application()
+
+# Muat font dan stylesheet WeasyPrint sebelum worker menerima request
+from asn_app.pdf_styles import warm_up_on_start  # noqa: E402
+
+warm_up_on_start()